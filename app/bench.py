@@ -0,0 +1,287 @@
+# app/bench.py
+"""Benchmarks for the hot paths, run on synthetic SWEX profiles (see data_loading.synthetic).
+
+    python -m app.bench                            # medium account: 15k runes, 1k units
+    python -m app.bench --size large               # small | medium | large (1k / 15k / 100k runes)
+    python -m app.bench --save                     # also keep the results as the baseline
+    python -m app.bench --check --threshold 0.25   # exit 1 if a case got >25% slower than the baseline
+    python -m app.bench --only load,swarfarm       # cases whose name contains one of these
+
+Every case runs once to warm up, then `--repeat` timed times; the minimum is what gets
+compared, being the least noisy. Results and baselines are JSON. Profiles, the profile
+cache and index, and the SWARFARM db all live in a temp directory, and SWARFARM itself is a
+local stand-in server, so a run never touches the real data dir or the network; only
+baselines are kept under the cache dir. The monster cases call the library functions in
+data_loading.monsters, without the browser's UI.
+"""
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qs, urlparse
+import argparse, json, os, platform, shutil, statistics, sys, tempfile, threading, time
+import numpy as np
+import pandas as pd
+
+from app.config import CACHE_DIR
+from app.model.rune_store import RuneStore
+from app.logic.calc.unit_stats import FINAL_STATS
+from app.logic.data_loading import normalizer, profile_cache
+from app.logic.data_loading.normalizer import load_runes_df, load_profile_tables
+from app.logic.data_loading.monsters import (apply_runes_to_base, fetch_swarfarm_monsters, join_equipped,
+                                             unit_rune_totals)
+from app.logic.data_loading.profiles import find_profiles
+from app.logic.data_loading.synthetic import write_profile
+from app.logic.formatting.filters import filter_runes
+from app.logic.formatting.summaries import summary_lines
+from app.logic.swarfarm import cache_store, client
+from app.logic.swarfarm.cache_store import SwarfarmCache
+from app.logic.swarfarm.client import SwarfarmClient
+
+BENCH_DIR = CACHE_DIR / 'bench'
+RESULTS_VERSION = 1
+SIZES = {'small': (1_000, 100), 'medium': (15_000, 1_000), 'large': (100_000, 3_000)}
+PROFILE_COPIES = 20        # saves in the export dir that find_profiles lists
+MIN_DELTA = 0.002          # seconds; slower by less than this is never a regression
+# (set, slot, equipped, query) as the rune page sends them
+QUERIES = [
+    ('(any)', '(any)', '(any)', ''),
+    ('Violent', '(any)', '(any)', ''),
+    ('(any)', '2', 'unequipped', 'spd>=15'),
+    ('(any)', '(any)', '(any)', 'spd>=10 cr>=5 slot=4'),
+    ('Swift', '(any)', '(any)', 'hp%'),
+    ('(any)', '(any)', 'equipped', 'atk% cd'),
+]
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], object]
+    setup: Callable[[], None] | None = None   # before every run, not timed
+
+
+def time_case(case: Case, repeat: int) -> dict:
+    """{'min', 'median', 'runs'} in seconds, after one untimed warm-up run."""
+    times = []
+    for k in range(repeat + 1):
+        if case.setup is not None:
+            case.setup()
+        t0 = time.perf_counter()
+        case.run()
+        if k:
+            times.append(time.perf_counter() - t0)
+    return {'min': min(times), 'median': statistics.median(times), 'runs': len(times)}
+
+
+# ---- stand-in SWARFARM ----
+def _monster_record(com2us_id: int) -> dict:
+    rnd = np.random.default_rng(com2us_id)
+    hp, atk, df = (int(v) for v in rnd.integers(400, 900, 3))
+    return {'id': com2us_id % 100_000, 'com2us_id': com2us_id, 'name': f'Monster {com2us_id}',
+            'image_filename': f'unit_icon_{com2us_id}.png', 'awakens_from': None, 'awakens_to': None,
+            'max_lvl_hp': hp * 15, 'max_lvl_attack': atk, 'max_lvl_defense': df, 'speed': int(rnd.integers(90, 120)),
+            'crit_rate': 15, 'crit_damage': 50, 'resistance': 15, 'accuracy': 0}
+
+
+class _SwarfarmHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API behind the client's pooled session
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        cid = parse_qs(url.query).get('com2us_id')
+        body = {'count': 1, 'results': [_monster_record(int(cid[0]))]} if cid else {'count': 0, 'results': []}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def stand_in_swarfarm() -> ThreadingHTTPServer:
+    """Local /monsters/ endpoint on a free port (stop with .shutdown())."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SwarfarmHandler)
+    threading.Thread(target=server.serve_forever, name='bench-swarfarm', daemon=True).start()
+    return server
+
+
+# ---- cases ----
+class Workspace:
+    """Temp dir with the synthetic exports; points the app's caches at it while open."""
+
+    def __init__(self, runes: int, units: int, seed: int = 0):
+        self.dir = Path(tempfile.mkdtemp(prefix='swm-bench-'))
+        self.exports = self.dir / 'exports'
+        self.profile = write_profile(self.exports / 'profile-000.json', runes, units, seed)
+        for k in range(1, PROFILE_COPIES):
+            shutil.copy(self.profile, self.exports / f'profile-{k:03d}.json')
+        self.index = self.dir / 'profile_index.json'
+        self._saved = (profile_cache.PROFILE_CACHE_DIR, normalizer.ijson, cache_store._cache, client._client)
+        profile_cache.PROFILE_CACHE_DIR = self.dir / 'profiles'
+        self.server = stand_in_swarfarm()
+        client._client = SwarfarmClient(f'http://127.0.0.1:{self.server.server_address[1]}', retries=0)
+        cache_store._cache = None
+
+    def close(self) -> None:
+        profile_cache.PROFILE_CACHE_DIR, normalizer.ijson, cache_store._cache, client._client = self._saved
+        self.server.shutdown()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def build_cases(ws: Workspace) -> list[Case]:
+    parser = normalizer.ijson
+
+    def clear_profile_cache():
+        shutil.rmtree(profile_cache.PROFILE_CACHE_DIR, ignore_errors=True)
+
+    def load_with(ijson_module):
+        def run():
+            normalizer.ijson = ijson_module
+            try:
+                return load_runes_df(ws.profile)
+            finally:
+                normalizer.ijson = parser
+        return run
+
+    cases = [
+        Case('find_profiles/cold', lambda: find_profiles(ws.exports, ws.index),
+             setup=lambda: ws.index.unlink(missing_ok=True)),
+        Case('find_profiles/indexed', lambda: find_profiles(ws.exports, ws.index)),
+        Case('load_runes_df/json', load_with(None), setup=clear_profile_cache),
+    ]
+    if parser is not None:
+        cases.append(Case('load_runes_df/ijson', load_with(parser), setup=clear_profile_cache))
+    cases.append(Case('load_runes_df/cached', load_with(parser)))
+
+    runes, units = load_profile_tables(ws.profile)
+    rows = filter_runes(runes, *QUERIES[2])
+    cases += [
+        Case('filter_runes', lambda: [filter_runes(runes, *q) for q in QUERIES]),
+        Case('summary_lines/all', lambda: summary_lines(runes)),
+        Case('summary_lines/filtered', lambda: summary_lines(runes, rows)),
+    ]
+
+    rnd = np.random.default_rng(0)
+    mons = pd.DataFrame({'unit_id': units.unit_id, 'com2us_id': units.com2us_id,
+                         **{k: rnd.integers(10, 900, len(units)) for k in FINAL_STATS}})
+    fresh = {}
+
+    def fresh_store():  # a just-loaded store: no cached stat matrices yet
+        fresh['runes'] = RuneStore.from_arrays(runes.to_arrays())
+
+    def monster_stats():
+        totals = unit_rune_totals(fresh['runes'], mons['unit_id'].to_numpy())
+        return apply_runes_to_base(mons, totals)
+
+    worn = runes.take(np.flatnonzero(np.isin(runes.unit_id, units.unit_id))).frame()
+    cases += [
+        Case('monster_stats', monster_stats, setup=fresh_store),
+        Case('join_equipped', lambda: join_equipped(mons, worn)),
+    ]
+
+    ids = np.unique(units.com2us_id).tolist()
+    db = ws.dir / 'swarfarm.sqlite3'
+
+    def empty_db():
+        cache_store._cache = None
+        for p in ws.dir.glob('swarfarm.sqlite3*'):
+            p.unlink()
+        cache_store._cache = SwarfarmCache(db, legacy_json=None)
+
+    def cold_reader():
+        cache_store._cache = SwarfarmCache(db, legacy_json=None)
+
+    records = {cid: _monster_record(cid) for cid in ids}
+    cases += [
+        Case('swarfarm/fetch', lambda: fetch_swarfarm_monsters(ids), setup=empty_db),
+        Case('swarfarm/read_db', lambda: cache_store._cache.get_many(ids), setup=cold_reader),
+        Case('swarfarm/read_mem', lambda: cache_store._cache.get_many(ids)),
+        Case('swarfarm/write', lambda: cache_store._cache.merge_many(records)),
+    ]
+    return cases
+
+
+# ---- results ----
+def run_benchmarks(size: str = 'medium', repeat: int = 5, only: list[str] | None = None,
+                   log: Callable[[str], None] = print) -> dict:
+    runes, units = SIZES[size]
+    t0 = time.perf_counter()
+    ws = Workspace(runes, units)
+    log(f'[bench] {size}: {runes} runes, {units} units, profile {ws.profile.stat().st_size / 2**20:.1f} MiB '
+        f'(generated in {time.perf_counter() - t0:.1f}s)')
+    try:
+        results = {}
+        for case in build_cases(ws):
+            if only and not any(o in case.name for o in only):
+                continue
+            results[case.name] = time_case(case, repeat)
+            log(f'[bench] {case.name:<26} {results[case.name]["min"] * 1000:9.2f} ms')
+    finally:
+        ws.close()
+    return {'version': RESULTS_VERSION, 'size': size, 'runes': runes, 'units': units, 'repeat': repeat,
+            'when': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'machine': {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                        'platform': platform.platform(), 'cpus': os.cpu_count(),
+                        'ijson': normalizer.ijson is not None},
+            'results': results}
+
+
+def baseline_path(size: str) -> Path:
+    return BENCH_DIR / f'baseline-{size}.json'
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[tuple[str, float, float, bool]]:
+    """(case, baseline min, current min, regressed) for every case present in both."""
+    out = []
+    for name, cur in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        slower = cur['min'] - base['min']
+        out.append((name, base['min'], cur['min'], slower > MIN_DELTA and cur['min'] > base['min'] * (1 + threshold)))
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog='python -m app.bench', description='Hot path benchmarks on synthetic profiles.')
+    ap.add_argument('--size', choices=tuple(SIZES), default='medium')
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--only', default='', help='comma-separated substrings of case names')
+    ap.add_argument('--json', type=Path, help='write the results here')
+    ap.add_argument('--baseline', type=Path, help='baseline file (default: per size under the cache dir)')
+    ap.add_argument('--save', action='store_true', help='store the results as the baseline')
+    ap.add_argument('--check', action='store_true', help='exit 1 on regressions against the baseline')
+    ap.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, as a fraction')
+    args = ap.parse_args(argv)
+
+    results = run_benchmarks(args.size, args.repeat, [o for o in args.only.split(',') if o])
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    base_file = args.baseline or baseline_path(args.size)
+    status = 0
+    if base_file.exists() and not args.save:
+        baseline = json.loads(base_file.read_text(encoding='utf-8'))
+        rows = compare(results, baseline, args.threshold)
+        print(f'[bench] against {base_file} ({baseline.get("when", "?")}), threshold +{args.threshold:.0%}')
+        for name, old, new, bad in rows:
+            print(f'  {name:<26} {old * 1000:9.2f} -> {new * 1000:9.2f} ms  {new / old:5.2f}x'
+                  f'{"  REGRESSION" if bad else ""}')
+        if args.check and any(bad for *_, bad in rows):
+            status = 1
+    elif args.check:
+        print(f'[bench] no baseline at {base_file}; run with --save first')
+    if args.save:
+        base_file.parent.mkdir(parents=True, exist_ok=True)
+        base_file.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f'[bench] baseline saved to {base_file}')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,21 @@
 # ---------- config ----------
 from pathlib import Path
+import os
 
 REPO = Path(__file__).resolve().parents[1]
 EXPORT_DIR = REPO / 'data' / 'swex' / 'exports' / 'profile saves'
 MONSTER_NAME_MAP = REPO / 'data' / 'swex' / 'monster_names.json'  # optional
 CACHE_DIR = REPO / 'data' / 'swex' / 'cache'
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
-SWARFARM_CACHE = CACHE_DIR / 'swarfarm_monsters.json'
+SWARFARM_CACHE = CACHE_DIR / 'swarfarm_monsters.json'  # legacy, migrated into SWARFARM_DB
+SWARFARM_DB = CACHE_DIR / 'swarfarm.sqlite3'
+# offline monster catalog (python -m app.logic.swarfarm.bestiary)
+BESTIARY_DIR = CACHE_DIR / 'bestiary'
+PORTRAIT_DIR = CACHE_DIR / 'portraits'
+# deduplicated snapshot history per wizard (python -m app.logic.data_loading.history)
+HISTORY_DIR = CACHE_DIR / 'history'
+# override to point at a local stand-in server
+SWARFARM_API = os.environ.get('SWARFARM_API', 'https://swarfarm.com/api/v2')
 
 # rune set icons (local assets)
 ICONS_DIR = REPO / 'tools' / 'sw-exporter' / 'assets' / 'runes'
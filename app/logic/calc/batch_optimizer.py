@@ -0,0 +1,161 @@
+# app/logic/calc/batch_optimizer.py
+"""Builds for a prioritized list of monsters in one go, each rune used at most once.
+
+Units are optimized in priority order and every rune a unit gets is taken out of the pool
+for the units after it. Per unit, the candidate filtering and the pair table (the search
+plan, see optimizer.prepare) are built once here, and the branch and bound first runs here
+too with a small node budget. Only a search that outgrows it is split into disjoint
+first-level branches that run on the worker processes at the same time. Workers never
+receive the plan's arrays: those live in one shared memory block per unit that each worker
+maps, and a task only carries the block's name, the plan header and its branch share.
+"""
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from typing import Callable, Iterator
+import heapq, threading, time
+import numpy as np
+
+from app.model.rune_store import RuneStore
+from app.logic.calc.optimizer import BuildSpec, OptimizeResult, SearchPlan, optimize, prepare, search
+
+
+_SERIAL_NODES = 5_000
+
+
+@dataclass
+class BatchItem:
+    unit_id: int
+    base: np.ndarray   # FINAL_STATS order
+    spec: BuildSpec
+
+
+class SharedArrays:
+    """Named arrays copied into one shared memory block; workers map it with `_attach`."""
+
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        self.layout, size = {}, 0
+        for k, a in arrays.items():
+            size = -(-size // 16) * 16  # keep every array aligned
+            self.layout[k] = (size, a.dtype.str, a.shape)
+            size += a.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.arrays = _views(self.shm, self.layout)
+        for k, a in arrays.items():
+            self.arrays[k][...] = a
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        self.arrays = {}
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _views(shm: shared_memory.SharedMemory, layout: dict) -> dict[str, np.ndarray]:
+    return {k: np.ndarray(shape, dtype=np.dtype(dt), buffer=shm.buf, offset=off) for k, (off, dt, shape) in layout.items()}
+
+
+# name -> [mapping, views, parts using it]. Closing a mapping does not wait for the numpy
+# views on it (they would read unmapped memory), so a block is only closed once no part in
+# this process still searches it; with a thread executor several parts share this table.
+_attached: dict[str, list] = {}
+_attach_lock = threading.Lock()
+
+
+@contextmanager
+def _attach(name: str, layout: dict) -> Iterator[dict[str, np.ndarray]]:
+    """Map a block in a worker (once per block per process) for the duration of a part."""
+    with _attach_lock:
+        for old in [n for n, e in _attached.items() if n != name and not e[2]]:
+            _attached.pop(old)[0].close()  # a worker only ever needs the current unit's block
+        if name not in _attached:
+            shm = shared_memory.SharedMemory(name=name)
+            _attached[name] = [shm, _views(shm, layout), 0]
+        entry = _attached[name]
+        entry[2] += 1
+    try:
+        yield entry[1]
+    finally:
+        with _attach_lock:
+            entry[2] -= 1
+
+
+def _search_part(name: str, layout: dict, header: SearchPlan, part: int, parts: int,
+                 time_limit: float | None, floor: float) -> OptimizeResult:
+    with _attach(name, layout) as arrays:
+        return search(replace(header, arrays=arrays), time_limit=time_limit, split=(part, parts), floor=floor)
+
+
+def _merge(results: list[OptimizeResult], top: int, found: OptimizeResult) -> OptimizeResult:
+    """The parts' top builds plus what the serial pass `found` (the parts find some again)."""
+    builds = {tuple(b.rows.tolist()): b for r in (found, *results) for b in r.builds}
+    builds = heapq.nlargest(top, builds.values(), key=lambda b: b.value)
+    return OptimizeResult(builds, found.nodes + sum(r.nodes for r in results),
+                          all(r.exhaustive for r in results), found.candidates)
+
+
+def _search_parallel(plan: SearchPlan, found: OptimizeResult, executor: Executor, parts: int,
+                     time_limit: float | None, check: Callable[[], None] | None) -> OptimizeResult:
+    # the parts only look for builds that beat the worst one `found` already has
+    floor = found.builds[-1].value if len(found.builds) >= plan.top else -np.inf
+    shared = SharedArrays(plan.arrays)
+    try:
+        header = plan.header()
+        futs = {executor.submit(_search_part, shared.name, shared.layout, header, p, parts, time_limit, floor)
+                for p in range(parts)}
+        results = []
+        while futs:
+            done, futs = wait(futs, timeout=0.25, return_when=FIRST_COMPLETED)
+            results.extend(f.result() for f in done)
+            if check is not None:
+                try:
+                    check()
+                except Exception:
+                    for f in futs:
+                        f.cancel()
+                    raise
+    finally:
+        shared.close()
+    return _merge(results, plan.top, found)
+
+
+def _left(time_limit: float | None, t0: float) -> float | None:
+    return None if time_limit is None else max(time_limit - (time.monotonic() - t0), 0.0)
+
+
+def optimize_batch(store: RuneStore, items: list[BatchItem], pool: np.ndarray | None = None,
+                   executor: Executor | None = None, parts: int = 8, time_limit: float | None = None,
+                   on_unit: Callable[[int, BatchItem, OptimizeResult], None] | None = None,
+                   check: Callable[[], None] | None = None) -> list[OptimizeResult]:
+    """One result per item, in priority order; runes of earlier builds are unavailable later.
+
+    `pool` (bool mask) is what any unit may use, default every rune; a unit may also always
+    reuse the runes it is wearing. Without `executor` everything runs in this process.
+    `on_unit(i, item, result)` is called as each unit finishes; `check` between tasks.
+    """
+    pool = np.ones(len(store), bool) if pool is None else np.asarray(pool, bool)
+    taken = np.zeros(len(store), bool)
+    out = []
+    for i, item in enumerate(items):
+        if check is not None:
+            check()
+        rows = np.flatnonzero((pool | (store.unit_id == item.unit_id)) & ~taken)
+        if executor is None or parts <= 1:
+            res = optimize(store, item.base, item.spec, rows=rows, time_limit=time_limit, check=check)
+        else:
+            t0 = time.monotonic()
+            plan = prepare(store, item.base, item.spec, rows)
+            # most searches end within a few thousand nodes; only the rest are worth the workers
+            res = search(plan, max_nodes=_SERIAL_NODES, time_limit=_left(time_limit, t0), check=check)
+            if not res.exhaustive and plan.slots and _left(time_limit, t0) != 0.0:
+                res = _search_parallel(plan, res, executor, parts, _left(time_limit, t0), check)
+        if res.builds:
+            taken[res.builds[0].rows] = True
+        out.append(res)
+        if on_unit is not None:
+            on_unit(i, item, res)
+    return out
@@ -0,0 +1,322 @@
+# app/logic/calc/optimizer.py
+"""Best rune builds for one monster: one rune per slot, under set / main stat / stat floor
+constraints, found by branch and bound instead of enumerating every combination.
+
+1. Candidates are cut down per slot: wrong main stats go, and inside each (slot, set) group
+   a rune that another rune beats on the objective and on every floored stat is dropped.
+2. Slots are searched depth-first, fewest candidates first, best candidates first. Partial
+   builds are pruned when even the best remaining runes can't beat the current top builds,
+   reach a floor, or still complete the required sets. The objective bound knows which
+   sets the remaining slots still have to supply (precomputed per level and missing count).
+3. The two largest slots are pre-joined into a filtered table of rune pairs, so each leaf
+   of the search is one vectorized pass over that table, with exact final stats.
+
+Steps 1 and 3 are `prepare`, step 2 is `search`; `optimize` runs both.
+"""
+from dataclasses import dataclass, field, replace
+from typing import Callable
+import heapq, time
+import numpy as np
+
+from app.model.runes import SET_REQ
+from app.model.rune_store import RuneStore, EFF_MAIN
+from app.logic.calc.rune_calc import score_runes
+from app.logic.calc.unit_stats import FINAL_STATS, stats_with_runes, stat_gain_matrix
+
+SLOTS = (1, 2, 3, 4, 5, 6)
+_OFF_SET = -1
+
+
+@dataclass
+class BuildSpec:
+    """What to optimize and under which constraints."""
+    sets: tuple[int, ...] = ()                                   # set ids to complete, e.g. (13, 17)
+    mains: dict[int, tuple[int, ...]] = field(default_factory=dict)  # slot -> allowed main stat types
+    floors: dict[str, float] = field(default_factory=dict)      # FINAL_STATS name -> minimum
+    objective: str | dict[str, float] = '300'                  # weight profile (sum of rune scores)
+                                                                 # or {FINAL_STATS name: weight >= 0}
+    top: int = 1                                                 # how many builds to return
+
+
+@dataclass
+class Build:
+    rows: np.ndarray   # store rows, one per slot in slot order
+    value: float
+    stats: np.ndarray  # final stats, FINAL_STATS order
+
+
+@dataclass
+class OptimizeResult:
+    builds: list[Build]
+    nodes: int
+    exhaustive: bool   # False if the node / time budget ran out (best builds found so far)
+    candidates: dict[int, int]  # slot -> runes left after filtering
+
+
+def _undominated(x: np.ndarray, top: int, chunk: int = 128) -> np.ndarray:
+    """Mask of the rows fewer than `top` other rows dominate, i.e. are >= on every column and
+    better on one (identical rows: the earlier one counts as better, so duplicates collapse).
+
+    Rows are visited best first in lexicographic order, so a row's dominators all come before
+    it; and a row dominated by a dropped row is dropped as well (it has that row's dominators
+    and one more), so each row is only compared with the kept rows ahead of it."""
+    n = len(x)
+    order = np.lexsort((np.arange(n),) + tuple(-x[:, c] for c in reversed(range(x.shape[1]))))
+    keep = np.zeros(n, bool)
+    kept = x[:0]
+    for a in range(0, n, chunk):
+        blk = order[a:a + chunk]
+        xb = x[blk]
+        ref = np.concatenate([kept, xb])
+        ge = (ref[:, None, :] >= xb[None, :, :]).all(axis=2)
+        ahead = np.arange(len(ref))[:, None] < len(kept) + np.arange(len(blk))[None, :]
+        m = (ge & ahead).sum(axis=0) < top
+        keep[blk[m]] = True
+        kept = np.concatenate([kept, xb[m]])
+    return keep
+
+
+def check_spec(spec: BuildSpec) -> None:
+    if sum(SET_REQ.get(s, 2) for s in spec.sets) > len(SLOTS):
+        raise ValueError(f'sets {spec.sets} need more than {len(SLOTS)} runes')
+    unknown = [k for k in spec.floors if k not in FINAL_STATS]
+    if isinstance(spec.objective, dict):
+        unknown += [k for k in spec.objective if k not in FINAL_STATS]
+        if any(w < 0 for w in spec.objective.values()):
+            raise ValueError('objective weights must be >= 0')
+    if unknown:
+        raise ValueError(f'unknown stats {unknown}; expected one of {FINAL_STATS}')
+
+
+@dataclass(eq=False)
+class SearchPlan:
+    """Everything the search reads, prepared once per monster (see `prepare`).
+
+    The big per-level and per-pair tables are plain arrays in `arrays`, so a plan can be
+    shipped to worker processes as a shared memory block plus this small header.
+    """
+    top: int
+    base: np.ndarray               # FINAL_STATS order
+    floor_cols: list[int]
+    need: np.ndarray               # floor minus base, per floored stat
+    w: np.ndarray | None           # FINAL_STATS weights; None = sum of rune scores
+    req: tuple[int, ...]           # runes needed per required set
+    slots: tuple[int, ...]         # slot of each search level (fewest candidates first); () = no build
+    candidates: dict[int, int]     # slot -> runes left after filtering
+    arrays: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def level(self, name: str) -> list[np.ndarray]:
+        """One array per level: 'rows' (store rows), 'val', 'f' (floor gains), 'tot', 'key' (set column)."""
+        return [self.arrays[f'{name}{l}'] for l in range(len(self.slots))]
+
+    def header(self) -> 'SearchPlan':
+        """This plan without its arrays (to send next to a shared copy of them)."""
+        return replace(self, arrays={})
+
+
+def prepare(store: RuneStore, base: np.ndarray, spec: BuildSpec, rows: np.ndarray | None = None) -> SearchPlan:
+    """Filter the candidates of every slot and join the two largest levels into the pair table.
+
+    `rows` are the store rows that may be used (default: all runes).
+    """
+    check_spec(spec)
+    base = np.asarray(base, dtype=np.int64)
+    rows = np.arange(len(store)) if rows is None else np.asarray(rows, dtype=np.intp)
+    gain = stat_gain_matrix(base)
+    floor_cols = [FINAL_STATS.index(k) for k in spec.floors]
+    need = np.array([spec.floors[k] - base[c] for k, c in zip(spec.floors, floor_cols)], np.float64)
+
+    # per-rune objective value and floor-stat gains (upper bounds of the exact gains)
+    totals = store.total_stats[rows].astype(np.int64)
+    gains = totals @ gain
+    if isinstance(spec.objective, str):
+        value = score_runes(store.sub_stats[rows], spec.objective)
+        w = None
+    else:
+        w = np.array([spec.objective.get(k, 0.0) for k in FINAL_STATS], np.float64)
+        value = gains @ w
+    fgain = gains[:, floor_cols]
+
+    req_sets = list(dict.fromkeys(spec.sets))
+    req = np.array([SET_REQ.get(s, 2) for s in req_sets], np.int64)
+    set_key = np.full(len(rows), _OFF_SET, np.int64)
+    for j, s in enumerate(req_sets):
+        set_key[store.set_id[rows] == s] = j
+    off_set_ok = req.sum() < len(SLOTS)
+    plan = SearchPlan(spec.top, base, floor_cols, need, w, tuple(req.tolist()), (), {})
+
+    # ---- candidates per slot ----
+    levels = []
+    for slot in SLOTS:
+        m = store.slot[rows] == slot
+        if spec.mains.get(slot):
+            m &= np.isin(store.eff[rows, 2 * EFF_MAIN], spec.mains[slot])
+        if not off_set_ok:
+            m &= set_key != _OFF_SET
+        idx = np.flatnonzero(m)
+        keep = []
+        for key in np.unique(set_key[idx]):
+            g = idx[set_key[idx] == key]
+            crit = np.column_stack([value[g], fgain[g]])
+            keep.append(g[_undominated(crit, spec.top)])
+        idx = np.concatenate(keep) if keep else idx
+        idx = idx[np.argsort(-value[idx], kind='stable')]
+        plan.candidates[slot] = len(idx)
+        levels.append((slot, idx))
+    if any(len(idx) == 0 for _, idx in levels):
+        return plan
+    levels.sort(key=lambda t: len(t[1]))
+    plan.slots = tuple(slot for slot, _ in levels)
+
+    n_req = len(req)
+    for l, (_, idx) in enumerate(levels):
+        plan.arrays.update({
+            f'rows{l}': rows[idx], f'val{l}': value[idx], f'f{l}': fgain[idx], f'tot{l}': totals[idx],
+            f'key{l}': np.where(set_key[idx] == _OFF_SET, n_req, set_key[idx]),  # column into bound tables
+        })
+
+    # the two largest levels are joined up front into one table of (dominance-filtered) pairs,
+    # so the recursion stops two levels early and each of its leaves is one vectorized pass
+    L_val, L_f, L_tot, L_key = (plan.level(k) for k in ('val', 'f', 'tot', 'key'))
+    la, lb = len(levels) - 2, len(levels) - 1
+    pa, pb = (g.ravel() for g in np.meshgrid(np.arange(len(L_val[la])), np.arange(len(L_val[lb])), indexing='ij'))
+    P_val = L_val[la][pa] + L_val[lb][pb]
+    P_f = L_f[la][pa] + L_f[lb][pb]
+    P_cnt = (L_key[la][pa, None] == np.arange(n_req)).astype(np.int64) + (L_key[lb][pb, None] == np.arange(n_req))
+    keep = []
+    for cnt in np.unique(P_cnt, axis=0):
+        g = np.flatnonzero((P_cnt == cnt).all(axis=1))
+        keep.append(g[_undominated(np.column_stack([P_val[g], P_f[g]]), spec.top)])
+    keep = np.concatenate(keep)
+    keep = keep[np.argsort(-P_val[keep], kind='stable')]
+    pa, pb = pa[keep], pb[keep]
+    plan.arrays.update({'pair_a': pa, 'pair_b': pb, 'pair_val': P_val[keep], 'pair_f': P_f[keep],
+                        'pair_cnt': P_cnt[keep], 'pair_tot': L_tot[la][pa] + L_tot[lb][pb]})
+    return plan
+
+
+def search(plan: SearchPlan, max_nodes: int = 2_000_000, time_limit: float | None = None,
+           check: Callable[[], None] | None = None, split: tuple[int, int] | None = None,
+           floor: float = -np.inf) -> OptimizeResult:
+    """Branch and bound over a prepared plan; see `optimize` for the arguments. Only builds
+    worth more than `floor` are looked for (e.g. the worst of the top builds an earlier,
+    partial search already found)."""
+    if not plan.slots:
+        return OptimizeResult([], 0, True, plan.candidates)
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    base, floor_cols, need, w, n_top = plan.base, plan.floor_cols, plan.need, plan.w, plan.top
+    n_lv, n_req = len(plan.slots), len(plan.req)
+    L_rows, L_val, L_f, L_tot, L_key = (plan.level(k) for k in ('rows', 'val', 'f', 'tot', 'key'))
+    pa, pb, P_val, P_f, P_cnt, P_tot = (plan.arrays[f'pair_{k}'] for k in ('a', 'b', 'val', 'f', 'cnt', 'tot'))
+    # best case of the levels after l, per floored stat
+    rest_f = np.zeros((n_lv + 1, len(floor_cols)))
+    for l in range(n_lv - 1, -1, -1):
+        rest_f[l] = rest_f[l + 1] + L_f[l].max(axis=0)
+
+    # best objective of levels l.. given how many runes of each required set are still missing:
+    # per-level best rune of each set, with the set choice solved exactly (tiny DP over `miss`)
+    best = [{k: float(L_val[l][L_key[l] == k].max()) for k in np.unique(L_key[l]).tolist()} for l in range(n_lv)]
+    memo: dict[tuple, float] = {}
+    rest_memo: dict[tuple, np.ndarray] = {}
+
+    def after(miss: tuple, k: int) -> tuple:
+        return miss if k == n_req or not miss[k] else miss[:k] + (miss[k] - 1,) + miss[k + 1:]
+
+    def bound(l: int, miss: tuple) -> float:
+        if sum(miss) > n_lv - l:
+            return -np.inf
+        if l == n_lv:
+            return 0.0
+        if (l, miss) not in memo:
+            memo[l, miss] = max((v + bound(l + 1, after(miss, k)) for k, v in best[l].items()), default=-np.inf)
+        return memo[l, miss]
+
+    top: list[tuple[float, int, tuple]] = []  # min-heap of (value, tiebreak, picks)
+    stats = {'nodes': 0, 'stop': False}
+
+    def threshold() -> float:
+        return top[0][0] if len(top) >= n_top else floor
+
+    la = n_lv - 2
+
+    def leaf(picks, cur_val, cur_tot, cur_f, miss):
+        """All remaining pairs at once: bounds first, exact final stats for what's left."""
+        n = np.searchsorted(-P_val, cur_val - threshold())  # pairs are sorted: only a prefix can still win
+        ok = np.ones(n, bool)
+        if floor_cols:
+            ok &= np.all(cur_f + P_f[:n] >= need, axis=1)
+        if n_req:
+            ok &= np.all(P_cnt[:n] >= np.array(miss), axis=1)
+        cand = np.flatnonzero(ok)
+        if not len(cand):
+            return
+        final = stats_with_runes(base, cur_tot + P_tot[cand])
+        ok = np.all(final[:, floor_cols] >= base[floor_cols] + need, axis=1)
+        val = cur_val + P_val[cand] if w is None else (final - base) @ w
+        for j in np.flatnonzero(ok & (val > threshold())):
+            p = int(cand[j])
+            item = (float(val[j]), stats['nodes'] * len(P_val) + p, picks + (int(pa[p]), int(pb[p])))
+            if len(top) < n_top:
+                heapq.heappush(top, item)
+            elif item[0] > top[0][0]:
+                heapq.heapreplace(top, item)
+
+    def dfs(l, picks, cur_val, cur_tot, cur_f, miss):
+        stats['nodes'] += 1
+        if stats['nodes'] % 1024 == 0:
+            if check is not None:
+                check()
+            if deadline is not None and time.monotonic() > deadline:
+                stats['stop'] = True
+        if stats['nodes'] > max_nodes or stats['stop']:
+            stats['stop'] = True
+            return
+        if l == la:
+            leaf(picks, cur_val, cur_tot, cur_f, miss)
+            return
+        # prune the whole level at once, then walk the survivors (best first)
+        if (l, miss) not in rest_memo:
+            rest_memo[l, miss] = np.array([bound(l + 1, after(miss, k)) for k in range(n_req + 1)])
+        rest = rest_memo[l, miss][L_key[l]]
+        ub = cur_val + L_val[l] + rest
+        ok = ub > threshold()
+        if floor_cols:
+            ok &= np.all(cur_f + L_f[l] + rest_f[l + 1] >= need, axis=1)
+        branches = np.flatnonzero(ok)
+        if l == 0 and split is not None:
+            branches = branches[branches % split[1] == split[0]]
+        for j in branches.tolist():
+            if ub[j] <= threshold():
+                continue
+            dfs(l + 1, picks + (j,), cur_val + L_val[l][j], cur_tot + L_tot[l][j], cur_f + L_f[l][j],
+                after(miss, int(L_key[l][j])))
+            if stats['stop']:
+                return
+
+    dfs(0, (), 0.0, np.zeros(L_tot[0].shape[1], np.int64), np.zeros(len(floor_cols)), plan.req)
+
+    builds = []
+    order = np.argsort(plan.slots)  # levels back in slot order
+    for val, _, picks in sorted(top, key=lambda t: -t[0]):
+        sel = np.array([L_rows[l][picks[l]] for l in order], np.intp)
+        tot = sum(L_tot[l][picks[l]] for l in range(n_lv))
+        builds.append(Build(sel, val, stats_with_runes(base, tot)))
+    return OptimizeResult(builds, stats['nodes'], not stats['stop'], plan.candidates)
+
+
+def optimize(store: RuneStore, base: np.ndarray, spec: BuildSpec, rows: np.ndarray | None = None,
+             max_nodes: int = 2_000_000, time_limit: float | None = None,
+             check: Callable[[], None] | None = None, split: tuple[int, int] | None = None) -> OptimizeResult:
+    """Top `spec.top` builds for a monster with base stats `base` (FINAL_STATS order) out of the
+    store rows `rows` (default: all runes). The search stops early after `max_nodes` nodes or
+    `time_limit` seconds; `check` is called every thousand nodes (a cancellation point, e.g.
+    Job.check).
+
+    `split=(part, parts)` searches only every parts-th first-level branch, starting at `part`:
+    the parts are disjoint, so merging the top builds of all of them gives the full answer.
+    `prepare` + `search` do the same in two steps, so one plan can serve every part.
+    """
+    t0 = time.monotonic()
+    plan = prepare(store, base, spec, rows)
+    left = None if time_limit is None else max(time_limit - (time.monotonic() - t0), 0.0)
+    return search(plan, max_nodes, left, check, split)
@@ -1,29 +1,85 @@
 # app/logic/rune_scoring.py
+import numpy as np
+from app.model.runes import STAT_COL, N_STAT_COLS
+
+# Score = 100 * sum(weight * stat) over innate + substats (main stat ignored).
+# '300' is the original formula; the others reweight it for a role.
+WEIGHT_PROFILES: dict[str, dict[str, float]] = {
+    '300': {
+        'hp_pct': 1/40, 'atk_pct': 1/40, 'def_pct': 1/40, 'acc': 1/40, 'res': 1/40,
+        'spd': 1/30, 'cr': 1/30, 'cd': 1/35,
+        'hp_flat': 0.35/1875, 'atk_flat': 0.35/100, 'def_flat': 0.35/100,
+    },
+    'spd': {
+        'spd': 1/12,
+        'hp_pct': 1/40, 'def_pct': 1/40, 'acc': 1/40, 'res': 1/40,
+        'atk_pct': 1/60, 'cr': 1/60, 'cd': 1/70,
+        'hp_flat': 0.2/1875, 'atk_flat': 0.2/100, 'def_flat': 0.2/100,
+    },
+    'bruiser': {
+        'hp_pct': 1/30, 'def_pct': 1/30, 'spd': 1/30, 'res': 1/40, 'acc': 1/60,
+        'atk_pct': 1/80, 'cr': 1/80, 'cd': 1/90,
+        'hp_flat': 0.5/1875, 'def_flat': 0.5/100, 'atk_flat': 0.1/100,
+    },
+}
+_TYPE_KEY = {c + 1: k for k, c in STAT_COL.items()}
+
+def weight_vector(profile: str | dict = '300') -> np.ndarray:
+    """Profile name or {stat_key: weight} dict -> (12,) weights aligned with the stat matrix."""
+    weights = WEIGHT_PROFILES[profile] if isinstance(profile, str) else profile
+    w = np.zeros(N_STAT_COLS, np.float64)
+    for k, v in weights.items():
+        w[STAT_COL[k]] = v
+    return w
+
+def _raw_300(s: np.ndarray) -> np.ndarray:
+    # the original formula term by term, so every row gets the float the per-rune code got
+    c = STAT_COL
+    part_pct = (s[:, c['hp_pct']] + s[:, c['atk_pct']] + s[:, c['def_pct']] + s[:, c['acc']] + s[:, c['res']]) / 40.0
+    part_spd = (s[:, c['spd']] + s[:, c['cr']]) / 30.0
+    part_cd = s[:, c['cd']] / 35.0
+    part_flat = 0.35 * ((s[:, c['hp_flat']] / 1875.0) + ((s[:, c['atk_flat']] + s[:, c['def_flat']]) / 100.0))
+    return (part_pct + part_spd + part_cd + part_flat) * 100.0
+
+def _round_1(raw: np.ndarray) -> np.ndarray:
+    """Python's round(x, 1) for every element: np.round agrees except right at .x5 ties."""
+    out = np.round(raw, 1)
+    tie = np.flatnonzero(np.abs(raw * 10.0 % 1.0 - 0.5) < 1e-6)
+    out[tie] = [round(x, 1) for x in raw[tie].tolist()]
+    return out
+
+def score_runes(stats: np.ndarray, profile: str | dict = '300') -> np.ndarray:
+    """Score every row of an N x 12 innate+subs stat matrix (see RuneStore.sub_stats) in one pass.
+
+    '300' reproduces the original per-rune formula to the last digit (same arithmetic, same
+    rounding). Other profiles are one matrix product, rounded half to even after snapping
+    away summation noise.
+    """
+    stats = stats.astype(np.float64)
+    if profile == '300':
+        return _round_1(_raw_300(stats))
+    raw = stats @ (weight_vector(profile) * 100.0)
+    # snap away summation-order noise first so batch and single-rune scores round identically
+    return np.round(np.round(raw, 6), 1)
+
 def _accumulate(stats, eff):
     if not eff or eff[0] == 0: return
-    t, v = int(eff[0]), int(eff[1])
-    if   t == 1: stats['hp_flat']  += v
-    elif t == 2: stats['hp_pct']   += v
-    elif t == 3: stats['atk_flat'] += v
-    elif t == 4: stats['atk_pct']  += v
-    elif t == 5: stats['def_flat'] += v
-    elif t == 6: stats['def_pct']  += v
-    elif t == 8: stats['spd']      += v
-    elif t == 9: stats['cr']       += v
-    elif t == 10: stats['cd']      += v
-    elif t == 11: stats['res']     += v
-    elif t == 12: stats['acc']     += v
+    k = _TYPE_KEY.get(int(eff[0]))
+    if k: stats[k] += int(eff[1])
 
 def totals_from_rune_no_main(r):
-    s = {'hp_flat':0,'hp_pct':0,'atk_flat':0,'atk_pct':0,'def_flat':0,'def_pct':0,'spd':0,'cr':0,'cd':0,'res':0,'acc':0}
+    s = {k: 0 for k in STAT_COL}
     _accumulate(s, r.get('prefix_eff'))
     for e in (r.get('sec_eff') or []): _accumulate(s, e)
     return s
 
-def rune_score_300(r):
+def rune_score(r, profile: str | dict = '300') -> float:
+    """Single rune dict; same engine as score_runes."""
     s = totals_from_rune_no_main(r)
-    part_pct = (s['hp_pct'] + s['atk_pct'] + s['def_pct'] + s['acc'] + s['res']) / 40.0
-    part_spd = (s['spd'] + s['cr']) / 30.0
-    part_cd  = s['cd'] / 35.0
-    part_flat = 0.35 * ((s['hp_flat']/1875.0) + ((s['atk_flat']+s['def_flat'])/100.0))
-    return round((part_pct + part_spd + part_cd + part_flat) * 100.0, 1)
+    row = np.zeros((1, N_STAT_COLS), np.int32)
+    for k, c in STAT_COL.items():
+        row[0, c] = s[k]
+    return float(score_runes(row, profile)[0])
+
+def rune_score_300(r):
+    return rune_score(r, '300')
@@ -0,0 +1,41 @@
+# app/logic/calc/unit_stats.py
+import numpy as np
+
+from app.model.runes import STAT_COL, N_STAT_COLS
+
+# final stat columns, in the order the monster tables show them
+FINAL_STATS = ('HP', 'ATK', 'DEF', 'SPD', 'CR%', 'CD%', 'RES%', 'ACC%')
+_FLAT_PCT = (('hp_flat', 'hp_pct'), ('atk_flat', 'atk_pct'), ('def_flat', 'def_pct'))
+_ADD = ('spd', 'cr', 'cd', 'res', 'acc')
+
+
+def stats_with_runes(base: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """(..., 8) final stats from (..., 8) base stats (FINAL_STATS order) and (..., 12) rune totals.
+
+    HP/ATK/DEF get flat + base * pct / 100 (truncated), the rest add up. Set bonuses are not applied.
+    """
+    base = np.asarray(base, dtype=np.int64)
+    totals = np.asarray(totals, dtype=np.int64)
+    out = np.empty(np.broadcast_shapes(base.shape, totals.shape[:-1] + (len(FINAL_STATS),)), np.int64)
+    for k, (flat, pct) in enumerate(_FLAT_PCT):
+        b = base[..., k]
+        out[..., k] = b + totals[..., STAT_COL[flat]] + np.trunc(b * totals[..., STAT_COL[pct]] / 100).astype(np.int64)
+    for k, key in enumerate(_ADD, start=len(_FLAT_PCT)):
+        out[..., k] = base[..., k] + totals[..., STAT_COL[key]]
+    return out
+
+
+def stat_gain_matrix(base: np.ndarray) -> np.ndarray:
+    """12 x 8 map from rune stats to final-stat gains for one monster, without truncation.
+
+    `totals @ M` is never below the true gain (stats_with_runes(base, totals) - base), which makes it
+    usable as a per-rune, additive upper bound.
+    """
+    base = np.asarray(base, dtype=np.float64)
+    m = np.zeros((N_STAT_COLS, len(FINAL_STATS)), np.float64)
+    for k, (flat, pct) in enumerate(_FLAT_PCT):
+        m[STAT_COL[flat], k] = 1.0
+        m[STAT_COL[pct], k] = base[k] / 100
+    for k, key in enumerate(_ADD, start=len(_FLAT_PCT)):
+        m[STAT_COL[key], k] = 1.0
+    return m
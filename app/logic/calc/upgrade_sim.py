@@ -0,0 +1,167 @@
+# app/logic/calc/upgrade_sim.py
+"""Monte Carlo forecast of what runes will score once powered up to +12.
+
+A rune gets one substat event at each of +3, +6, +9 and +12 that it hasn't reached yet: below
+4 subs a new sub is added (a stat not on the rune yet), otherwise one of the 4 subs is rolled
+again. Roll sizes depend on the rune grade. The score is linear in the stats, so every
+simulated path only tracks its score gain, which lets thousands of paths per rune run as a
+few array operations per upgrade step.
+"""
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
+
+from app.model.runes import STAT_COL, N_STAT_COLS
+from app.model.rune_store import RuneStore, EFF_MAIN, EFF_INNATE, EFF_SUBS
+from app.logic.calc.rune_calc import weight_vector
+
+ROLL_LEVELS = (3, 6, 9, 12)
+MAX_SUBS = len(EFF_SUBS)
+# (min, max) of one substat roll per rune grade; ancient runes (grade 11-16) use grade - 10
+ROLL_RANGE: dict[int, dict[str, tuple[int, int]]] = {
+    1: {'hp_flat': (15, 60), 'atk_flat': (1, 4), 'def_flat': (1, 4), 'hp_pct': (1, 2), 'atk_pct': (1, 2),
+        'def_pct': (1, 2), 'spd': (1, 1), 'cr': (1, 1), 'cd': (1, 2), 'res': (1, 2), 'acc': (1, 2)},
+    2: {'hp_flat': (30, 105), 'atk_flat': (2, 5), 'def_flat': (2, 5), 'hp_pct': (1, 3), 'atk_pct': (1, 3),
+        'def_pct': (1, 3), 'spd': (1, 2), 'cr': (1, 2), 'cd': (1, 3), 'res': (1, 3), 'acc': (1, 3)},
+    3: {'hp_flat': (45, 165), 'atk_flat': (3, 8), 'def_flat': (3, 8), 'hp_pct': (2, 5), 'atk_pct': (2, 5),
+        'def_pct': (2, 5), 'spd': (1, 3), 'cr': (1, 3), 'cd': (1, 4), 'res': (2, 4), 'acc': (2, 4)},
+    4: {'hp_flat': (60, 225), 'atk_flat': (4, 10), 'def_flat': (4, 10), 'hp_pct': (3, 6), 'atk_pct': (3, 6),
+        'def_pct': (3, 6), 'spd': (2, 4), 'cr': (2, 4), 'cd': (2, 5), 'res': (2, 6), 'acc': (2, 6)},
+    5: {'hp_flat': (90, 300), 'atk_flat': (8, 15), 'def_flat': (8, 15), 'hp_pct': (4, 7), 'atk_pct': (4, 7),
+        'def_pct': (4, 7), 'spd': (3, 5), 'cr': (3, 5), 'cd': (3, 5), 'res': (3, 7), 'acc': (3, 7)},
+    6: {'hp_flat': (135, 375), 'atk_flat': (10, 20), 'def_flat': (10, 20), 'hp_pct': (5, 8), 'atk_pct': (5, 8),
+        'def_pct': (5, 8), 'spd': (4, 6), 'cr': (4, 6), 'cd': (4, 7), 'res': (4, 8), 'acc': (4, 8)},
+}
+# subs a slot can never get, besides its own main / innate stat
+_SLOT_EXCLUDED = {1: ('def_flat', 'def_pct'), 3: ('atk_flat', 'atk_pct')}
+
+
+def _roll_tables() -> tuple[np.ndarray, np.ndarray]:
+    """(7, 12) min and max roll per grade (row 0 unused) and stat column; 0 for stats that never roll."""
+    lo = np.zeros((7, N_STAT_COLS), np.float32)
+    hi = np.zeros((7, N_STAT_COLS), np.float32)
+    for g, ranges in ROLL_RANGE.items():
+        for k, (a, b) in ranges.items():
+            lo[g, STAT_COL[k]], hi[g, STAT_COL[k]] = a, b
+    return lo, hi
+
+
+_LO, _HI = _roll_tables()
+_ROLLABLE = np.uint16(sum(1 << c for c in STAT_COL.values()))
+_BITS = np.left_shift(np.uint16(1), np.arange(N_STAT_COLS, dtype=np.uint16))
+
+
+def remaining_rolls(level: np.ndarray) -> np.ndarray:
+    """Substat events left for runes at these levels (4 at +0..+2, 0 from +12 on)."""
+    return (np.asarray(level)[:, None] < np.array(ROLL_LEVELS)).sum(axis=1).astype(np.int8)
+
+
+@dataclass
+class UpgradeForecast:
+    """Per-rune results, aligned with the rows of the store that was simulated."""
+    mean: np.ndarray         # expected score at +12
+    percentiles: dict[int, np.ndarray]  # percentile -> score at +12
+    hit: dict[float, np.ndarray]        # target score -> P(score at +12 >= target)
+    rolls: np.ndarray        # substat events left (0 = nothing to simulate, values are the score)
+    sims: int
+
+
+def _masks(store: RuneStore, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per rune: stat columns of its subs (-1 = empty), sub count, and bitmask of stats it can't get."""
+    eff = store.eff[rows].astype(np.intp)
+    subs = np.stack([eff[:, 2 * k] - 1 for k in EFF_SUBS], axis=1)
+    subs = -np.sort(-np.maximum(subs, -1), axis=1)  # filled subs first
+    taken = np.zeros(len(rows), np.uint16)
+    for k in (EFF_MAIN, EFF_INNATE) + EFF_SUBS:
+        t = eff[:, 2 * k]
+        taken |= np.where(t > 0, np.left_shift(1, np.maximum(t - 1, 0)), 0).astype(np.uint16)
+    slot = store.slot[rows]
+    for s, keys in _SLOT_EXCLUDED.items():
+        taken[slot == s] |= np.uint16(sum(1 << STAT_COL[k] for k in keys))
+    return subs, (subs >= 0).sum(axis=1).astype(np.int8), taken | ~_ROLLABLE
+
+
+def _simulate_chunk(store: RuneStore, rows: np.ndarray, w: np.ndarray, sims: int,
+                    rng: np.random.Generator) -> np.ndarray:
+    """(len(rows), sims) score gains for one chunk of runes.
+
+    Events fill the empty sub slots before any sub is rolled again, so a rune first gains
+    min(events left, empty subs) new subs, drawn together without replacement, then rolls
+    the rest on its 4 subs. Subs are kept as flat (grade, stat) indices into the roll tables.
+    """
+    n = len(rows)
+    subs, nsub, taken = _masks(store, rows)
+    grade = store.grade[rows].astype(np.intp)
+    base = (np.clip(np.where(grade > 10, grade - 10, grade), 1, 6) * N_STAT_COLS)[:, None]
+    left = remaining_rolls(store.level[rows])
+    adds = np.minimum(left, MAX_SUBS - nsub)
+    again = left - adds
+    lo, span, wt = _LO.ravel(), (_HI - _LO + 1).ravel(), np.tile(w, len(_LO))
+
+    def roll(idx: np.ndarray) -> np.ndarray:
+        return wt[idx] * np.floor(lo[idx] + rng.random(idx.shape, dtype=np.float32) * span[idx])
+
+    gain = np.zeros((n, sims), np.float32)
+    subs = np.repeat((base + np.maximum(subs, 0))[:, None, :], sims, axis=1)   # (n, S, 4)
+
+    grow = np.flatnonzero(adds > 0)
+    if len(grow):
+        # new subs without replacement: the j-th pick is uniform over the K - j stats still
+        # free, found by skipping the positions (in the rune's allowed list) taken before
+        allowed = (taken[grow, None] & _BITS) == 0
+        free = allowed.sum(axis=1)[:, None]
+        order = np.argsort(~allowed, axis=1, kind='stable')   # allowed stat columns first
+        g_adds, g_nsub, g_base = adds[grow], nsub[grow], base[grow]
+        g_subs, g_gain = subs[grow], gain[grow]
+        picked: list[np.ndarray] = []
+        for j in range(int(g_adds.max())):
+            x = np.minimum((rng.random((len(grow), sims), dtype=np.float32) * (free - j)).astype(np.intp), free - j - 1)
+            y = x
+            for _ in picked:  # fixed point of y = x + #(earlier picks <= y), reached in len(picked) steps
+                y = x + sum(p <= y for p in picked)
+            picked.append(y)
+            x = y
+            on = np.flatnonzero(g_adds > j)
+            idx = g_base[on] + np.take_along_axis(order[on], x[on], axis=1)
+            g_gain[on] += roll(idx)
+            g_subs[on[:, None], np.arange(sims), (g_nsub[on] + j)[:, None]] = idx
+        subs[grow], gain[grow] = g_subs, g_gain
+
+    for j in range(int(again.max(initial=0))):
+        on = np.flatnonzero(again > j)
+        idx = np.take_along_axis(subs[on], rng.integers(0, MAX_SUBS, (len(on), sims))[..., None], axis=2)[..., 0]
+        gain[on] += roll(idx)
+    return gain
+
+
+def simulate_upgrades(store: RuneStore, profile: str | dict = '300', sims: int = 2000,
+                      targets: tuple[float, ...] = (), percentiles: tuple[int, ...] = (10, 50, 90),
+                      seed: int | None = 0, chunk: int = 256,
+                      check: Callable[[], None] | None = None) -> UpgradeForecast:
+    """Simulate `sims` power-ups to +12 of every rune below +12 and summarize the final scores.
+
+    Scores use the same weights as `score_runes` and start from `store.score`, which therefore
+    has to be scored with `profile`. Runes already at +12 get their current score everywhere.
+    `check` is called between chunks (e.g. Job.check to cancel).
+    """
+    w = (weight_vector(profile) * 100.0).astype(np.float32)
+    rolls = remaining_rolls(store.level)
+    score = store.score.astype(np.float64)
+    mean = score.copy()
+    pct = {p: score.copy() for p in percentiles}
+    hit = {t: (score >= t).astype(np.float64) for t in targets}
+    rng = np.random.default_rng(seed)
+    todo = np.flatnonzero(rolls > 0)
+    for a in range(0, len(todo), chunk):
+        if check is not None:
+            check()
+        rows = todo[a:a + chunk]
+        final = score[rows, None] + _simulate_chunk(store, rows, w, sims, rng)
+        final = np.round(final, 1)
+        mean[rows] = final.mean(axis=1)
+        if percentiles:
+            for p, v in zip(percentiles, np.percentile(final, percentiles, axis=1)):
+                pct[p][rows] = v
+        for t in targets:
+            hit[t][rows] = (final >= t).mean(axis=1)
+    return UpgradeForecast(np.round(mean, 1), {p: np.round(v, 1) for p, v in pct.items()}, hit, rolls, sims)
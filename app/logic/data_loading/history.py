@@ -0,0 +1,309 @@
+# app/logic/data_loading/history.py
+"""Deduplicated history of every profile save, one store per wizard.
+
+Each distinct rune or unit state is stored once, as a row of a version table (a RuneStore /
+UnitTable), and addressed by its content. A snapshot is only a list of events against the
+previous one: which versions went live and which stopped being live. Both go into
+compressed npz segments, so the history of a 15k-rune account grows by a few KB per save
+instead of a full export. Queries run on the event arrays; no old JSON is read again:
+
+    python -m app.logic.data_loading.history                # ingest new saves in EXPORT_DIR
+    python -m app.logic.data_loading.history "<export dir>"
+"""
+from pathlib import Path
+import json, os, sys, threading, time
+import numpy as np
+import pandas as pd
+
+from app.config import EXPORT_DIR, HISTORY_DIR
+from app.model.rune_store import RuneStore
+from app.model.units import UnitTable
+from app.logic.calc.rune_calc import score_runes
+from app.logic.data_loading.normalizer import load_profile_tables
+from app.logic.data_loading.profile_cache import file_digest, split_prefixed, with_prefix
+from app.logic.data_loading.profiles import read_wizard_info
+from app.logic.data_loading.snapshot_diff import RUNE_COLS, UNIT_COLS, diff_stores, diff_units
+
+META = 'history.json'
+HISTORY_VERSION = 1
+MAX_SEGMENTS = 32   # merged into one segment past this
+
+# table -> (row type, content columns, differ)
+_TABLES = {
+    'runes': (RuneStore, ('rune_id',) + RUNE_COLS, diff_stores),
+    'units': (UnitTable, ('unit_id',) + UNIT_COLS, diff_units),
+}
+
+
+def _content_keys(table, cols) -> np.ndarray:
+    """One fixed-width bytes value per row, made of the row's content columns (its address)."""
+    n = len(table)
+    parts = []
+    for c in cols:
+        a = np.ascontiguousarray(getattr(table, c))
+        parts.append(a.reshape(n, int(np.prod(a.shape[1:], dtype=np.int64))).view(np.uint8))
+    buf = np.ascontiguousarray(np.concatenate(parts, axis=1))
+    return buf.view(f'V{buf.shape[1]}').ravel()
+
+
+class _Versions:
+    """Version table + event log of one table kind (runes or units)."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.row_type, self.cols, self.differ = _TABLES[kind]
+        self.table = self.row_type.empty()
+        self.ev_snap = np.zeros(0, np.int32)
+        self.ev_ver = np.zeros(0, np.int32)
+        self.ev_add = np.zeros(0, bool)
+        self.live = np.zeros(0, np.int32)      # versions live at the newest snapshot
+        self._keys = np.zeros(0, 'V1')         # content keys, sorted
+        self._key_ver = np.zeros(0, np.int32)  # version of each sorted key
+
+    def extend(self, table, ev_snap, ev_ver, ev_add) -> None:
+        self.table = self.row_type(**{k: np.concatenate([v, getattr(table, k)])
+                                      for k, v in self.table.to_arrays().items()})
+        self.ev_snap = np.concatenate([self.ev_snap, ev_snap])
+        self.ev_ver = np.concatenate([self.ev_ver, ev_ver])
+        self.ev_add = np.concatenate([self.ev_add, ev_add])
+
+    def reindex(self) -> None:
+        keys = _content_keys(self.table, self.cols)
+        order = np.argsort(keys, kind='stable')
+        self._keys, self._key_ver = keys[order], order.astype(np.int32)
+        self.live = self.live_at(int(self.ev_snap.max()) if len(self.ev_snap) else -1)
+
+    def live_at(self, snap: int) -> np.ndarray:
+        """Versions live at snapshot `snap`: added more often than removed up to it."""
+        m = self.ev_snap <= snap
+        net = np.bincount(self.ev_ver[m], weights=np.where(self.ev_add[m], 1, -1), minlength=len(self.table))
+        return np.flatnonzero(net > 0).astype(np.int32)
+
+    def stage(self, new, snap: int):
+        """(new version rows, events) turning the live set into `new`; versions are looked up
+        by content, so a state seen before (e.g. a rune moved back) is not stored twice."""
+        prev = self.table.take(self.live)
+        delta = self.differ(prev, new)
+        leaving = self.live[delta.leaving()]
+        entering = np.concatenate([delta.new_added, delta.new_changed])
+        keys = _content_keys(new.take(entering), self.cols)
+        if len(self._keys):
+            pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+            known = self._keys[pos] == keys
+        else:
+            pos, known = np.zeros(len(keys), np.intp), np.zeros(len(keys), bool)
+        # ids are unique within a save, so the unknown rows are distinct from each other too
+        fresh = np.flatnonzero(~known)
+        ver = np.empty(len(keys), np.int32)
+        ver[known] = self._key_ver[pos[known]]
+        ver[fresh] = len(self.table) + np.arange(len(fresh), dtype=np.int32)
+        rows = new.take(entering[fresh])
+        ev_ver = np.concatenate([leaving, ver]).astype(np.int32)
+        ev_add = np.concatenate([np.zeros(len(leaving), bool), np.ones(len(ver), bool)])
+        return rows, np.full(len(ev_ver), snap, np.int32), ev_ver, ev_add
+
+
+class HistoryStore:
+    """All ingested saves of one wizard (see module docstring)."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.meta = {'version': HISTORY_VERSION, 'snapshots': [], 'segments': []}
+        self.runes, self.units = _Versions('runes'), _Versions('units')
+        self._lock = threading.Lock()
+        try:
+            meta = json.loads((root / META).read_text(encoding='utf-8'))
+            if meta.get('version') == HISTORY_VERSION:
+                self.meta = meta
+        except (OSError, ValueError):
+            pass
+        for seg in self.meta['segments']:
+            with np.load(root / seg, allow_pickle=False) as z:
+                arrays = {k: z[k] for k in z.files}
+            for v in (self.runes, self.units):
+                v.extend(v.row_type.from_arrays(split_prefixed(arrays, v.kind)),
+                         *(arrays[f'ev.{v.kind}.{k}'] for k in ('snap', 'ver', 'add')))
+        for v in (self.runes, self.units):
+            v.reindex()
+
+    def __len__(self) -> int:
+        return len(self.meta['snapshots'])
+
+    # ---- writing ----
+    def ingest(self, path: Path) -> bool:
+        """Append a save as the newest snapshot; False if this exact file is already in."""
+        path = Path(path)
+        digest = file_digest(path)
+        with self._lock:
+            if any(s['digest'] == digest for s in self.meta['snapshots']):
+                return False
+            runes, units = load_profile_tables(path)
+            snap = len(self)
+            arrays = {}
+            for v, table in ((self.runes, runes), (self.units, units)):
+                rows, *events = v.stage(table, snap)
+                v.extend(rows, *events)
+                arrays.update(with_prefix(rows.to_arrays(), v.kind))
+                arrays.update({f'ev.{v.kind}.{k}': e for k, e in zip(('snap', 'ver', 'add'), events)})
+                v.reindex()
+            st = path.stat()
+            self.meta['snapshots'].append({'source': path.name, 'digest': digest, 'taken': st.st_mtime,
+                                           'size': st.st_size, 'runes': len(runes), 'units': len(units)})
+            self.meta['segments'].append(self._write_segment(f'seg-{snap:06d}.npz', arrays))
+            if len(self.meta['segments']) > MAX_SEGMENTS:
+                self._compact()
+            self._write_meta()
+            return True
+
+    def _write_segment(self, name: str, arrays: dict[str, np.ndarray]) -> str:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f'{name}.tmp'
+        with open(tmp, 'wb') as fh:
+            np.savez_compressed(fh, **arrays)
+        os.replace(tmp, self.root / name)
+        return name
+
+    def _compact(self) -> None:
+        """Rewrite everything as one segment (the in-memory tables already hold it all)."""
+        arrays = {}
+        for v in (self.runes, self.units):
+            arrays.update(with_prefix(v.table.to_arrays(), v.kind))
+            arrays.update({f'ev.{v.kind}.snap': v.ev_snap, f'ev.{v.kind}.ver': v.ev_ver,
+                           f'ev.{v.kind}.add': v.ev_add})
+        old = self.meta['segments']
+        self.meta['segments'] = [self._write_segment(f'seg-{len(self) - 1:06d}-full.npz', arrays)]
+        self._write_meta()
+        for seg in old:
+            if seg not in self.meta['segments']:
+                (self.root / seg).unlink(missing_ok=True)
+
+    def _write_meta(self) -> None:
+        tmp = self.root / f'{META}.tmp'
+        tmp.write_text(json.dumps(self.meta), encoding='utf-8')
+        os.replace(tmp, self.root / META)
+
+    # ---- queries ----
+    def snapshots(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.meta['snapshots'], columns=['source', 'digest', 'taken', 'size', 'runes', 'units'])
+        df['taken'] = pd.to_datetime(df['taken'], unit='s')
+        return df
+
+    def tables(self, snap: int = -1) -> tuple[RuneStore, UnitTable]:
+        """Rune store + roster as of snapshot `snap` (default: newest)."""
+        snap = snap % len(self) if len(self) else -1
+        return self.runes.table.take(self.runes.live_at(snap)), self.units.table.take(self.units.live_at(snap))
+
+    def timeline(self, profile: str = '300') -> pd.DataFrame:
+        """Per snapshot: rune count, equipped, +15 count, total / mean score (weights `profile`), units.
+
+        Running sums over the event log, so the cost is the number of changes, not of snapshots x runes.
+        """
+        v, n = self.runes, len(self)
+        score = v.table.score if profile == '300' else score_runes(v.table.sub_stats, profile)
+        sign = np.where(v.ev_add, 1.0, -1.0)
+        ver = v.ev_ver
+
+        def running(weights):
+            return np.cumsum(np.bincount(v.ev_snap, weights=sign * weights, minlength=n))[:n]
+
+        runes = running(np.ones(len(ver)))
+        units = np.cumsum(np.bincount(self.units.ev_snap, weights=np.where(self.units.ev_add, 1.0, -1.0),
+                                      minlength=n))[:n]
+        total = running(score[ver])
+        out = pd.DataFrame({
+            'taken': self.snapshots()['taken'],
+            'runes': runes.astype(np.int64),
+            'equipped': running((v.table.unit_id[ver] != 0).astype(np.float64)).astype(np.int64),
+            'plus15': running((v.table.level[ver] >= 15).astype(np.float64)).astype(np.int64),
+            'score_total': np.round(total, 1),
+            'score_mean': np.round(total / np.maximum(runes, 1), 2),
+            'units': units.astype(np.int64),
+        })
+        return out
+
+    def rune_history(self, rune_id: int) -> pd.DataFrame:
+        """Every state a rune went through: level, unit, score, from / until which snapshot."""
+        v = self.runes
+        mine = np.flatnonzero(v.table.rune_id == rune_id)
+        m = np.isin(v.ev_ver, mine)
+        ev = pd.DataFrame({'ver': v.ev_ver[m], 'snap': v.ev_snap[m], 'add': v.ev_add[m]})
+        start = ev[ev['add']].rename(columns={'snap': 'from'})
+        end = ev[~ev['add']].rename(columns={'snap': 'until'})
+        # pair each add with the next removal of the same version
+        out = pd.merge_asof(start.sort_values('from'), end.sort_values('until')[['ver', 'until']],
+                            left_on='from', right_on='until', by='ver', direction='forward',
+                            allow_exact_matches=False)
+        t = v.table
+        ver = out['ver'].to_numpy()
+        return pd.DataFrame({
+            'from': out['from'].to_numpy(), 'until': out['until'].to_numpy(),
+            'level': t.level[ver], 'unit_id': t.unit_id[ver], 'score': t.score[ver],
+            'gems': t.gems[ver], 'grinds': t.grinds[ver],
+        })
+
+    def first_reached(self, level: int = 15) -> pd.DataFrame:
+        """rune_id -> first snapshot (index and time) where the rune was at `level` or above."""
+        v = self.runes
+        m = v.ev_add & (v.table.level[v.ev_ver] >= level)
+        df = pd.DataFrame({'rune_id': v.table.rune_id[v.ev_ver[m]], 'snap': v.ev_snap[m]})
+        df = df.groupby('rune_id', sort=True)['snap'].min().reset_index()
+        df['taken'] = self.snapshots()['taken'].to_numpy()[df['snap'].to_numpy()] if len(df) else []
+        return df
+
+    def when_reached(self, rune_id: int, level: int = 15) -> dict | None:
+        """The snapshot (meta dict) where `rune_id` first showed up at `level`+, else None."""
+        v = self.runes
+        m = v.ev_add & (v.table.rune_id[v.ev_ver] == rune_id) & (v.table.level[v.ev_ver] >= level)
+        return self.meta['snapshots'][int(v.ev_snap[m].min())] if m.any() else None
+
+    def disk_bytes(self) -> int:
+        return sum((self.root / s).stat().st_size for s in self.meta['segments'])
+
+
+_stores: dict[str, HistoryStore] = {}
+_stores_lock = threading.Lock()
+
+def history_store(wizard_id) -> HistoryStore:
+    """Process-wide store for one wizard."""
+    key = str(wizard_id)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = HistoryStore(HISTORY_DIR / key)
+        return _stores[key]
+
+
+def sync_history(export_dir: Path = EXPORT_DIR) -> dict[str, int]:
+    """Ingest every save in `export_dir` not in its wizard's history yet, oldest first.
+
+    Snapshots are kept in ingestion order, so a save older than its wizard's newest
+    snapshot is skipped rather than spliced in. Returns {wizard_id: saves ingested}.
+    """
+    files = []
+    for de in os.scandir(export_dir):
+        if de.is_file() and de.name.lower().endswith('.json'):
+            files.append((de.stat().st_mtime, Path(de.path)))
+    added: dict[str, int] = {}
+    for mtime, path in sorted(files):
+        wid = (read_wizard_info(path) or {}).get('wizard_id')
+        if wid is None:
+            continue
+        store = history_store(wid)
+        snaps = store.meta['snapshots']
+        if snaps and mtime < snaps[-1]['taken']:
+            if not any(s['digest'] == file_digest(path) for s in snaps):
+                print(f'[history] {path.name} is older than the newest snapshot of {wid}; skipped')
+            continue
+        if store.ingest(path):
+            added[str(wid)] = added.get(str(wid), 0) + 1
+    return added
+
+
+if __name__ == '__main__':
+    src = Path(sys.argv[1]) if len(sys.argv) > 1 else EXPORT_DIR
+    t0 = time.perf_counter()
+    added = sync_history(src)
+    for wid, n in added.items():
+        store = history_store(wid)
+        print(f'[history] {wid}: +{n} saves, {len(store)} total, '
+              f'{len(store.runes.table)} rune states, {store.disk_bytes() / 1024:.0f} KiB on disk')
+    print(f'[history] done in {time.perf_counter() - t0:.1f}s')
@@ -0,0 +1,206 @@
+# app/logic/data_loading/monsters.py
+"""Monster table rows: base stats per roster unit, stats with runes, and equipped set labels.
+
+No UI here; the monster browser and the benchmarks both build their frames from these.
+"""
+from functools import cache
+import numpy as np
+import pandas as pd
+
+from app.config import ICONS_DIR
+from app.logic.swarfarm.client import swarfarm
+from app.logic.swarfarm.cache_store import swarfarm_cache
+from app.logic.swarfarm.bestiary import bestiary, STAT_FIELDS as BESTIARY_STATS
+from app.model.runes import FILENAME_BY_SET, SET, SET_REQ, N_STAT_COLS
+from app.model.rune_store import RuneStore
+from app.model.units import UnitTable
+from app.logic.calc.unit_stats import FINAL_STATS, stats_with_runes
+
+SET_ICON_URL = '/swex_icons'  # where the UI serves ICONS_DIR
+
+
+# ---------- icon map from SWEX assets ----------
+@cache
+def set_icon_paths() -> dict[int, str]:
+    """{set_id: icon URL under SET_ICON_URL} for the set icons found in ICONS_DIR."""
+    icon_map = {}
+    for sid, fname in FILENAME_BY_SET.items():
+        p = ICONS_DIR / fname
+        if p.exists():
+            icon_map[sid] = f'{SET_ICON_URL}/{fname}'
+        else:
+            for ext in ('.png', '.webp', '.svg', '.jpg', '.jpeg'):
+                alt = ICONS_DIR / (fname.rsplit('.', 1)[0].lower() + ext)
+                if alt.exists():
+                    icon_map[sid] = f'{SET_ICON_URL}/{alt.name}'
+                    break
+    return icon_map
+
+
+# ---------- SWARFARM helpers ----------
+_EMPTY_BASE = {'hp':0,'atk':0,'def':0,'spd':0,'crit_rate':0,'crit_dmg':0,'resistance':0,'accuracy':0}
+
+def fetch_swarfarm_monsters(com2us_ids: list[int]) -> dict[int, dict]:
+    """Return {com2us_id: stats/names} via SWARFARM API; cached and merged.
+
+    Missing ids are fetched concurrently; failed requests are not cached so they retry next load.
+    """
+    cache = swarfarm_cache()
+    ids = sorted({int(x) for x in com2us_ids if x})
+    out: dict[int, dict] = {cid: rec for cid, rec in cache.get_many(ids).items() if 'name' in rec}
+    missing = [i for i in ids if i not in out]
+    if not missing:
+        return out
+    fetched = swarfarm().many_by_com2us(missing)
+    new: dict[int, dict] = {}
+    for cid, m in fetched.items():
+        if m:
+            new[cid] = {
+                'name': m.get('name', f'ID:{cid}'),
+                'hp': m.get('max_lvl_hp', 0),
+                'atk': m.get('max_lvl_attack', 0),
+                'def': m.get('max_lvl_defense', 0),
+                'spd': m.get('speed', 0),
+                'crit_rate': m.get('crit_rate', 0),
+                'crit_dmg': m.get('crit_damage', 0),
+                'resistance': m.get('resistance', 0),
+                'accuracy': m.get('accuracy', 0),
+            }
+        elif m is not None:
+            new[cid] = {'name': f'ID:{cid}', **_EMPTY_BASE}
+    if new:
+        out.update(cache.merge_many(new))
+    for cid in missing:
+        if cid not in out:
+            out[cid] = {'name': f'ID:{cid}', **_EMPTY_BASE}
+    return out
+
+def bestiary_base_stats(com2us_ids) -> dict[int, dict]:
+    """Same shape as fetch_swarfarm_monsters, read from the offline bundle (no network).
+
+    Monsters newer than the bundle get the ID placeholder; rebuild the bundle to pick them up.
+    """
+    bundle = bestiary()
+    ids = np.unique(np.asarray([int(x) for x in com2us_ids if x], dtype=np.int64))
+    rows = bundle.rows(ids)
+    table = bundle.table
+    out: dict[int, dict] = {}
+    for cid, row in zip(ids.tolist(), rows.tolist()):
+        if row < 0:
+            out[cid] = {'name': f'ID:{cid}', **_EMPTY_BASE}
+            continue
+        rec = table[row]
+        out[cid] = {'name': rec['name'].decode('utf-8', 'ignore'), **{k: int(rec[k]) for k in BESTIARY_STATS}}
+    return out
+
+def base_stats(com2us_ids) -> dict[int, dict]:
+    """{com2us_id: name + base stats}: offline bundle when built, SWARFARM API otherwise."""
+    if bestiary() is not None:
+        return bestiary_base_stats(com2us_ids)
+    return fetch_swarfarm_monsters(com2us_ids)
+
+
+# ---------- roster ----------
+def load_monsters_df(units: UnitTable) -> pd.DataFrame:
+    swarf = base_stats(units.com2us_id.tolist())  # NO image fetch here
+    rows = []
+    for uid, mid, grade, lvl in zip(units.unit_id.tolist(), units.com2us_id.tolist(),
+                                    units.grade.tolist(), units.level.tolist()):
+        base = swarf.get(mid, {})
+        rows.append({
+            'unit_id': uid,
+            'com2us_id': mid,  # keep for lazy image fetch
+            'name': base.get('name', f'ID:{mid}'),
+            '★': grade,
+            'level': lvl,
+            'HP': base.get('hp', 0),
+            'ATK': base.get('atk', 0),
+            'DEF': base.get('def', 0),
+            'SPD': base.get('spd', 0),
+            'CR%': base.get('crit_rate', 0),
+            'CD%': base.get('crit_dmg', 0),
+            'RES%': base.get('resistance', 0),
+            'ACC%': base.get('accuracy', 0),
+        })
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df['name'] = df['name'].fillna('').astype(str)
+        df = df.sort_values(['★','level','SPD'], ascending=[False, False, False])
+    return df
+
+
+# ---------- set summaries (text + icons) ----------
+def _set_combo_labels(set_ids: np.ndarray, counts: np.ndarray, done: np.ndarray) -> tuple[str, str, list]:
+    """(verbose, compact, icons) for one unit's per-set rune counts / completed sets."""
+    names = [SET.get(int(sid), f"Set{sid}") for sid in set_ids]
+    verbose = ', '.join(sorted(n for n, c in zip(names, counts.tolist()) for _ in range(c)))
+    parts, icons, icon_paths = [], [], set_icon_paths()
+    for sid, name, k in zip(set_ids.tolist(), names, done.tolist()):
+        if k <= 0: continue
+        parts.append(f"{name}×{k}" if k > 1 else name)
+        icons.append({'path': icon_paths.get(sid, ''), 'name': name, 'count': k})
+    parts.sort(key=lambda s: s.lower())
+    icons.sort(key=lambda d: d['name'].lower())
+    return verbose, ' | '.join(parts), icons
+
+def join_equipped(mon_df: pd.DataFrame, runes_df: pd.DataFrame) -> pd.DataFrame:
+    """Add runes / sets / sets_compact / sets_icons per unit.
+
+    Builds one unit x set count matrix; completed sets are counts // SET_REQ, and the labels
+    are formatted once per distinct count row (units share a handful of set combinations).
+    """
+    if mon_df.empty or runes_df.empty:
+        mon_df['runes']=0; mon_df['sets']=''; mon_df['sets_compact']=''; mon_df['sets_icons']=[[]]
+        return mon_df
+
+    out = mon_df.copy()
+    unit_ids = out['unit_id'].to_numpy(dtype=np.int64)
+    r_unit = runes_df['unit_id'].to_numpy(dtype=np.int64)
+    r_set = runes_df['set_id'].to_numpy(dtype=np.int64)
+
+    order = np.argsort(unit_ids, kind='stable')
+    pos = np.minimum(np.searchsorted(unit_ids[order], r_unit), len(unit_ids) - 1)
+    hit = (r_unit != 0) & (unit_ids[order][pos] == r_unit)
+    set_ids, set_col = np.unique(r_set[hit], return_inverse=True)
+    counts = np.zeros((len(unit_ids), len(set_ids)), dtype=np.int64)
+    np.add.at(counts, (order[pos[hit]], set_col), 1)
+    req = np.array([SET_REQ.get(int(sid), 2) for sid in set_ids], dtype=np.int64)
+
+    combos, inverse = np.unique(counts, axis=0, return_inverse=True)
+    labels = [_set_combo_labels(set_ids, row, row // req) for row in combos]
+    inverse = np.asarray(inverse).reshape(-1)
+
+    out['runes'] = counts.sum(axis=1).astype(int)
+    out['sets'] = [labels[i][0] for i in inverse]
+    out['sets_compact'] = [labels[i][1] for i in inverse]
+    out['sets_icons'] = [labels[i][2] for i in inverse]
+    return out
+
+# --- aggregate rune contributions (main + innate + subs) ---
+def unit_rune_totals(store: RuneStore, unit_ids: np.ndarray) -> np.ndarray:
+    """len(unit_ids) x N_STAT_COLS totals of every equipped rune, one scatter-add over the store."""
+    unit_ids = np.asarray(unit_ids, dtype=np.int64)
+    out = np.zeros((len(unit_ids), N_STAT_COLS), dtype=np.int64)
+    if not len(store) or not len(unit_ids):
+        return out
+    order = np.argsort(unit_ids, kind='stable')
+    sorted_ids = unit_ids[order]
+    pos = np.minimum(np.searchsorted(sorted_ids, store.unit_id), len(sorted_ids) - 1)
+    hit = (store.unit_id != 0) & (sorted_ids[pos] == store.unit_id)
+    np.add.at(out, order[pos[hit]], store.total_stats[hit])
+    return out
+
+def apply_runes_to_base(mons: pd.DataFrame, totals: np.ndarray) -> pd.DataFrame:
+    """'<stat>_with' columns for every row of `mons` (totals row-aligned, from unit_rune_totals)."""
+    out = stats_with_runes(mons[list(FINAL_STATS)].to_numpy(dtype=np.int64), totals)
+    return pd.DataFrame(out, columns=[f'{c}_with' for c in FINAL_STATS], index=mons.index)
+
+def build_monster_frame(units: UnitTable, runes: RuneStore) -> pd.DataFrame:
+    """Monster rows (base stats, with-runes stats, set labels) for `units`."""
+    df_mons = load_monsters_df(units)
+    if df_mons.empty:
+        return join_equipped(df_mons, runes.frame())
+    totals = unit_rune_totals(runes, df_mons['unit_id'].to_numpy())
+    df_mons = pd.concat([df_mons, apply_runes_to_base(df_mons, totals)], axis=1)
+    worn = np.flatnonzero(np.isin(runes.unit_id, df_mons['unit_id'].to_numpy()))
+    return join_equipped(df_mons, runes.take(worn).frame())
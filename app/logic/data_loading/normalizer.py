@@ -0,0 +1,141 @@
+# app/logic/data_loading/normalizer.py
+"""One pass over a SWEX profile export -> rune table, unit table and equip map.
+
+The file is parsed with `ijson` as an event stream and only one rune / unit / equip block
+is materialized at a time; everything else in the export (buildings, decos, quests…) is
+skipped without being built. If ijson is missing (it is in requirements.txt) the whole
+document is decoded once with `json` and walked the same way: same result, far more memory.
+"""
+from pathlib import Path
+from typing import Iterator
+import json
+import numpy as np
+
+try:
+    import ijson
+except ImportError:  # degraded: every export is decoded whole
+    ijson = None
+    print('[normalizer] ijson is not installed; profiles are decoded whole (pip install ijson)')
+
+from app.model.rune_store import RuneStore
+from app.model.units import UnitTable
+from app.logic.data_loading.rune_io import rune_row, store_from_rows, sort_store, rescore_store
+from app.logic.data_loading.profile_cache import cached_tables, split_prefixed, with_prefix
+
+SECTIONS = ('runes', 'runes_info', 'unit_list', 'equip_info_list')
+_EQUIP_KEYS = ('rune_equip_list', 'runes_equip_list', 'rune_equipped_list')
+
+
+def iter_sections(path: Path) -> Iterator[tuple[str, dict]]:
+    """(section, item) for every array item of SECTIONS, in file order."""
+    if ijson is None:
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+        for section in SECTIONS:
+            for item in (data.get(section) or []):
+                if isinstance(item, dict):
+                    yield section, item
+        return
+    wanted = {f'{s}.item': s for s in SECTIONS}
+    with open(path, 'rb') as fh:
+        # hand-rolled builder: only events inside a wanted item build anything
+        stack, key, at = [], None, None
+        for prefix, event, value in ijson.parse(fh, use_float=True):
+            if not stack:
+                if event == 'start_map' and prefix in wanted:
+                    stack.append({}); at = prefix
+                continue
+            top = stack[-1]
+            if event == 'map_key':
+                key = value
+            elif event == 'start_map' or event == 'start_array':
+                new = {} if event == 'start_map' else []
+                if type(top) is dict: top[key] = new
+                else: top.append(new)
+                stack.append(new)
+            elif event == 'end_map' or event == 'end_array':
+                item = stack.pop()
+                if not stack:
+                    yield wanted[at], item
+            elif type(top) is dict:
+                top[key] = value
+            else:
+                top.append(value)
+
+
+def _int(v) -> int:
+    try:
+        return int(v or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def normalize_profile(path: Path) -> tuple[RuneStore, UnitTable, dict[int, int]]:
+    """Rune store (inventory + equipped runes), roster and {rune_id: unit_id}, in one pass.
+
+    Equip precedence: a unit's own rune list, then equip_info_list, then the rune's occupied_id.
+    """
+    top: dict[str, dict[int, tuple]] = {'runes': {}, 'runes_info': {}}
+    unit_runes: dict[int, tuple] = {}
+    by_unit: dict[int, int] = {}
+    by_info: dict[int, int] = {}
+    by_occupant: dict[str, dict[int, int]] = {'runes': {}, 'runes_info': {}}
+    units = ([], [], [], [])
+
+    for section, item in iter_sections(path):
+        if section in top:
+            row = rune_row(item)
+            if not row[0]: continue
+            top[section][row[0]] = row
+            if row[5] and _int(item.get('occupied_type') or 1) == 1:
+                by_occupant[section].setdefault(row[0], row[5])
+        elif section == 'unit_list':
+            uid = _int(item.get('unit_id'))
+            for col, v in zip(units, (uid, _int(item.get('unit_master_id')),
+                                      item.get('class') or 0, item.get('unit_level') or 0)):
+                col.append(v)
+            for key in ('runes', 'runes_info'):
+                for r in (item.get(key) or []):
+                    rid = _int(r.get('rune_id') if isinstance(r, dict) else r)
+                    if not rid: continue
+                    if uid: by_unit[rid] = uid
+                    if isinstance(r, dict) and rid not in unit_runes:
+                        unit_runes[rid] = rune_row(r)
+        else:  # equip_info_list
+            for key in _EQUIP_KEYS:
+                for e in (item.get(key) or []):
+                    rid, uid = _int(e.get('rune_id')), _int(e.get('occupied_id'))
+                    if rid and uid and _int(e.get('occupied_type') or 1) == 1:
+                        by_info.setdefault(rid, uid)
+
+    section = 'runes' if top['runes'] else 'runes_info'
+    runes = top[section]
+    # unit-listed runes only where the top-level list doesn't have them
+    rows = list(runes.values()) + [row for rid, row in unit_runes.items() if rid not in runes]
+    equip = {**by_occupant[section], **by_info, **by_unit}
+    table = UnitTable(
+        unit_id=np.array(units[0], dtype=np.int64),
+        com2us_id=np.array(units[1], dtype=np.int64),
+        grade=np.array(units[2], dtype=np.int8),
+        level=np.array(units[3], dtype=np.int8),
+    ) if units[0] else UnitTable.empty()
+    return store_from_rows(rows, equip), table, equip
+
+
+def load_profile_tables(path: Path) -> tuple[RuneStore, UnitTable]:
+    """Rune store + roster for a profile file via the profile cache (no parsing on a hit)."""
+    def build(p: Path) -> dict:
+        runes, units, _ = normalize_profile(p)
+        return {**with_prefix(runes.to_arrays(), 'runes'), **with_prefix(units.to_arrays(), 'units')}
+    arrays = cached_tables(path, 'profile', build)
+    return (RuneStore.from_arrays(split_prefixed(arrays, 'runes')),
+            UnitTable.from_arrays(split_prefixed(arrays, 'units')))
+
+
+def load_rune_store(profile_path: Path, profile: str = '300') -> RuneStore:
+    """All runes of a profile file (inventory + equipped), scored with `profile`, default order."""
+    store = load_profile_tables(profile_path)[0]
+    return rescore_store(store, profile) if profile != '300' else sort_store(store)
+
+
+def load_runes_df(profile_path: Path):
+    return load_rune_store(profile_path).frame()
@@ -0,0 +1,100 @@
+# app/logic/data_loading/profile_cache.py
+from pathlib import Path
+from typing import Callable
+import hashlib, json, os, time
+import numpy as np
+
+from app.config import CACHE_DIR
+from app.logic.calc.rune_calc import WEIGHT_PROFILES
+
+PROFILE_CACHE_DIR = CACHE_DIR / 'profiles'
+# bump when the normalized table layout (or how its scores are computed) changes
+SCHEMA_VERSION = 3
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+MAX_CACHE_AGE_DAYS = 60
+
+_digest_memo: dict[tuple[str, float, int], str] = {}
+
+
+def scoring_version() -> str:
+    """Short hash of the weight profiles, so cached scores go stale when weights change."""
+    blob = json.dumps(WEIGHT_PROFILES, sort_keys=True).encode()
+    return hashlib.blake2b(blob, digest_size=4).hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """Content hash of a profile file (memoized per path + mtime + size for this process)."""
+    st = path.stat()
+    key = (str(path), st.st_mtime, st.st_size)
+    if key not in _digest_memo:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b''):
+                h.update(chunk)
+        _digest_memo[key] = h.hexdigest()
+    return _digest_memo[key]
+
+
+def _entry_path(path: Path, kind: str) -> Path:
+    return PROFILE_CACHE_DIR / f'{kind}-{file_digest(path)}-s{SCHEMA_VERSION}-w{scoring_version()}.npz'
+
+
+def cached_tables(path: Path, kind: str, build: Callable[[Path], dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    """Normalized arrays for a profile file, from the npz cache when possible.
+
+    `build(path)` parses the file only on a miss; its arrays are written back to the cache.
+    """
+    entry = _entry_path(path, kind)
+    if entry.exists():
+        try:
+            with np.load(entry, allow_pickle=False) as z:
+                arrays = {k: z[k] for k in z.files}
+            os.utime(entry)  # keeps eviction least-recently-used
+            return arrays
+        except Exception as e:
+            print(f'[profile cache] dropping unreadable {entry.name}: {e}')
+            entry.unlink(missing_ok=True)
+
+    arrays = build(path)
+    try:
+        PROFILE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix('.tmp')
+        with open(tmp, 'wb') as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp, entry)
+        evict_cache()
+    except Exception as e:
+        print(f'[profile cache] write failed for {path.name}: {e}')
+    return arrays
+
+
+def evict_cache(max_bytes: int = MAX_CACHE_BYTES, max_age_days: float = MAX_CACHE_AGE_DAYS) -> int:
+    """Drop entries unused for `max_age_days`, then least recently used ones until under `max_bytes`."""
+    if not PROFILE_CACHE_DIR.exists(): return 0
+    now = time.time()
+    entries = []
+    for de in os.scandir(PROFILE_CACHE_DIR):
+        if de.is_file() and de.name.endswith('.npz'):
+            st = de.stat()
+            entries.append((st.st_mtime, st.st_size, de.path))
+    entries.sort()
+    total = sum(e[1] for e in entries)
+    removed = 0
+    for mtime, size, p in entries:
+        if now - mtime <= max_age_days * 86400 and total <= max_bytes:
+            break
+        try:
+            os.remove(p)
+            total -= size; removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def split_prefixed(arrays: dict[str, np.ndarray], prefix: str) -> dict[str, np.ndarray]:
+    """{'runes.slot': a, ...} -> {'slot': a, ...} for one table of a multi-table entry."""
+    return {k[len(prefix) + 1:]: v for k, v in arrays.items() if k.startswith(prefix + '.')}
+
+
+def with_prefix(arrays: dict[str, np.ndarray], prefix: str) -> dict[str, np.ndarray]:
+    return {f'{prefix}.{k}': v for k, v in arrays.items()}
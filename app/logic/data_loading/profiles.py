@@ -1,7 +1,15 @@
 # app/logic/data_loading/profiles.py
 from pathlib import Path
 import json, os, time
-from typing import List, Tuple
+from typing import List, Tuple, Optional
+
+from app.config import CACHE_DIR
+
+PROFILE_INDEX = CACHE_DIR / 'profile_index.json'
+_INDEX_VERSION = 1
+_WIZ_KEY = b'"wizard_info"'
+_CHUNK = 64 * 1024
+_MAX_WIZ_BYTES = 1024 * 1024  # wizard_info is a few hundred bytes; bail out on garbage
 
 
 
@@ -9,21 +17,105 @@ def load_profile(path: Path):
     return json.loads(path.read_text(encoding='utf-8'))
 
 
+def read_wizard_info(path: Path) -> Optional[dict]:
+    """Return the top-level `wizard_info` object without parsing the rest of the file.
+
+    Streams the file in chunks until the key shows up, then decodes only that object.
+    """
+    dec = json.JSONDecoder()
+    with open(path, 'rb') as fh:
+        tail = b''
+        while True:
+            chunk = fh.read(_CHUNK)
+            if not chunk:
+                return None
+            buf = tail + chunk
+            pos = buf.find(_WIZ_KEY)
+            if pos >= 0:
+                break
+            tail = buf[-(len(_WIZ_KEY) - 1):]
+        buf = buf[pos + len(_WIZ_KEY):]
+        while True:
+            text = buf.decode('utf-8', errors='ignore').lstrip()
+            if text.startswith(':'):
+                try:
+                    obj, _ = dec.raw_decode(text[1:].lstrip())
+                    return obj if isinstance(obj, dict) else None
+                except json.JSONDecodeError:
+                    pass
+            elif text:
+                return None
+            more = fh.read(_CHUNK)
+            if not more or len(buf) > _MAX_WIZ_BYTES:
+                return None
+            buf += more
+
+
+def _read_index(index_path: Path) -> dict:
+    try:
+        raw = json.loads(index_path.read_text(encoding='utf-8'))
+        if raw.get('version') == _INDEX_VERSION:
+            return raw.get('entries') or {}
+    except Exception:
+        pass
+    return {}
+
 
-def find_profiles(dir_path: Path) -> List[Tuple[str, str]]:
+def _write_index(index_path: Path, entries: dict) -> None:
+    try:
+        tmp = index_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'version': _INDEX_VERSION, 'entries': entries}, ensure_ascii=False),
+                       encoding='utf-8')
+        os.replace(tmp, index_path)
+    except Exception:
+        pass
+
+
+def _wizard_header(path: Path) -> Optional[dict]:
+    try:
+        wiz = read_wizard_info(path)
+    except Exception:
+        return None
+    if not wiz:
+        return None
+    return {
+        'name': wiz.get('wizard_name'),
+        'id': wiz.get('wizard_id'),
+        'level': wiz.get('wizard_level'),
+    }
+
+
+def find_profiles(dir_path: Path, index_path: Path = PROFILE_INDEX) -> List[Tuple[str, str]]:
+    """List SWEX profile saves, newest first, as (label, path) pairs.
+
+    Wizard headers live in a persistent index keyed by path + mtime + size, so only new or
+    changed files are opened, and those only up to their `wizard_info` block.
+    """
     if not dir_path.exists(): return []
-    files = sorted(dir_path.glob('*.json'), key=os.path.getmtime, reverse=True)
+    files = []
+    with os.scandir(dir_path) as it:
+        for de in it:
+            if de.is_file() and de.name.lower().endswith('.json'):
+                st = de.stat()
+                files.append((de.path, st.st_mtime, st.st_size))
+    files.sort(key=lambda f: f[1], reverse=True)
+
+    index = _read_index(index_path)
+    fresh, dirty = {}, False
     out = []
-    for p in files:
-        try:
-            data = json.loads(p.read_text(encoding='utf-8'))
-            wiz = data.get('wizard_info') or {}
-            if not wiz: continue
-            name = wiz.get('wizard_name') or '(unknown)'
-            wid  = wiz.get('wizard_id') or '?'
-            lvl  = wiz.get('wizard_level') or '?'
-            ts   = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(p.stat().st_mtime))
-            out.append((f"{name} [{wid}] Lv{lvl} — {ts} — {p.name}", str(p)))
-        except Exception:
-            continue
+    for path, mtime, size in files:
+        ent = index.get(path)
+        if not ent or ent.get('mtime') != mtime or ent.get('size') != size:
+            ent = {'mtime': mtime, 'size': size, 'wizard': _wizard_header(Path(path))}
+            dirty = True
+        fresh[path] = ent
+        wiz = ent.get('wizard')
+        if not wiz: continue
+        name = wiz.get('name') or '(unknown)'
+        wid  = wiz.get('id') or '?'
+        lvl  = wiz.get('level') or '?'
+        ts   = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
+        out.append((f"{name} [{wid}] Lv{lvl} — {ts} — {os.path.basename(path)}", path))
+    if dirty or len(fresh) != len(index):
+        _write_index(index_path, fresh)
     return out
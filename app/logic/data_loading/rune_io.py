@@ -1,33 +1,77 @@
-# app/logic/runes_io.py
-from pathlib import Path
-import json
-import pandas as pd
-from app.model.runes import SET
-from app.logic.formatting.formatters import fmt_eff
-from app.logic.calc.rune_calc import rune_score_300
-
-def load_runes_df(profile_path: Path) -> pd.DataFrame:
-    data = json.loads(profile_path.read_text(encoding='utf-8'))
-    runes = data.get('runes') or data.get('runes_info') or []
-    rows = []
-    for r in runes:
-        subs = [fmt_eff(e) for e in (r.get('sec_eff') or []) if e and e[0] != 0]
-        rows.append({
-            'rune_id': r.get('rune_id'),
-            'slot': r.get('slot_no'),
-            'set': SET.get(r.get('set_id'), f"Set{r.get('set_id')}"),
-            'grade★': r.get('class', 0),
-            'level': r.get('upgrade_curr', 0),
-            'main': fmt_eff(r.get('pri_eff')),
-            'innate': fmt_eff(r.get('prefix_eff')),
-            'subs': ', '.join(subs),
-            'equipped': bool(r.get('occupied_id')),
-            'equipped_unit_id': r.get('occupied_id') or '',
-            'score': rune_score_300(r),
-        })
-    df = pd.DataFrame(rows)
-    if not df.empty:
-        for col in ['main','innate','subs','set']:
-            df[col] = df[col].fillna('').astype(str)
-        df = df.sort_values(['score','slot','set','level'], ascending=[False, True, True, False])
-    return df
+# app/logic/data_loading/rune_io.py
+from dataclasses import replace
+import numpy as np
+from app.model.rune_store import RuneStore, N_EFF, EFF_SUBS
+from app.logic.calc.rune_calc import score_runes
+
+
+def _eff_pair(e) -> tuple[int, int]:
+    if not e or not e[0]: return (0, 0)
+    return (int(e[0]), int(e[1]))
+
+
+def rune_row(r: dict) -> tuple:
+    """(rune_id, slot, set_id, grade, level, occupied_id, eff pairs, gem_mask, grind_mask) for one
+    SWEX rune dict. sec_eff entries are [type, value, gemmed, grind]."""
+    row = [*_eff_pair(r.get('pri_eff')), *_eff_pair(r.get('prefix_eff'))]
+    gem = grind = k = 0
+    for e in (r.get('sec_eff') or []):
+        if not e or e[0] == 0: continue
+        if k < len(EFF_SUBS):
+            row += _eff_pair(e)
+            if len(e) > 2 and e[2]: gem |= 1 << k
+            if len(e) > 3 and e[3]: grind |= 1 << k
+        k += 1
+    row += [0] * (2 * N_EFF - len(row))
+    return (int(r.get('rune_id') or 0), r.get('slot_no') or 0, r.get('set_id') or 0, r.get('class') or 0,
+            r.get('upgrade_curr') or 0, int(r.get('occupied_id') or 0), row, gem, grind)
+
+
+def store_from_rows(rows: list[tuple], equip_map: dict[int, int] | None = None,
+                    profile: str = '300') -> RuneStore:
+    """RuneStore from rune_row tuples; unit_id comes from `equip_map` when given, else occupied_id."""
+    n = len(rows)
+    if not n:
+        return RuneStore.empty()
+    equip_map = equip_map or {}
+    ids, slots, sets, grades, levels, occupied, effs, gems, grinds = zip(*rows)
+    store = RuneStore(
+        rune_id=np.array(ids, dtype=np.int64),
+        slot=np.array(slots, dtype=np.int8),
+        set_id=np.array(sets, dtype=np.int16),
+        grade=np.array(grades, dtype=np.int8),
+        level=np.array(levels, dtype=np.int8),
+        unit_id=np.array([equip_map.get(rid) or occ for rid, occ in zip(ids, occupied)], dtype=np.int64),
+        eff=np.array(effs, dtype=np.int16).reshape(n, 2 * N_EFF),
+        score=np.zeros(n, np.float64),
+        gem_mask=np.array(gems, dtype=np.uint8),
+        grind_mask=np.array(grinds, dtype=np.uint8),
+    )
+    store.score = score_runes(store.sub_stats, profile)
+    return store
+
+
+def build_rune_store(runes: list[dict], equip_map: dict[int, int] | None = None,
+                     profile: str = '300') -> RuneStore:
+    """Normalize SWEX rune dicts into a RuneStore (one pass, no per-rune dicts kept).
+
+    unit_id comes from `equip_map` when given, else from the rune's own occupied_id.
+    """
+    return store_from_rows([rune_row(r) for r in runes], equip_map, profile)
+
+
+def default_order(store: RuneStore) -> np.ndarray:
+    """Row order of the default inventory sort: score desc, slot, set name, level desc."""
+    _, set_rank = np.unique(store.set_names().astype(str), return_inverse=True)
+    return np.lexsort((-store.level.astype(np.int16), set_rank, store.slot, -store.score))
+
+
+def sort_store(store: RuneStore) -> RuneStore:
+    """`store` in the default inventory order (see default_order)."""
+    if not len(store): return store
+    return store.take(default_order(store))
+
+
+def rescore_store(store: RuneStore, profile: str) -> RuneStore:
+    """A rescored copy under another weight profile, in the default order; `store` is left as is."""
+    return sort_store(replace(store, score=score_runes(store.sub_stats, profile)))
@@ -0,0 +1,182 @@
+# app/logic/data_loading/snapshot_diff.py
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from app.model.rune_store import RuneStore
+from app.model.units import UnitTable
+from app.logic.data_loading.normalizer import load_profile_tables
+from app.logic.data_loading.rune_io import default_order
+
+# columns that make a rune "changed"; score is derived, not compared
+RUNE_COLS = ('slot', 'set_id', 'grade', 'level', 'unit_id', 'eff', 'gem_mask', 'grind_mask')
+UNIT_COLS = ('com2us_id', 'grade', 'level')
+
+
+@dataclass(eq=False)
+class Delta:
+    """Row-level difference between two snapshots of one table, matched on an id column.
+
+    Row indices point into the old / new table; `old_changed[i]` and `new_changed[i]` are
+    the two versions of the same id.
+    """
+    old_removed: np.ndarray
+    new_added: np.ndarray
+    old_changed: np.ndarray
+    new_changed: np.ndarray
+
+    def __bool__(self) -> bool:
+        return bool(len(self.old_removed) or len(self.new_added) or len(self.old_changed))
+
+    def leaving(self) -> np.ndarray:
+        """Old rows whose old version goes away (removed or changed)."""
+        return np.concatenate([self.old_removed, self.old_changed])
+
+    def entering(self, remap: np.ndarray, added: np.ndarray) -> np.ndarray:
+        """Rows of the patched table holding new versions (see patch_store for `remap` and `added`)."""
+        return np.concatenate([remap[self.old_changed], added])
+
+    def counts(self) -> dict[str, int]:
+        return {'added': len(self.new_added), 'removed': len(self.old_removed), 'changed': len(self.old_changed)}
+
+
+def _diff(old_ids: np.ndarray, new_ids: np.ndarray, old_cols: list, new_cols: list) -> Delta:
+    """Sort-merge join on ids, then one vectorized compare per column over the matched pairs."""
+    _, oi, ni = np.intersect1d(old_ids, new_ids, assume_unique=True, return_indices=True)
+    old_only = np.ones(len(old_ids), bool); old_only[oi] = False
+    new_only = np.ones(len(new_ids), bool); new_only[ni] = False
+    diff = np.zeros(len(oi), bool)
+    for a, b in zip(old_cols, new_cols):
+        d = a[oi] != b[ni]
+        diff |= d.any(axis=1) if d.ndim > 1 else d
+    return Delta(np.flatnonzero(old_only), np.flatnonzero(new_only), oi[diff], ni[diff])
+
+
+def diff_stores(old: RuneStore, new: RuneStore) -> Delta:
+    return _diff(old.rune_id, new.rune_id, [getattr(old, c) for c in RUNE_COLS], [getattr(new, c) for c in RUNE_COLS])
+
+
+def diff_units(old: UnitTable, new: UnitTable) -> Delta:
+    return _diff(old.unit_id, new.unit_id, [getattr(old, c) for c in UNIT_COLS], [getattr(new, c) for c in UNIT_COLS])
+
+
+def patch_store(old: RuneStore, new: RuneStore, delta: Delta) -> tuple[RuneStore, np.ndarray, np.ndarray]:
+    """`old` with removed rows dropped, changed rows overwritten from `new` and added rows
+    inserted, back in the default order (see sort_store); unchanged rows that tie keep
+    their relative order.
+
+    Returns the patched store, old row -> patched row (-1 where removed) and the patched
+    rows of the added runes (aligned with `delta.new_added`).
+    """
+    keep = np.ones(len(old), bool); keep[delta.old_removed] = False
+    n_kept = int(keep.sum())
+    remap = np.full(len(old), -1, np.intp)
+    remap[keep] = np.arange(n_kept)
+    kept = old.take(np.flatnonzero(keep))
+    tail = new.take(delta.new_added)
+    patched = RuneStore(**{k: np.concatenate([v, getattr(tail, k)]) for k, v in kept.to_arrays().items()})
+    at = remap[delta.old_changed]
+    for k, v in patched.to_arrays().items():
+        v[at] = getattr(new, k)[delta.new_changed]
+    # rows scores moved or that were appended: one stable re-sort, then compose the row maps
+    order = default_order(patched)
+    pos = np.empty(len(order), np.intp); pos[order] = np.arange(len(order))
+    remap[keep] = pos[remap[keep]]
+    return patched.take(order), remap, pos[n_kept:]
+
+
+@dataclass(eq=False)
+class SnapshotDiff:
+    """What changed between two profile saves of one wizard, runes and roster.
+
+    A rune that disappears is `sold` if it sat in the inventory or on a unit that is still
+    there, and `removed` if it left together with its unit. A rune present in both can be
+    `upgraded` (level), `re-equipped` (unit) and/or `modified` (gems, grinds, stats) at once.
+    """
+    old: RuneStore
+    new: RuneStore
+    old_units: UnitTable
+    new_units: UnitTable
+    runes: Delta
+    units: Delta
+
+    @cached_property
+    def upgraded(self) -> np.ndarray:
+        """Per changed pair: level went up (or down)."""
+        return self.old.level[self.runes.old_changed] != self.new.level[self.runes.new_changed]
+
+    @cached_property
+    def reequipped(self) -> np.ndarray:
+        """Per changed pair: now on another unit, or taken off / put on."""
+        return self.old.unit_id[self.runes.old_changed] != self.new.unit_id[self.runes.new_changed]
+
+    @cached_property
+    def sold(self) -> np.ndarray:
+        """Per removed rune: it did not leave with its unit."""
+        owner = self.old.unit_id[self.runes.old_removed]
+        lost = self.old_units.unit_id[self.units.old_removed]
+        return (owner == 0) | ~np.isin(owner, lost)
+
+    def counts(self) -> dict[str, int]:
+        d, u = self.runes, self.units
+        return {'added': len(d.new_added), 'sold': int(self.sold.sum()),
+                'removed': int((~self.sold).sum()), 'upgraded': int(self.upgraded.sum()),
+                're-equipped': int(self.reequipped.sum()),
+                'modified': int((~self.upgraded & ~self.reequipped).sum()),
+                'units gained': len(u.new_added), 'units lost': len(u.old_removed)}
+
+    def rune_frame(self) -> pd.DataFrame:
+        """One row per added / gone / changed rune: identity, before -> after level and unit
+        (level -1 and unit 0 on the side where the rune does not exist)."""
+        d = self.runes
+        up, re = self.upgraded, self.reequipped
+        labels = np.where(up & re, 'upgraded, re-equipped',
+                          np.where(up, 'upgraded', np.where(re, 're-equipped', 'modified')))
+        parts = []
+        for store, rows, change, old_rows, new_rows in (
+                (self.new, d.new_added, 'added', None, d.new_added),
+                (self.old, d.old_removed, np.where(self.sold, 'sold', 'removed'), d.old_removed, None),
+                (self.new, d.new_changed, labels, d.old_changed, d.new_changed)):
+            n = len(rows)
+            parts.append(pd.DataFrame({
+                'rune_id': store.rune_id[rows],
+                'change': np.broadcast_to(np.asarray(change, dtype=object), (n,)),
+                'slot': store.slot[rows],
+                'set': store.set_names(rows),
+                'grade★': store.grade[rows],
+                'level_before': self.old.level[old_rows] if old_rows is not None else np.full(n, -1, np.int8),
+                'level': self.new.level[new_rows] if new_rows is not None else np.full(n, -1, np.int8),
+                'unit_before': self.old.unit_id[old_rows] if old_rows is not None else np.zeros(n, np.int64),
+                'unit': self.new.unit_id[new_rows] if new_rows is not None else np.zeros(n, np.int64),
+                'score': store.score[rows],
+            }))
+        return pd.concat(parts, ignore_index=True)
+
+    def unit_frame(self) -> pd.DataFrame:
+        """One row per gained / lost / changed (level, grade, evolution) unit."""
+        u = self.units
+        parts = []
+        for table, rows, change in ((self.new_units, u.new_added, 'gained'),
+                                    (self.old_units, u.old_removed, 'lost'),
+                                    (self.new_units, u.new_changed, 'changed')):
+            parts.append(pd.DataFrame({
+                'unit_id': table.unit_id[rows],
+                'change': np.full(len(rows), change, dtype=object),
+                'com2us_id': table.com2us_id[rows],
+                '★': table.grade[rows],
+                'level': table.level[rows],
+            }))
+        return pd.concat(parts, ignore_index=True)
+
+
+def diff_snapshot_tables(old: tuple[RuneStore, UnitTable], new: tuple[RuneStore, UnitTable]) -> SnapshotDiff:
+    (old_runes, old_units), (new_runes, new_units) = old, new
+    return SnapshotDiff(old_runes, new_runes, old_units, new_units,
+                        diff_stores(old_runes, new_runes), diff_units(old_units, new_units))
+
+
+def diff_snapshots(old_path: Path, new_path: Path) -> SnapshotDiff:
+    """Diff two profile saves (tables come from the profile cache, so repeat diffs skip parsing)."""
+    return diff_snapshot_tables(load_profile_tables(old_path), load_profile_tables(new_path))
@@ -0,0 +1,152 @@
+# app/logic/data_loading/synthetic.py
+"""Deterministic, SWEX-shaped profile exports for benchmarks and load tests.
+
+The same (runes, units, seed) always gives the same file. Runes follow the game's rules
+closely enough for every code path to see realistic data: valid main stats per slot, sub
+counts from rarity and level, roll sizes per grade, innates, gems and grinds. Built units
+carry their runes inside `unit_list` (and in `equip_info_list`); the rest sit in the
+top-level `runes` list. A few other sections are filled in so parsers have to skip them:
+
+    python -m app.logic.data_loading.synthetic out.json                 # 15k runes, 1000 units
+    python -m app.logic.data_loading.synthetic out.json 100000 3000 7   # runes, units, seed
+"""
+from pathlib import Path
+import json, random, sys
+
+from app.model.runes import SET, STAT_COL
+from app.logic.calc.upgrade_sim import ROLL_RANGE, ROLL_LEVELS
+
+WIZARD_ID = 7_000_001
+UNIT_ID_BASE = 17_000_000_000
+RUNE_ID_BASE = 30_000_000_000
+# main stat types allowed per slot
+MAIN_BY_SLOT = {1: (3,), 2: (1, 2, 3, 4, 5, 6, 8), 3: (5,), 4: (1, 2, 3, 4, 5, 6, 9, 10),
+                5: (1,), 6: (1, 2, 3, 4, 5, 6, 11, 12)}
+# main stat value of a 6* rune at +15
+MAIN_MAX = {1: 2448, 2: 63, 3: 160, 4: 63, 5: 160, 6: 63, 8: 42, 9: 58, 10: 80, 11: 64, 12: 64}
+_KEY_BY_TYPE = {c + 1: k for k, c in STAT_COL.items()}
+_SUB_TYPES = tuple(sorted(_KEY_BY_TYPE))
+_GRINDABLE = (1, 2, 3, 4, 5, 6, 8)
+_GRADE_WEIGHTS = {6: 55, 5: 30, 4: 8, 3: 4, 2: 2, 1: 1}
+_LEVEL_WEIGHTS = {0: 30, 3: 5, 6: 5, 9: 5, 12: 20, 15: 35}
+_RANK_WEIGHTS = {1: 10, 2: 25, 3: 30, 4: 20, 5: 15}   # normal .. legend (starting subs = rank - 1)
+_SET_IDS = tuple(SET)
+
+
+def _weighted(rnd: random.Random, weights: dict[int, int]) -> int:
+    return rnd.choices(tuple(weights), tuple(weights.values()))[0]
+
+
+def _roll(rnd: random.Random, grade: int, stat: int) -> int:
+    lo, hi = ROLL_RANGE[grade if grade <= 6 else grade - 10][_KEY_BY_TYPE[stat]]
+    return rnd.randint(lo, hi)
+
+
+def synthetic_rune(rnd: random.Random, rune_id: int, slot: int, occupied_id: int = 0) -> dict:
+    """One rune dict in SWEX's layout."""
+    grade = _weighted(rnd, _GRADE_WEIGHTS)
+    if grade >= 5 and rnd.random() < 0.1:
+        grade += 10  # ancient
+    stars = grade if grade <= 6 else grade - 10
+    level = _weighted(rnd, _LEVEL_WEIGHTS)
+    rank = _weighted(rnd, _RANK_WEIGHTS)
+    main = rnd.choice(MAIN_BY_SLOT[slot])
+    taken = {main} | ({5, 6} if slot == 1 else {3, 4} if slot == 3 else set())
+    prefix = [0, 0]
+    if rnd.random() < 0.3:
+        t = rnd.choice([s for s in _SUB_TYPES if s not in taken])
+        prefix = [t, _roll(rnd, grade, t)]
+        taken.add(t)
+    subs: list[list[int]] = []
+    for _ in range(rank - 1):
+        t = rnd.choice([s for s in _SUB_TYPES if s not in taken])
+        subs.append([t, _roll(rnd, grade, t), 0, 0])
+        taken.add(t)
+    for _ in range(sum(level >= lv for lv in ROLL_LEVELS)):
+        if len(subs) < 4:
+            t = rnd.choice([s for s in _SUB_TYPES if s not in taken])
+            subs.append([t, _roll(rnd, grade, t), 0, 0])
+            taken.add(t)
+        else:
+            sub = rnd.choice(subs)
+            sub[1] += _roll(rnd, grade, sub[0])
+    if level >= 12 and subs:
+        if rnd.random() < 0.05:
+            sub = rnd.choice(subs)
+            sub[2] = 1
+        for sub in subs:
+            if sub[0] in _GRINDABLE and rnd.random() < 0.3:
+                sub[3] = _roll(rnd, grade, sub[0]) // 2 + 1
+    main_value = max(1, round(MAIN_MAX[main] * stars / 6 * (0.2 + 0.8 * level / 15)))
+    return {
+        'rune_id': rune_id, 'wizard_id': WIZARD_ID,
+        'occupied_type': 1, 'occupied_id': occupied_id,
+        'slot_no': slot, 'rank': rank, 'class': grade, 'set_id': rnd.choice(_SET_IDS),
+        'upgrade_limit': 15, 'upgrade_curr': level,
+        'base_value': 1000 * stars, 'sell_value': 400 * stars,
+        'pri_eff': [main, main_value], 'prefix_eff': prefix, 'sec_eff': subs,
+        'extra': rank,
+    }
+
+
+def synthetic_unit(rnd: random.Random, unit_id: int, master_id: int) -> dict:
+    stars = _weighted(rnd, {6: 40, 5: 30, 4: 15, 3: 10, 2: 4, 1: 1})
+    return {
+        'unit_id': unit_id, 'wizard_id': WIZARD_ID, 'unit_master_id': master_id,
+        'unit_level': rnd.randint(1, 15 + 5 * stars), 'class': stars,
+        'con': rnd.randint(400, 900), 'atk': rnd.randint(300, 900), 'def': rnd.randint(300, 900),
+        'spd': rnd.randint(90, 120), 'resist': 15, 'accuracy': rnd.choice((0, 25)),
+        'critical_rate': 15, 'critical_damage': 50,
+        'skills': [[master_id * 10 + k, rnd.randint(1, 5)] for k in range(rnd.randint(2, 4))],
+        'runes': [], 'artifacts': [],
+        'attribute': master_id % 10, 'create_time': '2024-01-01 00:00:00',
+    }
+
+
+def synthetic_profile(runes: int = 15_000, units: int = 1_000, seed: int = 0) -> dict:
+    """A whole export: `runes` runes in total (equipped + inventory) and `units` monsters."""
+    rnd = random.Random(seed)
+    # com2us ids: <family><awakened><element>, a few hundred families
+    masters = [int(f'{f}{a}{e}') for f in range(101, 341) for a in (0, 1) for e in range(1, 6)]
+    unit_list = [synthetic_unit(rnd, UNIT_ID_BASE + 11 * i, rnd.choice(masters)) for i in range(units)]
+    built = min(int(units * 0.7), int(runes * 0.35) // 6)
+    next_id = RUNE_ID_BASE
+    equip_info = []
+    for unit in unit_list[:built]:
+        for slot in range(1, 7):
+            unit['runes'].append(synthetic_rune(rnd, next_id, slot, unit['unit_id']))
+            next_id += 3
+        equip_info.append({'unit_id': unit['unit_id'], 'rune_equip_list': [
+            {'rune_id': r['rune_id'], 'occupied_type': 1, 'occupied_id': unit['unit_id']} for r in unit['runes']]})
+    inventory = []
+    for _ in range(runes - 6 * built):
+        inventory.append(synthetic_rune(rnd, next_id, rnd.randint(1, 6)))
+        next_id += 3
+    return {
+        'command': 'HubUserLogin', 'ret_code': 0,
+        'wizard_info': {'wizard_id': WIZARD_ID, 'wizard_name': f'Synthetic{seed}', 'wizard_level': 50,
+                        'wizard_mana': 12_345_678, 'wizard_crystal': 4_321},
+        'unit_list': unit_list,
+        'runes': inventory,
+        'equip_info_list': equip_info,
+        'building_list': [{'building_id': 900 + i, 'building_master_id': 1 + i % 30, 'x': i % 20, 'y': i // 20}
+                          for i in range(120)],
+        'deco_list': [{'deco_id': 500 + i, 'master_id': 1 + i % 12, 'level': 1 + i % 10} for i in range(40)],
+        'inventory_info': [{'item_master_type': 9, 'item_master_id': i, 'item_quantity': rnd.randint(0, 500)}
+                           for i in range(300)],
+    }
+
+
+def write_profile(path: Path, runes: int = 15_000, units: int = 1_000, seed: int = 0) -> Path:
+    """Write `synthetic_profile(...)` as a SWEX profile save (compact JSON)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(synthetic_profile(runes, units, seed), ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+if __name__ == '__main__':
+    out = Path(sys.argv[1]) if len(sys.argv) > 1 else Path('synthetic.json')
+    n_runes, n_units, seed = (int(a) for a in (sys.argv[2:] + ['15000', '1000', '0'][len(sys.argv[2:]):]))
+    write_profile(out, n_runes, n_units, seed)
+    print(f'[synthetic] {out}: {n_runes} runes, {n_units} units, seed {seed}, {out.stat().st_size / 2**20:.1f} MiB')
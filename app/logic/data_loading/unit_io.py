@@ -0,0 +1,14 @@
+# app/logic/data_loading/unit_io.py
+import numpy as np
+from app.model.units import UnitTable
+
+
+def build_unit_table(units: list[dict]) -> UnitTable:
+    if not units:
+        return UnitTable.empty()
+    return UnitTable(
+        unit_id=np.array([int(u.get('unit_id') or 0) for u in units], dtype=np.int64),
+        com2us_id=np.array([int(u.get('unit_master_id') or 0) for u in units], dtype=np.int64),
+        grade=np.array([u.get('class') or 0 for u in units], dtype=np.int8),
+        level=np.array([u.get('unit_level') or 0 for u in units], dtype=np.int8),
+    )
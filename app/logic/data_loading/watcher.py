@@ -0,0 +1,139 @@
+# app/logic/data_loading/watcher.py
+from pathlib import Path
+from typing import Callable
+import os, threading, time
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # optional: without it the directory is polled
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, touched: Callable[[str], None]):
+        self.touched = touched
+
+    def on_created(self, event):
+        if not event.is_directory: self.touched(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory: self.touched(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory: self.touched(event.dest_path)
+
+
+class ExportWatcher:
+    """Reports export files that appeared or changed in a directory, once they stop growing.
+
+    Uses watchdog (inotify & co.) when installed, otherwise polls the directory listing every
+    `interval` seconds. A file is reported after its size and mtime held still for `settle`
+    seconds, since SWEX writes big exports in several chunks. Reported files go into a short
+    sequence-numbered log that each page reads from its own cursor (see `poll`).
+    """
+
+    def __init__(self, directory: Path, interval: float = 2.0, settle: float = 1.5, suffix: str = '.json'):
+        self.directory, self.interval, self.settle, self.suffix = Path(directory), interval, settle, suffix
+        self._log: list[tuple[int, Path]] = []
+        self._seq = 0
+        self._pending: dict[str, tuple[float, int, float]] = {}  # path -> (mtime, size, seen at)
+        self._seen: dict[str, tuple[float, int]] = self._scan()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._observer = None
+
+    # ---- readers ----
+    def cursor(self) -> int:
+        """Position to start polling from (only files reported after this call)."""
+        self.start()
+        return self._seq
+
+    def poll(self, cursor: int) -> tuple[int, list[Path]]:
+        """(new cursor, files reported since `cursor`, oldest first, each path once)."""
+        with self._lock:
+            paths = [p for seq, p in self._log if seq > cursor]
+            return self._seq, list(dict.fromkeys(paths))
+
+    def _emit(self, path: Path) -> None:
+        with self._lock:
+            self._seq += 1
+            self._log.append((self._seq, path))
+            del self._log[:-100]
+
+    # ---- watching ----
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if Observer is not None and self.directory.exists():
+            self._observer = Observer()
+            self._observer.schedule(_Handler(self._touched), str(self.directory), recursive=False)
+            self._observer.start()
+        self._thread = threading.Thread(target=self._run, name='export-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def _scan(self) -> dict[str, tuple[float, int]]:
+        try:
+            return {de.path: (de.stat().st_mtime, de.stat().st_size) for de in os.scandir(self.directory)
+                    if de.is_file() and de.name.endswith(self.suffix)}
+        except FileNotFoundError:
+            return {}
+
+    def _touched(self, path: str) -> None:
+        if not path.endswith(self.suffix):
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            prev = self._pending.get(path)
+            if prev is None or prev[:2] != (st.st_mtime, st.st_size):
+                self._pending[path] = (st.st_mtime, st.st_size, time.monotonic())
+
+    def _run(self) -> None:
+        # with watchdog only the settle check runs here; polling also diffs the listing
+        tick = min(self.interval, self.settle) if self._observer is not None else self.interval
+        while not self._stop.wait(tick):
+            if self._observer is None:
+                now = self._scan()
+                for path, sig in now.items():
+                    if self._seen.get(path) != sig:
+                        self._touched(path)
+                self._seen = now
+            for path in self._settled():
+                self._emit(Path(path))
+
+    def _settled(self) -> list[str]:
+        out, now = [], time.monotonic()
+        with self._lock:
+            for path, (mtime, size, seen) in list(self._pending.items()):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    del self._pending[path]; continue
+                if (st.st_mtime, st.st_size) != (mtime, size):
+                    self._pending[path] = (st.st_mtime, st.st_size, now)
+                elif now - seen >= self.settle and size > 0:
+                    del self._pending[path]
+                    out.append(path)
+        return out
+
+
+_watchers: dict[Path, ExportWatcher] = {}
+_watchers_lock = threading.Lock()
+
+def export_watcher(directory: Path) -> ExportWatcher:
+    """Process-wide watcher for `directory` (shared by every page that shows it)."""
+    key = Path(directory).resolve()
+    with _watchers_lock:
+        if key not in _watchers:
+            _watchers[key] = ExportWatcher(key)
+        return _watchers[key]
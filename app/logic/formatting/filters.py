@@ -1,32 +1,29 @@
 # app/logic/filters.py
-import re
-import pandas as pd
+import numpy as np
+from app.model.rune_store import RuneStore
+from app.logic.formatting.search_index import search_index
+from app.logic.formatting.rune_query import parse_query, query_index
 
-def filter_runes(df_in: pd.DataFrame, set_value: str, slot_value: str,
-                 equipped_value: str, query: str) -> pd.DataFrame:
-    if df_in.empty: return df_in
-    out = df_in
+def filter_runes(store: RuneStore, set_value: str, slot_value: str,
+                 equipped_value: str, query: str) -> np.ndarray:
+    """Return the row positions of `store` that pass the filters, in store order.
+
+    `query` mixes free text with numeric clauses like `spd>=15 cr>=10 slot=2 set=Violent`
+    (see rune_query.parse_query).
+    """
+    if not len(store): return np.zeros(0, np.intp)
+    mask = np.ones(len(store), bool)
     if set_value != '(any)':
-        out = out[out['set'] == set_value]
+        mask &= store.set_names() == set_value
     if slot_value != '(any)':
-        out = out[out['slot'] == int(slot_value)]
+        mask &= store.slot == int(slot_value)
     if equipped_value != '(any)':
         want = (equipped_value == 'equipped')
-        out = out[out['equipped'] == want]
-    q = (query or '').strip().lower()
-    if q:
-        terms = [t for t in q.split() if t]
-        def contains_all(series: pd.Series) -> pd.Series:
-            s = series.fillna('').astype(str)
-            mask = pd.Series([True]*len(s), index=s.index)
-            for t in terms:
-                mask &= s.str.contains(re.escape(t), case=False, na=False, regex=True)
-            return mask
-        mask = (
-            contains_all(out['main']) |
-            contains_all(out['innate']) |
-            contains_all(out['subs']) |
-            contains_all(out['set'])
-        )
-        out = out[mask]
-    return out
+        mask &= store.equipped == want
+    clauses, text = parse_query(query)
+    if clauses:
+        mask &= query_index(store).match(clauses)
+    hit = search_index(store).match(text)
+    if hit is not None:
+        mask &= hit
+    return np.flatnonzero(mask)
@@ -0,0 +1,101 @@
+# app/logic/formatting/rune_query.py
+import re
+from weakref import WeakKeyDictionary
+import numpy as np
+
+from app.model.runes import SET, STAT_COL
+from app.model.rune_store import RuneStore, EFF_MAIN
+
+# query field -> stat key (values are innate + subs, like the score)
+STAT_FIELDS = {
+    'hp': 'hp_flat', 'hp%': 'hp_pct', 'atk': 'atk_flat', 'atk%': 'atk_pct',
+    'def': 'def_flat', 'def%': 'def_pct', 'spd': 'spd', 'cr': 'cr', 'cd': 'cd',
+    'res': 'res', 'acc': 'acc',
+}
+# other numeric fields -> RuneStore attribute
+ATTR_FIELDS = {'slot': 'slot', 'level': 'level', '+': 'level', 'grade': 'grade', '★': 'grade',
+               'star': 'grade', 'score': 'score', 'gem': 'gems', 'grind': 'grinds'}
+_SET_BY_NAME = {v.lower(): k for k, v in SET.items()}
+_STAT_TYPE = {f: STAT_COL[k] + 1 for f, k in STAT_FIELDS.items()}
+
+_CLAUSE = re.compile(r'^([a-z%+★]+)(>=|<=|!=|==|=|>|<)(.*)$')
+
+
+def parse_query(query: str) -> tuple[list[tuple[str, str, object]], str]:
+    """Split a search box string into numeric clauses and leftover free text.
+
+    `spd>=15 cr>=10 slot=2 set=Violent main=spd` -> [('spd','>=',15), ...], ''.
+    Unknown fields stay in the free text; a known field with a bad or missing value
+    (e.g. half-typed `spd>=`) is dropped.
+    """
+    clauses, text = [], []
+    for tok in (query or '').strip().lower().split():
+        m = _CLAUSE.match(tok)
+        if not m:
+            text.append(tok); continue
+        field, op, raw = m.groups()
+        op = '=' if op == '==' else op
+        if field == 'set':
+            sid = _SET_BY_NAME.get(raw)
+            if sid is None and raw.startswith('set') and raw[3:].isdigit(): sid = int(raw[3:])
+            if sid is not None and op in ('=', '!='): clauses.append(('set', op, sid))
+        elif field == 'main':
+            if raw in _STAT_TYPE and op in ('=', '!='): clauses.append(('main', op, _STAT_TYPE[raw]))
+        elif field in STAT_FIELDS or field in ATTR_FIELDS:
+            try:
+                clauses.append((field, op, float(raw)))
+            except ValueError:
+                pass
+        else:
+            text.append(tok)
+    return clauses, ' '.join(text)
+
+
+class RuneQueryIndex:
+    """Per-column sorted indexes over a RuneStore, built lazily per queried column."""
+
+    def __init__(self, store: RuneStore):
+        self.store = store
+        self._sorted: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    def _column(self, field: str) -> np.ndarray:
+        s = self.store
+        if field in STAT_FIELDS: return s.sub_stats[:, STAT_COL[STAT_FIELDS[field]]]
+        if field == 'set': return s.set_id
+        if field == 'main': return s.eff[:, 2 * EFF_MAIN]
+        return getattr(s, ATTR_FIELDS[field])
+
+    def _index(self, field: str) -> tuple[np.ndarray, np.ndarray]:
+        key = ATTR_FIELDS.get(field, field)
+        if key not in self._sorted:
+            col = self._column(field)
+            order = np.argsort(col, kind='stable')
+            self._sorted[key] = (order, col[order])
+        return self._sorted[key]
+
+    def rows(self, field: str, op: str, value) -> np.ndarray:
+        """Bool mask for one clause: a binary search on the sorted column, no scan."""
+        order, vals = self._index(field)
+        lo_eq, hi_eq = np.searchsorted(vals, value, 'left'), np.searchsorted(vals, value, 'right')
+        lo, hi = {
+            '>=': (lo_eq, len(vals)), '>': (hi_eq, len(vals)),
+            '<=': (0, hi_eq), '<': (0, lo_eq), '=': (lo_eq, hi_eq), '!=': (lo_eq, hi_eq),
+        }[op]
+        m = np.zeros(len(vals), bool)
+        m[order[lo:hi]] = True
+        return ~m if op == '!=' else m
+
+    def match(self, clauses) -> np.ndarray:
+        m = np.ones(len(self.store), bool)
+        for field, op, value in clauses:
+            m &= self.rows(field, op, value)
+        return m
+
+
+_indexes: 'WeakKeyDictionary[RuneStore, RuneQueryIndex]' = WeakKeyDictionary()
+
+def query_index(store: RuneStore) -> RuneQueryIndex:
+    idx = _indexes.get(store)
+    if idx is None:
+        idx = _indexes[store] = RuneQueryIndex(store)
+    return idx
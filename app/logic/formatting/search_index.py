@@ -0,0 +1,100 @@
+# app/logic/formatting/search_index.py
+from weakref import WeakKeyDictionary
+import numpy as np
+
+from app.model.runes import STAT
+from app.model.rune_store import RuneStore, EFF_MAIN, EFF_INNATE, EFF_SUBS
+
+SEARCH_COLUMNS = ('main', 'innate', 'subs', 'set')
+
+
+class RuneSearchIndex:
+    """Token -> row bitset index over the formatted main / innate / subs / set columns.
+
+    A query term (never contains whitespace) is a substring of a column's text exactly when it
+    is a substring of one of its whitespace-separated pieces, so indexing those pieces keeps
+    the old `str.contains` semantics. Each effect also gets a compact 'spd+15' token.
+    """
+
+    def __init__(self, store: RuneStore):
+        self.n = len(store)
+        self._tokens: dict[str, dict[str, np.ndarray]] = {}
+        self._term_cache: dict[tuple[str, str], np.ndarray] = {}
+        eff = store.eff
+        n_subs = (eff[:, [2 * k for k in EFF_SUBS]] > 0).sum(axis=1)
+        self._add_effects('main', eff, EFF_MAIN, None)
+        self._add_effects('innate', eff, EFF_INNATE, None)
+        for j, k in enumerate(EFF_SUBS):
+            self._add_effects('subs', eff, k, j < n_subs - 1)
+        names = store.set_names()
+        for name in np.unique(names.astype(str)):
+            self._add('set', name.lower(), np.flatnonzero(names == name))
+        self._finish()
+
+    def _add(self, col: str, token: str, rows: np.ndarray) -> None:
+        self._tokens.setdefault(col, {}).setdefault(token, []).append(rows)
+
+    def _add_effects(self, col: str, eff: np.ndarray, k: int, comma) -> None:
+        t = eff[:, 2 * k].astype(np.int64)
+        v = eff[:, 2 * k + 1].astype(np.int64)
+        has = t > 0
+        c = np.zeros(len(t), np.int64) if comma is None else comma.astype(np.int64)
+        key = (t << 20) | ((v & 0x7ffff) << 1) | c
+        keys, inv = np.unique(key[has], return_inverse=True)
+        rows_has = np.flatnonzero(has)
+        order = np.argsort(inv, kind='stable')
+        bounds = np.searchsorted(inv[order], np.arange(len(keys) + 1))
+        for i, kv in enumerate(keys.tolist()):
+            rows = rows_has[order[bounds[i]:bounds[i + 1]]]
+            tt, vv, cc = kv >> 20, (kv >> 1) & 0x7ffff, kv & 1
+            name = STAT.get(tt, f'Type{tt}').lower()
+            for word in name.split():
+                self._add(col, word, rows)
+            self._add(col, f'+{vv}' + (',' if cc else ''), rows)
+            self._add(col, f"{name.replace(' ', '')}+{vv}", rows)
+
+    def _finish(self) -> None:
+        for col in SEARCH_COLUMNS:
+            packed = {}
+            for token, parts in self._tokens.get(col, {}).items():
+                m = np.zeros(self.n, bool)
+                m[np.concatenate(parts)] = True
+                packed[token] = np.packbits(m)
+            self._tokens[col] = packed
+
+    def _term_bits(self, col: str, term: str) -> np.ndarray:
+        """OR of every token in `col` containing `term` (memoized; typing extends terms)."""
+        key = (col, term)
+        bits = self._term_cache.get(key)
+        if bits is None:
+            bits = np.zeros((self.n + 7) // 8, np.uint8)
+            for token, b in self._tokens[col].items():
+                if term in token:
+                    bits |= b
+            if len(self._term_cache) > 4096:
+                self._term_cache.clear()
+            self._term_cache[key] = bits
+        return bits
+
+    def match(self, query: str) -> np.ndarray | None:
+        """Bool mask of rows where some column contains every query term; None for an empty query."""
+        terms = [t for t in (query or '').strip().lower().split() if t]
+        if not terms:
+            return None
+        hit = np.zeros((self.n + 7) // 8, np.uint8)
+        for col in SEARCH_COLUMNS:
+            m = self._term_bits(col, terms[0]).copy()
+            for t in terms[1:]:
+                m &= self._term_bits(col, t)
+            hit |= m
+        return np.unpackbits(hit, count=self.n).astype(bool)
+
+
+_indexes: 'WeakKeyDictionary[RuneStore, RuneSearchIndex]' = WeakKeyDictionary()
+
+def search_index(store: RuneStore) -> RuneSearchIndex:
+    """The index for a loaded store, built on first use and kept as long as the store lives."""
+    idx = _indexes.get(store)
+    if idx is None:
+        idx = _indexes[store] = RuneSearchIndex(store)
+    return idx
@@ -1,38 +1,180 @@
 # app/logic/summaries.py
-import re
-import pandas as pd
-
-def summary_lines(df_in: pd.DataFrame) -> tuple[str,str,str,str]:
-    if df_in.empty:
-        return ('No runes','','','')
-    n = len(df_in)
-    eq = int(df_in['equipped'].sum())
-    uneq = n - eq
-    eq_pct = (eq / n) * 100 if n else 0.0
-    avg_grade = float(df_in['grade★'].mean()) if 'grade★' in df_in.columns else 0.0
-    avg_lvl   = float(df_in['level'].mean())  if 'level'  in df_in.columns else 0.0
-
-    top_sets = df_in['set'].value_counts().head(5).to_dict()
-    top_sets_str = ' | '.join(f'{k}: {v}' for k, v in top_sets.items())
-
-    slot_counts = df_in['slot'].value_counts().reindex([1,2,3,4,5,6], fill_value=0).to_dict()
-    slots_str = ' '.join(f'{s}:{slot_counts[s]}' for s in [1,2,3,4,5,6])
-
-    def col_max_spd(series: pd.Series) -> int:
-        vals = []
-        for txt in series.fillna('').astype(str):
-            vals += [int(x) for x in re.findall(r'\bSPD\s*\+(\d+)', txt)]
-        return max(vals) if vals else 0
-    spd_max = max(col_max_spd(df_in['main']), col_max_spd(df_in['innate']), col_max_spd(df_in['subs']))
-    spd_sub_count = df_in['subs'].str.contains(r'\bSPD\s*\+\d+', case=False, na=False).sum()
-
-    avg_score = float(df_in['score'].mean())
-    p95_score = float(df_in['score'].quantile(0.95)) if n >= 2 else avg_score
-    top = df_in.sort_values('score', ascending=False).head(1).iloc[0]
-    top_desc = f"#{int(top['rune_id'])} {top['set']} s{int(top['slot'])} +{int(top['level'])} (score {top['score']:.1f})"
-
-    line1 = f'Total: {n}   |   Equipped: {eq} ({eq_pct:.1f}%) / Unequipped: {uneq}   |   Avg ★: {avg_grade:.2f}   Avg +: {avg_lvl:.2f}'
-    line2 = f'Top sets: {top_sets_str}'
-    line3 = f'Slots: {slots_str}   |   Fastest SPD: +{spd_max}   |   Runes w/ SPD sub: {spd_sub_count}'
-    line4 = f'Avg score: {avg_score:.1f}   |   p95: {p95_score:.1f}   |   Top: {top_desc}'
-    return (line1, line2, line3, line4)
+from weakref import WeakKeyDictionary
+import numpy as np
+from app.model.runes import SET, STAT_COL
+from app.model.rune_store import RuneStore, EFF_SUBS
+
+_SPD_TYPE = STAT_COL['spd'] + 1
+
+
+class _StoreCols:
+    """Per-store row arrays the summary needs, derived once per store."""
+    def __init__(self, store: RuneStore):
+        eff = store.eff
+        spd = np.where(eff[:, 0::2] == _SPD_TYPE, eff[:, 1::2], 0)  # per effect position
+        self.spd_best = spd.max(axis=1) if len(store) else np.zeros(0, np.int16)
+        self.spd_sub = (spd[:, list(EFF_SUBS)] > 0).any(axis=1)
+        self.n_sets = int(store.set_id.max()) + 1 if len(store) else 1
+        self.n_slots = max(int(store.slot.max()) + 1, 7) if len(store) else 7
+        # rune page stores are kept in score-desc order; then row order == rank order
+        self.score_desc = bool(np.all(np.diff(store.score) <= 0))
+
+_cols: 'WeakKeyDictionary[RuneStore, _StoreCols]' = WeakKeyDictionary()
+
+def _store_cols(store: RuneStore) -> _StoreCols:
+    c = _cols.get(store)
+    if c is None:
+        c = _cols[store] = _StoreCols(store)
+    return c
+
+def _ascending(rows) -> np.ndarray:
+    """Row positions in increasing order without repeats (what the rank shortcuts assume)."""
+    rows = np.asarray(rows, np.intp)
+    return rows if np.all(rows[1:] > rows[:-1]) else np.unique(rows)
+
+
+class RuneSummary:
+    """Aggregates behind the summary card for a set of store rows.
+
+    `update()` with a subset of the current rows (filters only narrowed) subtracts the
+    removed rows instead of rescanning; anything else recomputes.
+    """
+
+    def __init__(self, store: RuneStore, rows: np.ndarray | None = None):
+        self.store = store
+        self.cols = _store_cols(store)
+        self._full(np.arange(len(store)) if rows is None else _ascending(rows))
+
+    def _full(self, rows: np.ndarray) -> None:
+        s, c = self.store, self.cols
+        self.rows = rows
+        self.mask = np.zeros(len(s), bool); self.mask[rows] = True
+        self.n = len(rows)
+        self.eq = int(s.equipped[rows].sum())
+        self.grade_sum = int(s.grade[rows].sum(dtype=np.int64))
+        self.level_sum = int(s.level[rows].sum(dtype=np.int64))
+        self.set_counts = np.bincount(s.set_id[rows].astype(np.intp), minlength=c.n_sets)
+        self.slot_counts = np.bincount(s.slot[rows].astype(np.intp), minlength=c.n_slots)
+        self.spd_sub_count = int(c.spd_sub[rows].sum())
+        self.score_sum = float(s.score[rows].sum())
+        self._spd_row = int(rows[np.argmax(c.spd_best[rows])]) if self.n else -1
+        self._top_row = int(rows[np.argmax(s.score[rows])]) if self.n else -1
+
+    def update(self, rows: np.ndarray) -> 'RuneSummary':
+        rows = _ascending(rows)
+        if len(rows) > self.n or not self.mask[rows].all():
+            self._full(rows); return self
+        new_mask = np.zeros(len(self.store), bool); new_mask[rows] = True
+        gone = self.rows[~new_mask[self.rows]]
+        if len(gone) > len(rows):  # cheaper to recount what is left
+            self._full(rows); return self
+        s, c = self.store, self.cols
+        self.n -= len(gone)
+        self.eq -= int(s.equipped[gone].sum())
+        self.grade_sum -= int(s.grade[gone].sum(dtype=np.int64))
+        self.level_sum -= int(s.level[gone].sum(dtype=np.int64))
+        self.set_counts -= np.bincount(s.set_id[gone].astype(np.intp), minlength=c.n_sets)
+        self.slot_counts -= np.bincount(s.slot[gone].astype(np.intp), minlength=c.n_slots)
+        self.spd_sub_count -= int(c.spd_sub[gone].sum())
+        self.score_sum -= float(s.score[gone].sum())
+        self.rows, self.mask = rows, new_mask
+        # extremes only need a rescan when their holder was filtered out
+        if self.n and not new_mask[self._spd_row]:
+            self._spd_row = int(rows[np.argmax(c.spd_best[rows])])
+        if self.n and not new_mask[self._top_row]:
+            self._top_row = rows[0] if c.score_desc else int(rows[np.argmax(s.score[rows])])
+        return self
+
+    def patched(self, store: RuneStore, remap: np.ndarray, leaving: np.ndarray,
+                entering: np.ndarray) -> 'RuneSummary':
+        """All-rows summary of `store`, a patched copy of this summary's store.
+
+        `leaving` are rows of the old store that were removed or changed, `entering` rows of the
+        new store that were added or changed, `remap` old row -> new row. Only those rows are
+        counted; a filtered summary just recomputes.
+        """
+        if self.n != len(self.store):
+            return RuneSummary(store)
+        old_s, old_c = self.store, self.cols
+        out = RuneSummary.__new__(RuneSummary)
+        out.store, out.cols = store, _store_cols(store)
+        c = out.cols
+        leaving, entering = np.asarray(leaving, np.intp), np.asarray(entering, np.intp)
+        out.rows = np.arange(len(store)); out.mask = np.ones(len(store), bool)
+        out.n = len(store)
+        out.eq = self.eq - int(old_s.equipped[leaving].sum()) + int(store.equipped[entering].sum())
+        out.grade_sum = (self.grade_sum - int(old_s.grade[leaving].sum(dtype=np.int64))
+                         + int(store.grade[entering].sum(dtype=np.int64)))
+        out.level_sum = (self.level_sum - int(old_s.level[leaving].sum(dtype=np.int64))
+                         + int(store.level[entering].sum(dtype=np.int64)))
+        n_sets, n_slots = max(c.n_sets, len(self.set_counts)), max(c.n_slots, len(self.slot_counts))
+        pad = lambda a, n: np.pad(a, (0, n - len(a)))
+        out.set_counts = (pad(self.set_counts, n_sets)
+                          - np.bincount(old_s.set_id[leaving].astype(np.intp), minlength=n_sets)
+                          + np.bincount(store.set_id[entering].astype(np.intp), minlength=n_sets))
+        out.slot_counts = (pad(self.slot_counts, n_slots)
+                           - np.bincount(old_s.slot[leaving].astype(np.intp), minlength=n_slots)
+                           + np.bincount(store.slot[entering].astype(np.intp), minlength=n_slots))
+        out.spd_sub_count = self.spd_sub_count - int(old_c.spd_sub[leaving].sum()) + int(c.spd_sub[entering].sum())
+        out.score_sum = self.score_sum - float(old_s.score[leaving].sum()) + float(store.score[entering].sum())
+        # extremes: keep the old holder unless it left, then let the entering rows challenge it
+        gone = np.zeros(len(old_s), bool); gone[leaving] = True
+        for attr, key in (('_spd_row', c.spd_best), ('_top_row', store.score)):
+            held = getattr(self, attr)
+            if not out.n:
+                setattr(out, attr, -1)
+            elif held < 0 or gone[held]:
+                setattr(out, attr, int(np.argmax(key)))
+            else:
+                best = int(remap[held])
+                if len(entering):
+                    cand = int(entering[np.argmax(key[entering])])
+                    if key[cand] > key[best] or (key[cand] == key[best] and cand < best): best = cand
+                setattr(out, attr, best)
+        return out
+
+    def _p95(self) -> float:
+        """pandas-style (linear) 0.95 quantile of the row scores."""
+        n = self.n
+        h = (n - 1) * 0.95
+        lo = int(np.floor(h)); hi = min(lo + 1, n - 1)
+        if self.cols.score_desc:  # ascending rank i is row position n-1-i
+            a_lo = self.store.score[self.rows[n - 1 - lo]]
+            a_hi = self.store.score[self.rows[n - 1 - hi]]
+        else:
+            part = np.partition(self.store.score[self.rows], [lo, hi])
+            a_lo, a_hi = part[lo], part[hi]
+        return float(a_lo + (h - lo) * (a_hi - a_lo))
+
+    def lines(self) -> tuple[str,str,str,str]:
+        s, n = self.store, self.n
+        if not n:
+            return ('No runes','','','')
+        eq = self.eq
+        uneq = n - eq
+        eq_pct = (eq / n) * 100 if n else 0.0
+        avg_grade = self.grade_sum / n
+        avg_lvl   = self.level_sum / n
+
+        nz = np.flatnonzero(self.set_counts)
+        top = sorted(nz.tolist(), key=lambda sid: (-int(self.set_counts[sid]), SET.get(sid, f"Set{sid}")))[:5]
+        top_sets_str = ' | '.join(f'{SET.get(sid, f"Set{sid}")}: {int(self.set_counts[sid])}' for sid in top)
+
+        slots_str = ' '.join(f'{k}:{int(self.slot_counts[k])}' for k in [1,2,3,4,5,6])
+
+        spd_max = int(self.cols.spd_best[self._spd_row])
+        avg_score = self.score_sum / n
+        p95_score = self._p95() if n >= 2 else avg_score
+        t = self._top_row
+        top_desc = f"#{int(s.rune_id[t])} {s.set_names()[t]} s{int(s.slot[t])} +{int(s.level[t])} (score {s.score[t]:.1f})"
+
+        line1 = f'Total: {n}   |   Equipped: {eq} ({eq_pct:.1f}%) / Unequipped: {uneq}   |   Avg ★: {avg_grade:.2f}   Avg +: {avg_lvl:.2f}'
+        line2 = f'Top sets: {top_sets_str}'
+        line3 = f'Slots: {slots_str}   |   Fastest SPD: +{spd_max}   |   Runes w/ SPD sub: {self.spd_sub_count}'
+        line4 = f'Avg score: {avg_score:.1f}   |   p95: {p95_score:.1f}   |   Top: {top_desc}'
+        return (line1, line2, line3, line4)
+
+
+def summary_lines(store: RuneStore, rows: np.ndarray | None = None) -> tuple[str,str,str,str]:
+    """Summary card text for `rows` of `store` (all rows when None)."""
+    return RuneSummary(store, rows).lines()
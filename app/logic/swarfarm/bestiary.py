@@ -0,0 +1,169 @@
+# app/logic/swarfarm/bestiary.py
+"""Offline bestiary: the whole SWARFARM monster catalog as one fixed-width table.
+
+Build once (from the API or a dump file), then every name/stat/awakening/image lookup is a
+searchsorted into a memory-mapped .npy, with no network:
+
+    python -m app.logic.swarfarm.bestiary                 # page through the SWARFARM API
+    python -m app.logic.swarfarm.bestiary monsters.json   # import a dump (list, page, or list of pages)
+"""
+from pathlib import Path
+import json, os, sys, threading, time
+import numpy as np
+
+from app.config import BESTIARY_DIR
+
+TABLE = 'monsters.npy'      # sorted by com2us_id
+BY_ID = 'by_id.npy'         # row order sorted by SWARFARM internal id
+META = 'meta.json'
+BUNDLE_VERSION = 1
+
+# base stat column -> SWARFARM API field
+STAT_FIELDS = {'hp': 'max_lvl_hp', 'atk': 'max_lvl_attack', 'def': 'max_lvl_defense', 'spd': 'speed',
+               'crit_rate': 'crit_rate', 'crit_dmg': 'crit_damage', 'resistance': 'resistance',
+               'accuracy': 'accuracy'}
+_TEXT_FIELDS = {'name': 48, 'image_filename': 64, 'bestiary_slug': 64}
+
+DTYPE = np.dtype(
+    [('com2us_id', '<i8'), ('id', '<i4'), ('awakens_from', '<i4'), ('awakens_to', '<i4')]
+    + [(k, '<i4') for k in STAT_FIELDS]
+    + [(k, f'S{n}') for k, n in _TEXT_FIELDS.items()]
+)
+
+
+def _int(v) -> int:
+    if isinstance(v, dict):  # some dumps nest related monsters
+        v = v.get('id') or v.get('pk')
+    try:
+        return int(v or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _text(v, width: int) -> bytes:
+    return str(v or '').encode('utf-8')[:width].decode('utf-8', 'ignore').encode('utf-8')
+
+
+def _decode(b: bytes) -> str:
+    return b.decode('utf-8', 'ignore')
+
+
+def build_table(monsters: list[dict]) -> np.ndarray:
+    """Structured array for raw /monsters/ records (deduped on com2us_id, sorted by it)."""
+    seen: set[int] = set()
+    rows = []
+    for m in monsters:
+        cid = _int(m.get('com2us_id'))
+        if not cid or cid in seen:
+            continue
+        seen.add(cid)
+        rows.append((cid, _int(m.get('id') or m.get('pk')), _int(m.get('awakens_from')), _int(m.get('awakens_to')),
+                     *(_int(m.get(f)) for f in STAT_FIELDS.values()),
+                     *(_text(m.get(k), n) for k, n in _TEXT_FIELDS.items())))
+    table = np.array(rows, dtype=DTYPE)
+    return table[np.argsort(table['com2us_id'], kind='stable')]
+
+
+def write_bundle(table: np.ndarray, source: str, out_dir: Path = BESTIARY_DIR) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    by_id = np.argsort(table['id'], kind='stable').astype(np.int32)
+    for name, arr in ((TABLE, table), (BY_ID, by_id)):
+        tmp = out_dir / f'{name}.tmp'
+        with open(tmp, 'wb') as fh:
+            np.save(fh, arr, allow_pickle=False)
+        os.replace(tmp, out_dir / name)
+    meta = {'version': BUNDLE_VERSION, 'count': int(len(table)), 'source': source, 'built': int(time.time())}
+    (out_dir / META).write_text(json.dumps(meta), encoding='utf-8')
+    return out_dir
+
+
+def _records_from_dump(data) -> list[dict]:
+    """Monster dicts from a /monsters/ dump: a bare list, one page, or a list of pages."""
+    if isinstance(data, dict):
+        return list(data.get('results') or [])
+    out = []
+    for item in data or []:
+        if isinstance(item, dict) and 'results' in item:
+            out.extend(item.get('results') or [])
+        elif isinstance(item, dict):
+            out.append(item)
+    return out
+
+
+def import_dump(path: Path, out_dir: Path = BESTIARY_DIR) -> Path:
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+    return write_bundle(build_table(_records_from_dump(data)), f'file:{Path(path).name}', out_dir)
+
+
+def download(out_dir: Path = BESTIARY_DIR) -> Path:
+    """Page through /monsters/ (first page to size it, the rest concurrently) and write the bundle."""
+    from app.logic.swarfarm.client import swarfarm
+    client = swarfarm()
+    first = client.submit('monsters/', {'page': 1}).result()
+    monsters = list(first.get('results') or [])
+    per_page = max(len(monsters), 1)
+    pages = (int(first.get('count') or 0) + per_page - 1) // per_page
+    futs = [client.submit('monsters/', {'page': n}) for n in range(2, pages + 1)]
+    for n, fut in enumerate(futs, start=2):
+        monsters.extend(fut.result().get('results') or [])
+        print(f'[bestiary] page {n}/{pages}', end='\r')
+    return write_bundle(build_table(monsters), client.base_url, out_dir)
+
+
+class Bestiary:
+    """Read-only view over a built bundle; the table is memory-mapped, not loaded."""
+
+    def __init__(self, bundle_dir: Path = BESTIARY_DIR):
+        self.table = np.load(bundle_dir / TABLE, mmap_mode='r', allow_pickle=False)
+        self._by_id = np.load(bundle_dir / BY_ID, allow_pickle=False)
+        self._ids = np.asarray(self.table['id'])[self._by_id]
+        self._cids = np.asarray(self.table['com2us_id'])
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def rows(self, com2us_ids) -> np.ndarray:
+        """Row index per com2us_id, -1 where the bundle doesn't know the monster."""
+        q = np.asarray(com2us_ids, dtype=np.int64)
+        if not len(self._cids):
+            return np.full(len(q), -1, dtype=np.intp)
+        i = np.minimum(np.searchsorted(self._cids, q), len(self._cids) - 1)
+        return np.where(self._cids[i] == q, i, -1)
+
+    def _row_by_id(self, internal_id: int) -> int:
+        i = int(np.searchsorted(self._ids, internal_id))
+        return int(self._by_id[i]) if i < len(self._ids) and self._ids[i] == internal_id else -1
+
+    def record(self, row: int) -> dict:
+        r = self.table[row]
+        out = {k: int(r[k]) for k in ('com2us_id', 'id', 'awakens_from', 'awakens_to', *STAT_FIELDS)}
+        out.update({k: _decode(r[k]) for k in _TEXT_FIELDS})
+        return out
+
+    def by_com2us(self, com2us_id: int) -> dict | None:
+        row = int(self.rows([com2us_id])[0])
+        return self.record(row) if row >= 0 else None
+
+    def by_internal_id(self, internal_id: int) -> dict | None:
+        row = self._row_by_id(int(internal_id))
+        return self.record(row) if row >= 0 else None
+
+
+_bestiary: Bestiary | None = None
+_bestiary_lock = threading.Lock()
+
+def bestiary() -> Bestiary | None:
+    """The local bundle if one has been built, else None (callers fall back to the API)."""
+    global _bestiary
+    with _bestiary_lock:
+        if _bestiary is None and (BESTIARY_DIR / TABLE).exists() and (BESTIARY_DIR / BY_ID).exists():
+            try:
+                _bestiary = Bestiary()
+            except Exception as e:
+                print(f'[bestiary] bundle unreadable, ignoring: {e}')
+        return _bestiary
+
+
+if __name__ == '__main__':
+    out = import_dump(Path(sys.argv[1])) if len(sys.argv) > 1 else download()
+    print(f'[bestiary] wrote {json.loads((out / META).read_text())["count"]} monsters to {out}')
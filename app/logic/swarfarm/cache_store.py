@@ -0,0 +1,118 @@
+# app/logic/swarfarm/cache_store.py
+from pathlib import Path
+import json, sqlite3, threading
+
+from app.config import SWARFARM_DB, SWARFARM_CACHE
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS monsters (com2us_id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+'''
+_MISSING = object()
+
+
+class SwarfarmCache:
+    """Per-monster SWARFARM records in SQLite (WAL), with an in-process read-through layer.
+
+    Lookups hit memory first, then one primary-key SELECT. `merge` upserts a single record
+    inside an IMMEDIATE transaction, so concurrent writers can't drop each other's fields.
+    """
+
+    def __init__(self, db_path: Path = SWARFARM_DB, legacy_json: Path | None = SWARFARM_CACHE):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._mem: dict[int, dict | None] = {}
+        self._lock = threading.Lock()
+        con = self._con()
+        con.executescript(_SCHEMA)
+        if legacy_json is not None:
+            self._migrate(legacy_json)
+
+    def _con(self) -> sqlite3.Connection:
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            con.execute('PRAGMA journal_mode=WAL')
+            con.execute('PRAGMA synchronous=NORMAL')
+            self._local.con = con
+        return con
+
+    def _migrate(self, legacy_json: Path) -> None:
+        """One-time import of the old whole-file swarfarm_monsters.json."""
+        con = self._con()
+        if con.execute("SELECT 1 FROM meta WHERE key='migrated_json'").fetchone():
+            return
+        rows = []
+        if legacy_json.exists():
+            try:
+                raw = json.loads(legacy_json.read_text(encoding='utf-8'))
+                rows = [(int(k), json.dumps(v, ensure_ascii=False)) for k, v in raw.items()]
+            except Exception as e:
+                print(f'[swarfarm cache] legacy json unreadable, skipping migration: {e}')
+        con.execute('BEGIN IMMEDIATE')
+        try:
+            con.executemany('INSERT OR IGNORE INTO monsters (com2us_id, data) VALUES (?, ?)', rows)
+            con.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_json', ?)", (str(len(rows)),))
+            con.execute('COMMIT')
+        except Exception:
+            con.execute('ROLLBACK'); raise
+        if rows:
+            print(f'[swarfarm cache] migrated {len(rows)} records from {legacy_json.name}')
+
+    # ---- reads ----
+    def get(self, com2us_id: int) -> dict | None:
+        cid = int(com2us_id)
+        with self._lock:
+            rec = self._mem.get(cid, _MISSING)
+        if rec is _MISSING:
+            row = self._con().execute('SELECT data FROM monsters WHERE com2us_id=?', (cid,)).fetchone()
+            rec = json.loads(row[0]) if row else None
+            with self._lock:
+                self._mem[cid] = rec
+        return dict(rec) if rec is not None else None
+
+    def get_many(self, com2us_ids) -> dict[int, dict]:
+        """{com2us_id: record} for the ids that have one."""
+        out = {}
+        for cid in {int(x) for x in com2us_ids}:
+            rec = self.get(cid)
+            if rec is not None:
+                out[cid] = rec
+        return out
+
+    # ---- writes ----
+    def merge(self, com2us_id: int, fields: dict) -> dict:
+        """Upsert: shallow-merge `fields` into the stored record, touching only that row."""
+        return self.merge_many({int(com2us_id): fields})[int(com2us_id)]
+
+    def merge_many(self, records: dict[int, dict]) -> dict[int, dict]:
+        con = self._con()
+        out = {}
+        con.execute('BEGIN IMMEDIATE')
+        try:
+            for cid, fields in records.items():
+                cid = int(cid)
+                row = con.execute('SELECT data FROM monsters WHERE com2us_id=?', (cid,)).fetchone()
+                rec = {**(json.loads(row[0]) if row else {}), **fields}
+                con.execute('INSERT INTO monsters (com2us_id, data) VALUES (?, ?) '
+                            'ON CONFLICT(com2us_id) DO UPDATE SET data=excluded.data',
+                            (cid, json.dumps(rec, ensure_ascii=False)))
+                out[cid] = rec
+            con.execute('COMMIT')
+        except Exception:
+            con.execute('ROLLBACK'); raise
+        with self._lock:
+            self._mem.update(out)
+        return out
+
+
+_cache: SwarfarmCache | None = None
+_cache_lock = threading.Lock()
+
+def swarfarm_cache() -> SwarfarmCache:
+    """Process-wide store (opened, and migrated if needed, on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SwarfarmCache()
+        return _cache
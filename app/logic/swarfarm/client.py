@@ -0,0 +1,125 @@
+# app/logic/swarfarm/client.py
+from concurrent.futures import ThreadPoolExecutor, Future
+import random, threading, time
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import SWARFARM_API
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class SwarfarmClient:
+    """Shared SWARFARM API client.
+
+    One keep-alive session (pooled connections), at most `max_workers` requests in flight,
+    retry with backoff that honours Retry-After on 429/503, and coalescing: concurrent
+    callers asking for the same resource share a single request.
+    """
+
+    def __init__(self, base_url: str = SWARFARM_API, max_workers: int = 8, timeout: float = 10,
+                 retries: int = 4, backoff: float = 0.5):
+        self.base_url = base_url.rstrip('/')
+        self.timeout, self.retries, self.backoff = timeout, retries, backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = 'SummonersWarMaster'
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='swarfarm')
+        self._inflight: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    # ---- low level ----
+    def _get(self, url: str, params: dict | None = None) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+                if r.status_code in _RETRY_STATUS and attempt < self.retries:
+                    time.sleep(self._delay(attempt, r.headers.get('Retry-After')))
+                    continue
+                r.raise_for_status()
+                return r
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries: raise
+                time.sleep(self._delay(attempt, None))
+        raise RuntimeError(f'unreachable: {url}')
+
+    def _get_json(self, path: str, params: dict | None = None) -> dict:
+        return self._get(f'{self.base_url}/{path.lstrip("/")}', params).json()
+
+    def _get_bytes(self, url: str) -> bytes:
+        return self._get(url).content
+
+    def _delay(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def submit(self, path: str, params: dict | None = None) -> Future:
+        """GET `path` on the pool; identical requests already in flight are shared."""
+        return self._coalesce((path, tuple(sorted((params or {}).items()))), self._get_json, path, params)
+
+    def submit_bytes(self, url: str) -> Future:
+        """Download an absolute URL (e.g. a static portrait) on the same pool and session."""
+        return self._coalesce(('bytes', url), self._get_bytes, url)
+
+    def _coalesce(self, key: tuple, fn, *args) -> Future:
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut
+            fut = self._pool.submit(fn, *args)
+            self._inflight[key] = fut
+        # outside the lock: a future that is already done runs the callback inline
+        fut.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return fut
+
+    def _forget(self, key: tuple, fut: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    # ---- monsters endpoint ----
+    def by_com2us(self, com2us_id: int) -> dict:
+        """First /monsters/ result for this com2us_id, or {}."""
+        return self._first(self.submit('monsters/', {'com2us_id': int(com2us_id)}), com2us_id) or {}
+
+    def by_internal_id(self, internal_id: int) -> dict:
+        """/monsters/<internal_id>/, or {}."""
+        try:
+            return self.submit(f'monsters/{int(internal_id)}/').result()
+        except Exception as e:
+            print(f"[api] by internal id failed {internal_id}: {e}")
+            return {}
+
+    def many_by_com2us(self, com2us_ids) -> dict[int, dict | None]:
+        """{com2us_id: monster, {} if unknown, None if the request failed}, fetched concurrently."""
+        futs = {int(cid): self.submit('monsters/', {'com2us_id': int(cid)}) for cid in com2us_ids}
+        return {cid: self._first(f, cid) for cid, f in futs.items()}
+
+    @staticmethod
+    def _first(fut: Future, com2us_id) -> dict | None:
+        try:
+            data = fut.result()
+        except Exception as e:
+            print(f"[api] by com2us failed {com2us_id}: {e}")
+            return None
+        if data and data.get('count', 0) >= 1:
+            return data['results'][0]
+        return {}
+
+
+_client: SwarfarmClient | None = None
+_client_lock = threading.Lock()
+
+def swarfarm() -> SwarfarmClient:
+    """Process-wide client (created on first use)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SwarfarmClient()
+        return _client
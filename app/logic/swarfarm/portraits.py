@@ -0,0 +1,119 @@
+# app/logic/swarfarm/portraits.py
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlparse
+import os, re, threading
+
+from app.config import PORTRAIT_DIR
+from app.logic.swarfarm.client import swarfarm
+
+PORTRAIT_URL = '/portraits'        # static route the apps mount PORTRAIT_DIR on
+PORTRAIT_MAX_AGE = 30 * 86400      # Cache-Control max-age; a filename never changes content
+MAX_PORTRAIT_BYTES = 128 * 1024 * 1024
+_unsafe = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+class PortraitCache:
+    """Monster portraits downloaded once into a size-bounded LRU directory.
+
+    Files are named after the remote image filename and served as static files, so a
+    page view costs a disk read instead of a swarfarm.com round-trip. Recency is the
+    file mtime (touched on every hit), like the profile cache.
+    """
+
+    def __init__(self, root: Path = PORTRAIT_DIR, max_bytes: int = MAX_PORTRAIT_BYTES):
+        self.root, self.max_bytes = root, max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total = sum(de.stat().st_size for de in os.scandir(root) if de.is_file())
+
+    @staticmethod
+    def file_name(remote_url: str) -> str:
+        return _unsafe.sub('_', Path(urlparse(remote_url).path).name)
+
+    def cached_url(self, remote_url: str) -> str | None:
+        """Local URL if the portrait is already on disk (marks it recently used)."""
+        name = self.file_name(remote_url)
+        p = self.root / name
+        try:
+            os.utime(p)
+        except OSError:
+            return None
+        return f'{PORTRAIT_URL}/{name}'
+
+    def local_url(self, remote_url: str) -> str:
+        """Local URL for a portrait, downloading it first on a miss; the remote URL if that fails."""
+        if not remote_url:
+            return ''
+        return self.cached_url(remote_url) or self.fetch(remote_url) or remote_url
+
+    def fetch(self, remote_url: str) -> str | None:
+        try:
+            data = swarfarm().submit_bytes(remote_url).result()
+        except Exception as e:
+            print(f'[portraits] download failed {remote_url}: {e}')
+            return None
+        name = self.file_name(remote_url)
+        self._store(name, data)
+        return f'{PORTRAIT_URL}/{name}'
+
+    def prefetch(self, remote_urls, batch: int = 4, before_batch: Callable[[], None] | None = None) -> int:
+        """Download the ones not on disk yet, `batch` at a time on the shared client; returns how many.
+
+        Small batches leave pool capacity for interactive downloads, and the first failing batch
+        ends the run so an unreachable host doesn't queue dozens of retrying requests.
+        `before_batch` is a cancellation point (e.g. Job.check).
+        """
+        todo = [u for u in dict.fromkeys(remote_urls) if u and self.cached_url(u) is None]
+        done = 0
+        for i in range(0, len(todo), batch):
+            if before_batch is not None:
+                before_batch()
+            futs = {u: swarfarm().submit_bytes(u) for u in todo[i:i + batch]}
+            failed = False
+            for u, fut in futs.items():
+                try:
+                    self._store(self.file_name(u), fut.result())
+                    done += 1
+                except Exception as e:
+                    print(f'[portraits] prefetch failed {u}: {e}')
+                    failed = True
+            if failed:
+                break
+        return done
+
+    def _store(self, name: str, data: bytes) -> None:
+        p = self.root / name
+        tmp = p.with_name(f'{name}.{threading.get_ident()}.tmp')
+        tmp.write_bytes(data)
+        with self._lock:
+            old = p.stat().st_size if p.exists() else 0
+            os.replace(tmp, p)
+            self._total += len(data) - old
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Oldest-used first until back under max_bytes (called with the lock held)."""
+        entries = sorted((de.stat().st_mtime, de.stat().st_size, de.path)
+                         for de in os.scandir(self.root) if de.is_file() and not de.name.endswith('.tmp'))
+        for _, size, path in entries:
+            if self._total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._total -= size
+            except OSError:
+                pass
+
+
+_cache: PortraitCache | None = None
+_cache_lock = threading.Lock()
+
+def portrait_cache() -> PortraitCache:
+    """Process-wide portrait cache (created on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PortraitCache()
+        return _cache
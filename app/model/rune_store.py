@@ -0,0 +1,152 @@
+# app/model/rune_store.py
+from dataclasses import dataclass, fields
+from functools import cached_property
+import numpy as np
+import pandas as pd
+
+from app.model.runes import SET, STAT, N_STAT_COLS
+
+# eff layout: (type, value) pairs for main, innate, sub1..sub4 -> 12 int16 columns
+EFF_MAIN, EFF_INNATE, EFF_SUBS = 0, 1, (2, 3, 4, 5)
+N_EFF = 6
+_POPCOUNT = np.array([bin(i).count('1') for i in range(16)], np.int8)
+
+
+def _stat_matrix(eff: np.ndarray, which) -> np.ndarray:
+    """Scatter the (type, value) pairs of the given effect positions into a per-stat matrix."""
+    n = len(eff)
+    out = np.zeros((n, N_STAT_COLS), np.int16)
+    rows = np.arange(n)
+    for k in which:
+        t = eff[:, 2 * k].astype(np.intp)
+        v = eff[:, 2 * k + 1]
+        has = t > 0
+        out[rows[has], t[has] - 1] += v[has]
+    return out
+
+
+@dataclass(eq=False)
+class RuneStore:
+    """Columnar rune inventory: one row per rune, numeric arrays only.
+
+    Display strings are built on demand for the rows being shown (see `records`).
+    """
+    rune_id: np.ndarray   # int64
+    slot: np.ndarray      # int8
+    set_id: np.ndarray    # int16
+    grade: np.ndarray     # int8 (rune 'class')
+    level: np.ndarray     # int8 (upgrade_curr)
+    unit_id: np.ndarray   # int64, 0 = unequipped
+    eff: np.ndarray       # N x 12 int16, see EFF_* above
+    score: np.ndarray     # float64
+    gem_mask: np.ndarray  # uint8, bit k = sub k was gemmed (enchanted)
+    grind_mask: np.ndarray  # uint8, bit k = sub k has a grind applied
+
+    def __len__(self) -> int:
+        return len(self.rune_id)
+
+    @classmethod
+    def empty(cls) -> 'RuneStore':
+        z = lambda dt: np.zeros(0, dt)
+        return cls(z(np.int64), z(np.int8), z(np.int16), z(np.int8), z(np.int8), z(np.int64),
+                   np.zeros((0, 2 * N_EFF), np.int16), z(np.float64), z(np.uint8), z(np.uint8))
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays) -> 'RuneStore':
+        return cls(**{f.name: np.asarray(arrays[f.name]) for f in fields(cls)})
+
+    def take(self, idx) -> 'RuneStore':
+        idx = np.asarray(idx)
+        return RuneStore(**{f.name: getattr(self, f.name)[idx] for f in fields(self)})
+
+    # ---- per-stat matrices (column = STAT_COL) ----
+    @cached_property
+    def main_stats(self) -> np.ndarray:
+        return _stat_matrix(self.eff, (EFF_MAIN,))
+
+    @cached_property
+    def sub_stats(self) -> np.ndarray:
+        """Innate + substats, i.e. what the rune score looks at."""
+        return _stat_matrix(self.eff, (EFF_INNATE,) + EFF_SUBS)
+
+    @cached_property
+    def total_stats(self) -> np.ndarray:
+        return self.main_stats + self.sub_stats
+
+    @property
+    def equipped(self) -> np.ndarray:
+        return self.unit_id != 0
+
+    @property
+    def gems(self) -> np.ndarray:
+        """Number of gemmed subs per rune (0 or 1 in practice)."""
+        return _POPCOUNT[self.gem_mask & 0xF]
+
+    @property
+    def grinds(self) -> np.ndarray:
+        """Number of ground subs per rune."""
+        return _POPCOUNT[self.grind_mask & 0xF]
+
+    @cached_property
+    def _set_names(self) -> np.ndarray:
+        ids = np.unique(self.set_id)
+        lut = {int(s): SET.get(int(s), f"Set{int(s)}") for s in ids}
+        return np.array([lut[int(s)] for s in self.set_id], dtype=object)
+
+    def set_names(self, rows=None) -> np.ndarray:
+        return self._set_names if rows is None else self._set_names[rows]
+
+    # ---- lazy display ----
+    def _fmt(self, i: int, k: int) -> str:
+        t, v = int(self.eff[i, 2 * k]), int(self.eff[i, 2 * k + 1])
+        if t == 0: return ""
+        return f"{STAT.get(t, f'Type{t}')} +{v}"
+
+    def main_text(self, i: int) -> str:
+        return self._fmt(i, EFF_MAIN)
+
+    def innate_text(self, i: int) -> str:
+        return self._fmt(i, EFF_INNATE)
+
+    def subs_text(self, i: int) -> str:
+        return ', '.join(s for s in (self._fmt(i, k) for k in EFF_SUBS) if s)
+
+    def records(self, rows) -> list[dict]:
+        """Table rows (with formatted stats) for the given row positions only."""
+        out = []
+        for i in np.asarray(rows, dtype=np.intp).tolist():
+            uid = int(self.unit_id[i])
+            out.append({
+                'rune_id': int(self.rune_id[i]),
+                'slot': int(self.slot[i]),
+                'set': self._set_names[i],
+                'grade★': int(self.grade[i]),
+                'level': int(self.level[i]),
+                'main': self.main_text(i),
+                'innate': self.innate_text(i),
+                'subs': self.subs_text(i),
+                'equipped': bool(uid),
+                'equipped_unit_id': uid or '',
+                'unit_id': uid,
+                'score': float(self.score[i]),
+            })
+        return out
+
+    def frame(self) -> pd.DataFrame:
+        """Numeric DataFrame view (no formatted stat strings)."""
+        return pd.DataFrame({
+            'rune_id': self.rune_id,
+            'slot': self.slot,
+            'set_id': self.set_id,
+            'set': self._set_names,
+            'grade★': self.grade,
+            'level': self.level,
+            'equipped': self.equipped,
+            'unit_id': self.unit_id,
+            'score': self.score,
+            'gems': self.gems,
+            'grinds': self.grinds,
+        })
@@ -6,6 +6,9 @@ SET = {
     21:"Enhance",22:"Accuracy",23:"Tolerance",
 }
 STAT = {1:"HP",2:"HP%",3:"ATK",4:"ATK%",5:"DEF",6:"DEF%",8:"SPD",9:"CRI Rate",10:"CRI Dmg",11:"RES",12:"ACC"}
+# stat matrix layout: one column per effect type id (col = type - 1, type 7 is unused)
+N_STAT_COLS = 12
+STAT_COL = {'hp_flat':0,'hp_pct':1,'atk_flat':2,'atk_pct':3,'def_flat':4,'def_pct':5,'spd':7,'cr':8,'cd':9,'res':10,'acc':11}
 SET_REQ = {1:2,2:2,3:4,4:2,5:4,6:2,7:2,8:4,10:4,11:4,13:4,14:2,15:2,16:2,17:2,18:2,19:2,20:2,21:2,22:2,23:2}
 FILENAME_BY_SET = {
         1:'Energy.png', 2:'Guard.png', 3:'Swift.png', 4:'Blade.png', 5:'Rage.png',
@@ -0,0 +1,30 @@
+# app/model/units.py
+from dataclasses import dataclass, fields
+import numpy as np
+
+
+@dataclass(eq=False)
+class UnitTable:
+    """Columnar roster: one row per unit in unit_list."""
+    unit_id: np.ndarray    # int64
+    com2us_id: np.ndarray  # int64 (unit_master_id)
+    grade: np.ndarray      # int8 (class)
+    level: np.ndarray      # int8 (unit_level)
+
+    def __len__(self) -> int:
+        return len(self.unit_id)
+
+    @classmethod
+    def empty(cls) -> 'UnitTable':
+        return cls(np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.int8), np.zeros(0, np.int8))
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays) -> 'UnitTable':
+        return cls(**{f.name: np.asarray(arrays[f.name]) for f in fields(cls)})
+
+    def take(self, idx) -> 'UnitTable':
+        idx = np.asarray(idx)
+        return UnitTable(**{f.name: getattr(self, f.name)[idx] for f in fields(self)})
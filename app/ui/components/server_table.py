@@ -0,0 +1,127 @@
+# app/ui/components/server_table.py
+from typing import Callable
+from nicegui import ui
+import numpy as np
+import pandas as pd
+
+from app.model.rune_store import RuneStore, EFF_MAIN, EFF_INNATE
+
+
+class StoreRowsSource:
+    """Rows `rows` of a RuneStore; sorts on numeric keys, formats only the requested page.
+
+    `extra` adds per-rune columns computed elsewhere (field -> array aligned with the store).
+    """
+
+    def __init__(self, store: RuneStore, rows: np.ndarray, extra: dict[str, np.ndarray] | None = None):
+        self.store, self.rows = store, np.asarray(rows, np.intp)
+        self.extra = extra or {}
+        self._order: dict[tuple[str, bool], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _key(self, col: str):
+        s, r = self.store, self.rows
+        if col == 'set':
+            return (np.unique(s.set_names(r).astype(str), return_inverse=True)[1],)
+        if col in ('main', 'innate'):  # by stat, then value
+            k = EFF_MAIN if col == 'main' else EFF_INNATE
+            return (s.eff[r, 2 * k + 1], s.eff[r, 2 * k])
+        if col in self.extra:
+            return (self.extra[col][r],)
+        arr = {'rune_id': s.rune_id, 'slot': s.slot, 'grade★': s.grade, 'level': s.level,
+               'equipped': s.equipped, 'equipped_unit_id': s.unit_id, 'score': s.score}.get(col)
+        return None if arr is None else (arr[r],)
+
+    def page(self, sort_by: str | None, descending: bool, start: int, stop: int) -> list[dict]:
+        rows = self.rows
+        if sort_by:
+            ck = (sort_by, descending)
+            if ck not in self._order:
+                keys = self._key(sort_by)
+                if keys is None:
+                    self._order[ck] = np.arange(len(rows))
+                else:
+                    keys = tuple(np.asarray(k, np.float64) for k in keys)
+                    self._order[ck] = np.lexsort(tuple(-k for k in keys) if descending else keys)
+            rows = rows[self._order[ck]]
+        rows = rows[start:stop]
+        out = self.store.records(rows)
+        for col, arr in self.extra.items():
+            for rec, v in zip(out, arr[rows].tolist()):
+                rec[col] = v
+        return out
+
+
+class FrameSource:
+    """A DataFrame; sorts with pandas, serializes only the requested page."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._sorted: dict[tuple[str, bool], pd.DataFrame] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def page(self, sort_by: str | None, descending: bool, start: int, stop: int) -> list[dict]:
+        df = self.df
+        if sort_by and sort_by in df.columns:
+            ck = (sort_by, descending)
+            if ck not in self._sorted:
+                self._sorted[ck] = df.sort_values(sort_by, ascending=not descending, kind='stable')
+            df = self._sorted[ck]
+        return df.iloc[start:stop].to_dict(orient='records')
+
+
+class ServerSideTable:
+    """Puts a ui.table in Quasar server-side mode: sorting, paging and row counts happen in
+    Python and only the visible page is sent to the browser. `on_page(rows)` is called with
+    every page sent (e.g. to prefetch what those rows will need next).
+    """
+
+    def __init__(self, table: ui.table, rows_per_page: int = 20,
+                 on_page: Callable[[list[dict]], None] | None = None):
+        self.table = table
+        self.source = None
+        self.on_page = on_page
+        table.pagination = {'page': 1, 'rowsPerPage': rows_per_page, 'rowsNumber': 0,
+                            'sortBy': None, 'descending': False}
+        table.on('request', self._on_request)
+
+    def set_source(self, source, keep_page: bool = False) -> None:
+        """New data: keep the sort; go back to page 1 unless `keep_page` (e.g. a live update)."""
+        self.source = source
+        self._push(self.table.pagination if keep_page else {**self.table.pagination, 'page': 1})
+
+    @property
+    def offset(self) -> int:
+        """Absolute position of the first row on the current page."""
+        p = self.table.pagination
+        return (int(p.get('page') or 1) - 1) * int(p.get('rowsPerPage') or 0)
+
+    def window(self, start: int, stop: int) -> list[dict]:
+        """Rows [start, stop) of the source in the current sort order, regardless of page."""
+        if self.source is None or not len(self.source):
+            return []
+        p = self.table.pagination
+        return self.source.page(self._field(p.get('sortBy')), bool(p.get('descending')), start, stop)
+
+    def _field(self, sort_by: str | None) -> str | None:
+        return next((c['field'] for c in self.table.columns if c['name'] == sort_by), sort_by)
+
+    def _on_request(self, e) -> None:
+        self._push(e.args['pagination'])
+
+    def _push(self, pagination: dict) -> None:
+        total = len(self.source) if self.source is not None else 0
+        per = int(pagination.get('rowsPerPage') or 0) or max(total, 1)  # 0 = 'All'
+        page = max(1, min(int(pagination.get('page') or 1), (total + per - 1) // per or 1))
+        start = (page - 1) * per
+        field = self._field(pagination.get('sortBy'))
+        rows = self.source.page(field, bool(pagination.get('descending')), start, start + per) if total else []
+        self.table.pagination = {**pagination, 'page': page, 'rowsNumber': total}
+        self.table.rows = rows
+        self.table.update()
+        if self.on_page is not None and rows:
+            self.on_page(rows)
@@ -0,0 +1,93 @@
+# app/ui/jobs.py
+import asyncio, os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from typing import Any, Callable
+
+
+class JobCancelled(Exception):
+    """A newer job with the same key superseded this one; the caller should just return."""
+
+
+class Job:
+    """Handle passed to thread jobs: cooperative cancellation + progress back to the page."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, on_progress: Callable[[float, str], Any] | None):
+        self.cancelled = False
+        self._loop = loop
+        self._on_progress = on_progress
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, frac: float, msg: str = '') -> None:
+        """Report progress (0..1) from the worker thread; also a cancellation point."""
+        self.check()
+        if self._on_progress is not None:
+            self._loop.call_soon_threadsafe(self._on_progress, frac, msg)
+
+
+class JobRunner:
+    """Runs heavy work off the event loop, one lane per key.
+
+    Within a lane only the newest job survives: submitting a new one marks the previous one
+    cancelled (stale results are dropped), `debounce` lets rapid input collapse into a single
+    run, and a job never starts while the lane's previous worker is still busy.
+    """
+
+    def __init__(self, workers: int = 4):
+        self._threads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='swm-job')
+        self._procs: ProcessPoolExecutor | None = None
+        self._latest: dict[str, Job] = {}
+        self._busy: dict[str, asyncio.Future] = {}
+
+    def process_pool(self) -> ProcessPoolExecutor:
+        """The shared worker processes (for thread jobs that fan work out themselves)."""
+        if self._procs is None:
+            if os.name == 'posix':
+                # workers then share this process's tracker instead of starting their own, which
+                # would report the shared memory blocks they mapped as leaked when they exit
+                resource_tracker.ensure_running()
+            self._procs = ProcessPoolExecutor()
+        return self._procs
+
+    def active(self, key: str) -> bool:
+        """Whether a job in lane `key` is waiting or running (without touching it)."""
+        return key in self._latest
+
+    async def run(self, key: str, fn: Callable, *args, debounce: float = 0.0,
+                  on_progress: Callable[[float, str], Any] | None = None, process: bool = False):
+        """Run `fn(job, *args)` in the thread pool (or `fn(*args)` in the process pool) and
+        return its result; raises JobCancelled if superseded before or while it ran.
+
+        Process jobs must be picklable top-level functions and get no Job handle.
+        """
+        loop = asyncio.get_running_loop()
+        job = Job(loop, on_progress)
+        prev = self._latest.get(key)
+        if prev is not None:
+            prev.cancelled = True
+        self._latest[key] = job
+        try:
+            if debounce:
+                await asyncio.sleep(debounce)
+            job.check()
+            busy = self._busy.get(key)
+            if busy is not None and not busy.done():
+                await asyncio.wait([busy])
+            job.check()
+            if process:
+                fut = loop.run_in_executor(self.process_pool(), fn, *args)
+            else:
+                fut = loop.run_in_executor(self._threads, fn, job, *args)
+            self._busy[key] = fut
+            result = await fut
+            job.check()
+            return result
+        finally:
+            if self._latest.get(key) is job:
+                del self._latest[key]
+
+
+JOBS = JobRunner()
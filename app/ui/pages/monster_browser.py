@@ -0,0 +1,745 @@
+# app/ui/pages/monster_browser.py
+from nicegui import ui, app, background_tasks
+from pathlib import Path
+import json, os, time, re
+import numpy as np
+import pandas as pd
+
+from app.config import ICONS_DIR, MONSTER_NAME_MAP
+from app.logic.data_loading.profiles import find_profiles, read_wizard_info
+from app.logic.data_loading.normalizer import load_profile_tables
+from app.logic.data_loading.snapshot_diff import diff_stores, diff_units, patch_store
+from app.logic.data_loading.watcher import export_watcher
+from app.logic.swarfarm.client import swarfarm
+from app.logic.swarfarm.cache_store import swarfarm_cache
+from app.logic.swarfarm.bestiary import bestiary
+from app.logic.swarfarm.portraits import portrait_cache, PORTRAIT_URL, PORTRAIT_MAX_AGE
+from app.ui.components.server_table import ServerSideTable, FrameSource
+from app.ui.jobs import JOBS, Job, JobCancelled
+from app.model.runes import STAT, SET
+from app.model.rune_store import RuneStore
+from app.model.units import UnitTable
+from app.logic.calc.unit_stats import FINAL_STATS
+from app.logic.data_loading.monsters import SET_ICON_URL, set_icon_paths, build_monster_frame
+from app.logic.calc.optimizer import BuildSpec, check_spec, optimize
+from app.logic.calc.batch_optimizer import BatchItem, optimize_batch
+from app.logic.calc.rune_calc import WEIGHT_PROFILES
+
+app.add_static_files(SET_ICON_URL, str(ICONS_DIR.resolve()))
+app.add_static_files(PORTRAIT_URL, str(portrait_cache().root.resolve()), max_cache_age=PORTRAIT_MAX_AGE)
+print('[icons] mapped sets:', sorted(set_icon_paths().keys()))
+
+# ---------- SWARFARM helpers ----------
+_slugify_re = re.compile(r'[^a-z0-9]+')
+
+def swarfarm_bestiary_url(com2us_id: int, name: str | None = None) -> str:
+    """SWARFARM bestiary uses /bestiary/<com2us_id>-<slug>/, not just the id."""
+    if name:
+        slug = _slugify_re.sub('-', (name or '').lower()).strip('-')
+        return f'https://swarfarm.com/bestiary/{int(com2us_id)}-{slug}/'
+    # No name? We'll still return the id-only form (likely 404) so caller can try other strategies.
+    return f'https://swarfarm.com/bestiary/{int(com2us_id)}/'
+
+
+_slug_like_path = re.compile(r'^\d{3,}-[a-z0-9-]+/?$', re.I)
+
+def _bestiary_url_via_api(com2us_id: int) -> str:
+    """Return a valid SWARFARM bestiary URL for this monster.
+
+    Handles cases where the API already returns a full '<id>-<slug>' path.
+    """
+    try:
+        m = swarfarm().by_com2us(com2us_id)
+        if m:
+            # Prefer any explicit URL the API gives us.
+            url = (m.get("bestiary_url") or m.get("url") or "").strip()
+            if url:
+                if url.startswith("/"):
+                    return "https://swarfarm.com" + url
+                if url.startswith("http"):
+                    return url
+
+            # Otherwise, use a slug-ish field.
+            for key in ("bestiary_slug", "slug", "name_slug"):
+                slug = (m.get(key) or "").strip().strip("/")
+                if not slug:
+                    continue
+                # If slug already looks like '12345-some-monster', don't prepend an id.
+                if _slug_like_path.match(slug):
+                    return f"https://swarfarm.com/bestiary/{slug}/"
+
+                # If slug is just 'some-monster', prepend the *API’s* com2us_id (not our input).
+                api_id = int(m.get("com2us_id") or com2us_id)
+                return f"https://swarfarm.com/bestiary/{api_id}-{slug}/"
+
+            # Last-resort: fall back to API’s id with no slug (may 404 for some)
+            api_id = int(m.get("com2us_id") or com2us_id)
+            return f"https://swarfarm.com/bestiary/{api_id}/"
+
+    except Exception:
+        pass
+
+    # Final fallback if API lookup fails entirely
+    return f"https://swarfarm.com/bestiary/{int(com2us_id)}/"
+
+
+def fetch_monster_image_lazy(com2us_id: int) -> str:
+    """Fetch portrait directly via SWARFARM API's image_filename field."""
+    bundle = bestiary()
+    if bundle is not None:
+        return _img_from_filename((bundle.by_com2us(com2us_id) or {}).get('image_filename', ''))
+    rec = swarfarm_cache().get(com2us_id) or {}
+    if rec.get('image_url'):
+        return rec['image_url']
+
+    try:
+        # Look up by com2us_id; fall back to the direct endpoint
+        m = swarfarm().by_com2us(com2us_id) or swarfarm().by_internal_id(com2us_id)
+
+        image_name = (
+            m.get("image_filename")
+            or m.get("image_file_name")  # in case of legacy key
+            or ""
+        ).strip()
+
+        if image_name:
+            imgurl = f"https://swarfarm.com/static/herders/images/monsters/{image_name}"
+            swarfarm_cache().merge(com2us_id, {"image_url": imgurl})
+            print(f"[image fetch] cached {com2us_id} → {imgurl}")
+            return imgurl
+
+        print(f"[image fetch] no image filename for {com2us_id}")
+        return ""
+
+    except Exception as e:
+        print(f"[image fetch] failed for {com2us_id}: {e}")
+        return ""
+
+
+
+# ---------- profile I/O ----------
+_name_map_cache = None
+def monster_name(master_id: int) -> str:
+    global _name_map_cache
+    bundle = bestiary()
+    if bundle is not None and (m := bundle.by_com2us(master_id)):
+        return m['name']
+    if _name_map_cache is None:
+        if MONSTER_NAME_MAP.exists():
+            try:
+                _name_map_cache = {int(k):v for k,v in json.loads(MONSTER_NAME_MAP.read_text(encoding='utf-8')).items()}
+            except Exception:
+                _name_map_cache = {}
+        else:
+            _name_map_cache = {}
+    return _name_map_cache.get(int(master_id), f"ID:{master_id}")
+
+
+def _api_get_by_com2us(com2us_id: int) -> dict:
+    """Return the first /api/v2/monsters/ result for this com2us_id (or {})."""
+    return swarfarm().by_com2us(com2us_id)
+
+def _api_get_by_internal_id(internal_id: int) -> dict:
+    """Return /api/v2/monsters/<internal_id>/ (or {})."""
+    return swarfarm().by_internal_id(internal_id)
+
+def _img_from_filename(filename: str) -> str:
+    filename = (filename or "").strip()
+    return f"https://swarfarm.com/static/herders/images/monsters/{filename}" if filename else ""
+
+def resolve_unawakened_and_awakened(com2us_id: int) -> dict:
+    """
+    Return {'base': {'name','com2us_id','img'}, 'awakened': {...}}
+    using awakens_from / awakens_to from the offline bundle when built (no network),
+    else from the API with results cached.
+    """
+    bundle = bestiary()
+    if bundle is not None:
+        by_com2us = lambda c: bundle.by_com2us(c) or {}
+        by_internal_id = lambda i: bundle.by_internal_id(i) or {}
+    else:
+        rec = swarfarm_cache().get(com2us_id) or {}
+        if rec.get("pair_cached"):
+            return rec["pair_cached"]
+        by_com2us, by_internal_id = _api_get_by_com2us, _api_get_by_internal_id
+
+    cur = by_com2us(com2us_id)
+    if not cur:
+        return {'base': None, 'awakened': None}
+
+    cur_form = {
+        'name': cur.get('name', f'ID:{cur.get("com2us_id", com2us_id)}'),
+        'com2us_id': cur.get('com2us_id', com2us_id),
+        'img': _img_from_filename(cur.get('image_filename') or cur.get('image_file_name') or ''),
+    }
+
+    base_form, awak_form = None, None
+
+    if cur.get('awakens_from'):   # current is awakened → fetch base
+        b = by_internal_id(int(cur['awakens_from']))
+        base_form = {
+            'name': b.get('name', f'ID:{b.get("com2us_id","?")}'),
+            'com2us_id': b.get('com2us_id', 0),
+            'img': _img_from_filename(b.get('image_filename') or b.get('image_file_name') or ''),
+        }
+        awak_form = cur_form
+
+    elif cur.get('awakens_to'):   # current is base → fetch awakened
+        a = by_internal_id(int(cur['awakens_to']))
+        awak_form = {
+            'name': a.get('name', f'ID:{a.get("com2us_id","?")}'),
+            'com2us_id': a.get('com2us_id', 0),
+            'img': _img_from_filename(a.get('image_filename') or a.get('image_file_name') or ''),
+        }
+        base_form = cur_form
+    else:
+        base_form = cur_form
+        awak_form = None
+
+    pair = {'base': base_form, 'awakened': awak_form}
+    if bundle is None:
+        swarfarm_cache().merge(com2us_id, {"pair_cached": pair})
+    return pair
+
+
+# ---------- UI ----------
+OBJECTIVES = {**{f'profile:{p}': f'Rune score ({p})' for p in WEIGHT_PROFILES},
+              **{f'stat:{k}': k for k in FINAL_STATS}}
+OPTIMIZE_SECONDS = 10.0  # best build so far is shown when the search runs out of time
+
+
+def monster_page(export_dir: Path) -> None:
+    """Monster browser: roster table with rune stats, detail panel, build suggestions and batch."""
+    STATE = {'mapping': [], 'path': None, 'wizard_id': None, 'df_mons': pd.DataFrame(),
+             'runes': RuneStore.empty(), 'units': UnitTable.empty(), 'panel_unit': None, 'batch': [],
+             'pending': None}  # snapshot that arrived during a load, applied once it is in
+    key = f'monster_page:{id(STATE)}'  # job lanes for this page instance
+
+    with ui.header().classes('items-center gap-3'):
+        ui.label('SWEX Monster Browser').classes('text-xl font-bold')
+
+    profile_select = ui.select(options=[], label='Profile').classes('m-4 min-w-[560px]')
+    ui.button('Load', on_click=lambda: ((lambda sel=profile_select.value: load_selected(sel))())).classes('m-4')
+    with ui.row().classes('mx-4 items-center gap-2'):
+        load_progress = ui.linear_progress(value=0, show_value=False).classes('w-96')
+        load_progress_label = ui.label('').classes('text-xs opacity-70')
+    load_progress.visible = False
+
+    with ui.row().classes('m-4 gap-4'):
+        f_star = ui.select(['(any)','6','5','4','3','2','1'], value='(any)', label='★').classes('w-28')
+        f_lvl_min = ui.number(label='Min Lv', value=1).classes('w-28')
+        f_lvl_max = ui.number(label='Max Lv', value=50).classes('w-28')
+        f_runes_min = ui.number(label='Min Runes', value=0).classes('w-32')
+        f_q = ui.input(label='Search name/sets').classes('w-96')
+
+    cols = [
+        {'name':'unit_id','label':'Unit ID','field':'unit_id','sortable':True},
+        {'name':'name','label':'Name','field':'name','sortable':True},
+        {'name':'★','label':'★','field':'★','sortable':True},
+        {'name':'level','label':'Lv','field':'level','sortable':True},
+        {'name':'HP','label':'HP','field':'HP','sortable':True},
+        {'name':'ATK','label':'ATK','field':'ATK','sortable':True},
+        {'name':'DEF','label':'DEF','field':'DEF','sortable':True},
+        {'name':'SPD','label':'SPD','field':'SPD','sortable':True},
+        {'name':'CR%','label':'CR%','field':'CR%','sortable':True},
+        {'name':'CD%','label':'CD%','field':'CD%','sortable':True},
+        {'name':'RES%','label':'RES%','field':'RES%','sortable':True},
+        {'name':'ACC%','label':'ACC%','field':'ACC%','sortable':True},
+        {'name':'HP_with','label':'HP (with)','field':'HP_with','sortable':True},
+        {'name':'ATK_with','label':'ATK (with)','field':'ATK_with','sortable':True},
+        {'name':'DEF_with','label':'DEF (with)','field':'DEF_with','sortable':True},
+        {'name':'SPD_with','label':'SPD (with)','field':'SPD_with','sortable':True},
+        {'name':'CR%_with','label':'CR% (with)','field':'CR%_with','sortable':True},
+        {'name':'CD%_with','label':'CD% (with)','field':'CD%_with','sortable':True},
+        {'name':'RES%_with','label':'RES% (with)','field':'RES%_with','sortable':True},
+        {'name':'ACC%_with','label':'ACC% (with)','field':'ACC%_with','sortable':True},
+        {'name':'runes','label':'Runes','field':'runes','sortable':True},
+        {'name':'sets','label':'Sets','field':'sets_compact'},
+        # TODO: this doesn't seem to work inside a table slot?
+        # {'name':'sets_icons_col','label':'Sets(Icons)','field':'sets_icons','sortable':False},
+    ]
+
+    # ---- RESIZABLE LAYOUT ----
+    split = ui.splitter(value=75).classes('h-[78vh]')
+
+    with split:
+        with split.before:
+            table = ui.table(
+                columns=cols, rows=[], row_key='unit_id',
+                pagination={'rowsPerPage': 20},
+                selection='single',
+                on_select=lambda e: (open_monster_panel(int(e.selection[0]['unit_id'])) if e.selection else None),
+            ).classes('m-4')
+            pager = ServerSideTable(table, rows_per_page=20, on_page=lambda rows: prefetch_details(rows))
+
+        with split.after:
+            detail_card = ui.card().classes('m-3 w-full h-full overflow-auto')
+            with detail_card:
+                d_title = ui.label('Select a monster…').classes('text-lg font-semibold m-4')
+                d_stats = ui.column().classes('m-4')
+                ui.label('Equipped Runes').classes('text-md font-semibold m-2')
+                d_runes = ui.table(columns=[
+                    {'name':'slot','label':'Slot','field':'slot','sortable':True},
+                    {'name':'set','label':'Set','field':'set','sortable':True},
+                    {'name':'main','label':'Main','field':'main'},
+                    {'name':'innate','label':'Innate','field':'innate'},
+                    {'name':'subs','label':'Subs','field':'subs'},
+                    {'name':'score','label':'Score','field':'score','sortable':True},
+                ], rows=[], row_key='rune_id', pagination={'rowsPerPage': 10}).classes('m-2')
+
+                with ui.expansion('Suggest build', icon='auto_fix_high').classes('m-2 w-full'):
+                    with ui.row().classes('gap-2'):
+                        o_sets = ui.select({sid: name for sid, name in SET.items()}, multiple=True,
+                                           label='Sets').classes('w-64')
+                        o_objective = ui.select(OBJECTIVES, value='profile:300', label='Maximize').classes('w-48')
+                    with ui.row().classes('gap-2'):
+                        o_mains = {slot: ui.select(STAT, multiple=True, label=f'Slot {slot} main').classes('w-40')
+                                   for slot in (2, 4, 6)}
+                    with ui.row().classes('gap-2'):
+                        o_floors = {k: ui.number(label=f'Min {k}', value=None).classes('w-24')
+                                    for k in ('HP', 'SPD', 'CR%', 'ACC%', 'RES%')}
+                    with ui.row().classes('items-center gap-2'):
+                        o_all = ui.checkbox('Use runes on other monsters')
+                        ui.button('Optimize', on_click=lambda: optimize_panel_unit())
+                        ui.button('Add to batch', on_click=lambda: add_to_batch()).props('flat')
+                    o_status = ui.label('').classes('text-xs opacity-70')
+                    d_build = ui.table(columns=[
+                        {'name':'slot','label':'Slot','field':'slot'},
+                        {'name':'set','label':'Set','field':'set'},
+                        {'name':'main','label':'Main','field':'main'},
+                        {'name':'subs','label':'Subs','field':'subs'},
+                        {'name':'equipped_unit_id','label':'On unit','field':'equipped_unit_id'},
+                    ], rows=[], row_key='rune_id').classes('m-2')
+
+                with ui.expansion('Batch (priority order)', icon='playlist_play').classes('m-2 w-full'):
+                    ui.label('Runes given to a unit are not available to the units below it.').classes('text-xs opacity-70')
+                    b_table = ui.table(columns=[
+                        {'name':'priority','label':'#','field':'priority'},
+                        {'name':'name','label':'Monster','field':'name'},
+                        {'name':'spec','label':'Constraints','field':'spec'},
+                        {'name':'result','label':'Result','field':'result'},
+                    ], rows=[], row_key='priority').classes('m-2')
+                    with ui.row().classes('gap-2'):
+                        ui.button('Run batch', on_click=lambda: run_batch())
+                        ui.button('Clear', on_click=lambda: clear_batch()).props('flat')
+
+    # custom cell: sets icons
+    with table.add_slot('body-cell-sets_icons_col'):
+        def _(row):
+            icons = row['row'].get('sets_icons') or []
+            with ui.row().classes('items-center gap-1'):
+                if not icons:
+                    ui.label('—').classes('opacity-50 text-xs')
+                else:
+                    for it in icons:
+                        cnt = int(it.get('count', 1))
+                        path = it.get('path') or ''
+                        name = it.get('name') or ''
+                        shown = min(cnt, 3)
+                        for _ in range(shown):
+                            if path:
+                                ui.image(path).classes('h-5 w-5 rounded')
+                            else:
+                                ui.label(name).classes('text-[10px]')
+                        if cnt > 3:
+                            ui.label(f'×{cnt}').classes('text-[10px] opacity-70')
+
+    # ---------- logic ----------
+    def refresh_profiles(keep_selection: bool = False):
+        current = profile_select.value
+        STATE['mapping'] = find_profiles(export_dir)
+        profile_select.options = [label for label, _ in STATE['mapping']]
+        if keep_selection and current in profile_select.options:
+            return
+        profile_select.value = profile_select.options[0] if profile_select.options else None
+
+    async def load_selected(selected_label):
+        if not selected_label:
+            ui.notify('No profile selected', color='negative'); return
+        path_map = {label: p for (label, p) in STATE['mapping']}
+        p = path_map.get(selected_label)
+        if not p or not Path(p).exists():
+            ui.notify('Selected file missing', color='negative'); return
+
+        def work(job: Job):
+            job.progress(0.05, 'Reading profile…')
+            runes, units = load_profile_tables(Path(p))
+            job.progress(0.35, 'Fetching SWARFARM base stats…')
+            df_mons = build_monster_frame(units, runes)
+            return runes, units, df_mons, (read_wizard_info(Path(p)) or {}).get('wizard_id')
+
+        try:
+            runes, units, df_mons, wizard_id = await JOBS.run(f'{key}:load', work, on_progress=show_progress)
+        except JobCancelled:
+            return
+        finally:
+            load_progress.visible = False; load_progress_label.text = ''
+        STATE.update(path=Path(p), runes=runes, units=units, df_mons=df_mons, wizard_id=wizard_id)
+        await refresh_table()
+        pending, STATE['pending'] = STATE['pending'], None
+        if pending is not None:
+            await apply_snapshot(pending)
+
+    async def check_exports():
+        """Pick up new SWEX snapshots: refresh the list, live-apply one for the loaded wizard."""
+        STATE['cursor'], paths = watcher.poll(STATE['cursor'])
+        if not paths:
+            return
+        refresh_profiles(keep_selection=True)
+        if STATE['path'] is not None or JOBS.active(f'{key}:load'):
+            await apply_snapshot(paths[-1])
+
+    async def apply_snapshot(path: Path):
+        """Diff a new snapshot against the loaded tables and rebuild only the affected monster rows."""
+        # a background tick never cancels what the user started: wait for the load to land
+        if JOBS.active(f'{key}:load'):
+            STATE['pending'] = path
+            return
+        old_runes, old_units, df, wizard_id = STATE['runes'], STATE['units'], STATE['df_mons'], STATE['wizard_id']
+
+        def work(job: Job):
+            if (read_wizard_info(path) or {}).get('wizard_id') != wizard_id:
+                return None
+            runes_new, units = load_profile_tables(path)
+            rd, ud = diff_stores(old_runes, runes_new), diff_units(old_units, units)
+            if not rd and not ud:
+                return old_runes, units, df, rd
+            runes, remap, added = patch_store(old_runes, runes_new, rd)
+            affected = np.unique(np.concatenate([
+                old_runes.unit_id[rd.leaving()], runes.unit_id[rd.entering(remap, added)],
+                old_units.unit_id[ud.leaving()], units.unit_id[ud.new_added], units.unit_id[ud.new_changed]]))
+            affected = affected[affected != 0]
+            fresh = build_monster_frame(units.take(np.flatnonzero(np.isin(units.unit_id, affected))), runes)
+            kept = df[~df['unit_id'].isin(affected)] if not df.empty else df
+            df_mons = pd.concat([kept, fresh]) if not kept.empty else fresh
+            if not df_mons.empty:
+                df_mons = df_mons.sort_values(['★','level','SPD'], ascending=[False, False, False])
+            return runes, units, df_mons, rd
+
+        try:
+            res = await JOBS.run(f'{key}:snapshot', work)
+        except JobCancelled:
+            return
+        if res is None:
+            return
+        if STATE['runes'] is not old_runes:  # a load landed meanwhile: diff against that
+            await apply_snapshot(path)
+            return
+        runes, units, df_mons, rd = res
+        STATE.update(path=path, runes=runes, units=units, df_mons=df_mons)
+        if rd or df_mons is not df:
+            await refresh_table(keep_page=True)
+        c = rd.counts()
+        ui.notify(f"{path.name}: +{c['added']} new, {c['changed']} changed, -{c['removed']} gone runes")
+
+    def show_progress(frac: float, msg: str):
+        load_progress.visible = True
+        load_progress.value = frac
+        load_progress_label.text = msg
+
+    def current_filters() -> dict:
+        return {'star': f_star.value, 'lvl_min': f_lvl_min.value, 'lvl_max': f_lvl_max.value,
+                'runes_min': f_runes_min.value, 'q': f_q.value}
+
+    def apply_filters(df: pd.DataFrame, flt: dict) -> pd.DataFrame:
+        if df.empty: return df
+        out = df
+        if flt['star'] != '(any)':
+            out = out[out['★'] == int(flt['star'])]
+        try:
+            lvmin = int(flt['lvl_min'] or 1); lvmax = int(flt['lvl_max'] or 50)
+            out = out[(out['level'] >= lvmin) & (out['level'] <= lvmax)]
+        except: pass
+        try:
+            rmin = int(flt['runes_min'] or 0)
+            out = out[out['runes'] >= rmin]
+        except: pass
+        q = (flt['q'] or '').strip().lower()
+        if q:
+            name_mask = df['name'].str.lower().str.contains(q, na=False)
+            set_mask = df['sets_compact'].str.lower().str.contains(q, na=False)
+            out = out[name_mask | set_mask]
+        return out
+
+    async def refresh_table(debounce: float = 0.0, keep_page: bool = False):
+        df, flt = STATE['df_mons'], current_filters()
+        try:
+            filt = await JOBS.run(f'{key}:filter', lambda job: apply_filters(df, flt), debounce=debounce)
+        except JobCancelled:
+            return
+        pager.set_source(FrameSource(filt), keep_page=keep_page)
+
+    def prefetch_details(rows: list[dict], lane: str = f'{key}:portraits'):
+        """Resolve awakening pairs and warm the portrait cache for `rows`, in the background.
+
+        Each lane keeps only its newest request, so paging or stepping quickly drops stale work.
+        """
+        cids = [int(r['com2us_id']) for r in rows if r.get('com2us_id')]
+
+        def work(job: Job):
+            urls = []
+            for cid in cids:
+                job.check()
+                pair = resolve_unawakened_and_awakened(cid)
+                urls += [f['img'] for f in pair.values() if f and f.get('img')]
+            portrait_cache().prefetch(urls, before_batch=job.check)
+
+        async def run():
+            try:
+                await JOBS.run(lane, work)
+            except JobCancelled:
+                pass
+        background_tasks.create(run(), name=f'prefetch {lane}')
+
+    def _fill_form(slot: ui.column, form: dict | None, url: str, pending: bool = False):
+        slot.clear()
+        with slot:
+            if url:
+                ui.image(url).classes('h-20 w-20 rounded-xl')
+            elif pending:
+                ui.spinner(size='lg')
+            if form and form.get('name'):
+                ui.label(form['name']).classes('text-xs mt-1')
+            if not form:
+                ui.label('—').classes('text-xs opacity-50')
+
+    async def _load_panel_portraits(unit_id: int, cid: int, slots: dict[str, ui.column]):
+        """Fill the portrait row off the event loop: names (and cached portraits) as soon as the
+        pair is resolved, then any portraits that still had to be downloaded."""
+        try:
+            pair = await JOBS.run(f'{key}:panel', lambda job: resolve_unawakened_and_awakened(cid) if cid
+                                  else {'base': None, 'awakened': None})
+        except JobCancelled:
+            return
+        if STATE.get('panel_unit') != unit_id:
+            return
+        remote = {k: f['img'] if f and f.get('img') else '' for k, f in pair.items()}
+        local = {k: portrait_cache().cached_url(u) if u else '' for k, u in remote.items()}
+        for k, slot in slots.items():
+            _fill_form(slot, pair[k], local[k] or '', pending=bool(remote[k]))
+        misses = [k for k in slots if remote[k] and not local[k]]
+        if not misses:
+            return
+        try:
+            urls = await JOBS.run(f'{key}:panel', lambda job: {k: portrait_cache().local_url(remote[k]) for k in misses})
+        except JobCancelled:
+            return
+        if STATE.get('panel_unit') != unit_id:
+            return
+        for k in misses:
+            _fill_form(slots[k], pair[k], urls[k])
+
+    def _prefetch_neighbors(unit_id: int, radius: int = 3):
+        """Detail data for the rows around the selected one, across page boundaries."""
+        ids = [r['unit_id'] for r in table.rows]
+        if unit_id not in ids:
+            return
+        at = pager.offset + ids.index(unit_id)
+        near = [r for r in pager.window(max(at - radius, 0), at + radius + 1) if r['unit_id'] != unit_id]
+        prefetch_details(near, lane=f'{key}:neighbors')
+
+    def open_monster_panel(unit_id: int):
+        if split.value >= 99:
+            split.value = 70  # reopen to 70/30
+
+        dfm = STATE['df_mons']; runes = STATE['runes']
+        if dfm.empty: return
+        row = dfm[dfm['unit_id'] == unit_id]
+        if row.empty: return
+        r = row.iloc[0]
+
+        STATE['panel_unit'] = unit_id
+        d_title.text = f"{r['name']} • {int(r['★'])}★ Lv{int(r['level'])}"
+
+        d_stats.clear()
+        with d_stats:
+            cid = int(r.get('com2us_id') or 0)
+
+            # Portraits + names row: placeholders now, filled once the pair is resolved
+            with ui.row().classes('items-center gap-6 mb-2'):
+                with ui.column().classes('items-center'):
+                    ui.label('Un-Awakened').classes('text-xs opacity-70')
+                    base_slot = ui.column().classes('items-center')
+                    with base_slot:
+                        ui.spinner(size='lg')
+                with ui.column().classes('items-center'):
+                    ui.label('Awakened').classes('text-xs opacity-70')
+                    awak_slot = ui.column().classes('items-center')
+                    with awak_slot:
+                        ui.spinner(size='lg')
+
+            # build 2-column stat comparison
+            with ui.row().classes('gap-8'):
+                # --- base stats ---
+                with ui.column().classes('w-48'):
+                    ui.label('Base Stats').classes('font-semibold underline mb-1')
+                    ui.label(f"HP:  {int(r['HP'])}")
+                    ui.label(f"ATK: {int(r['ATK'])}")
+                    ui.label(f"DEF: {int(r['DEF'])}")
+                    ui.label(f"SPD: {int(r['SPD'])}")
+                    ui.label(f"CR:  {int(r['CR%'])}%")
+                    ui.label(f"CD:  {int(r['CD%'])}%")
+                    ui.label(f"RES: {int(r['RES%'])}%")
+                    ui.label(f"ACC: {int(r['ACC%'])}%")
+
+                # --- after-runes stats ---
+                with ui.column().classes('w-48'):
+                    ui.label('With Runes').classes('font-semibold underline mb-1')
+                    ui.label(f"HP:  {int(r['HP_with'])}")
+                    ui.label(f"ATK: {int(r['ATK_with'])}")
+                    ui.label(f"DEF: {int(r['DEF_with'])}")
+                    ui.label(f"SPD: {int(r['SPD_with'])}")
+                    ui.label(f"CR:  {int(r['CR%_with'])}%")
+                    ui.label(f"CD:  {int(r['CD%_with'])}%")
+                    ui.label(f"RES: {int(r['RES%_with'])}%")
+                    ui.label(f"ACC: {int(r['ACC%_with'])}%")
+
+            # sets section
+            ui.label('Sets:').classes('mt-3 font-semibold')
+            with ui.row().classes('items-center gap-2 ml-2'):
+                icons = r['sets_icons'] if isinstance(r['sets_icons'], list) else []
+                if not icons:
+                    ui.label('(none)')
+                else:
+                    for it in icons:
+                        path = it.get('path') or ''
+                        name = it.get('name') or ''
+                        cnt = int(it.get('count', 1))
+                        shown = min(cnt, 3)
+                        for _ in range(shown):
+                            if path:
+                                ui.image(path).classes('h-6 w-6 rounded')
+                            else:
+                                ui.label(name).classes('text-xs')
+                        if cnt > 3:
+                            ui.label(f"×{cnt}").classes('text-xs opacity-70')
+
+        equip = np.flatnonzero(runes.unit_id == unit_id)
+        equip = equip[np.lexsort((-runes.score[equip], runes.slot[equip]))]
+        d_runes.rows = runes.records(equip)
+        d_runes.update()
+
+        background_tasks.create(_load_panel_portraits(unit_id, cid, {'base': base_slot, 'awakened': awak_slot}),
+                                name='monster panel')
+        _prefetch_neighbors(unit_id)
+
+    def _panel_spec() -> BuildSpec:
+        kind, _, name = o_objective.value.partition(':')
+        return BuildSpec(sets=tuple(o_sets.value or ()),
+                         mains={slot: tuple(sel.value) for slot, sel in o_mains.items() if sel.value},
+                         floors={k: float(n.value) for k, n in o_floors.items() if n.value},
+                         objective=name if kind == 'profile' else {name: 1.0})
+
+    def _spec_text(spec: BuildSpec) -> str:
+        parts = ['+'.join(SET.get(s, str(s)) for s in spec.sets) or 'any sets']
+        parts += [f'{k}≥{v:g}' for k, v in spec.floors.items()]
+        parts.append(f"max {spec.objective if isinstance(spec.objective, str) else '+'.join(spec.objective)}")
+        return ', '.join(parts)
+
+    def _panel_row():
+        unit_id, dfm = STATE['panel_unit'], STATE['df_mons']
+        if unit_id is None or dfm.empty:
+            return None
+        row = dfm[dfm['unit_id'] == unit_id]
+        return None if row.empty else row.iloc[0]
+
+    async def optimize_panel_unit():
+        unit_id, runes = STATE['panel_unit'], STATE['runes']
+        r = _panel_row()
+        if r is None:
+            ui.notify('Select a monster first', color='negative'); return
+        spec = _panel_spec()
+        base = r[list(FINAL_STATS)].to_numpy(dtype=np.int64)
+        pool = None if o_all.value else np.flatnonzero((runes.unit_id == 0) | (runes.unit_id == unit_id))
+        o_status.text = 'Searching…'
+
+        def work(job: Job):
+            return optimize(runes, base, spec, rows=pool, time_limit=OPTIMIZE_SECONDS, check=job.check)
+
+        try:
+            res = await JOBS.run(f'{key}:optimize', work)
+        except JobCancelled:
+            return
+        except ValueError as e:
+            o_status.text = str(e); return
+        if STATE['panel_unit'] != unit_id:
+            return
+        if not res.builds:
+            o_status.text = 'No build satisfies these constraints.' if res.exhaustive else \
+                f'No build found within {OPTIMIZE_SECONDS:.0f}s ({res.nodes} nodes).'
+            d_build.rows = []
+            return
+        b = res.builds[0]
+        stats = '  '.join(f'{k} {int(v)}' for k, v in zip(FINAL_STATS, b.stats))
+        note = '' if res.exhaustive else f' (best after {res.nodes} nodes, search stopped)'
+        o_status.text = f'{stats}  |  value {b.value:.1f}{note}'
+        d_build.rows = runes.records(b.rows)
+
+    def add_to_batch():
+        r = _panel_row()
+        if r is None:
+            ui.notify('Select a monster first', color='negative'); return
+        try:
+            spec = _panel_spec()
+            check_spec(spec)
+        except ValueError as e:
+            ui.notify(str(e), color='negative'); return
+        item = BatchItem(int(r['unit_id']), r[list(FINAL_STATS)].to_numpy(dtype=np.int64), spec)
+        STATE['batch'] = [b for b in STATE['batch'] if b[0].unit_id != item.unit_id] + [(item, r['name'])]
+        _show_batch()
+
+    def clear_batch():
+        STATE['batch'] = []
+        _show_batch()
+
+    def _show_batch(results: list | None = None):
+        rows = []
+        for i, (item, name) in enumerate(STATE['batch']):
+            res = results[i] if results else None
+            if res is None:
+                result = ''
+            elif not res.builds:
+                result = 'no build'
+            else:
+                b = res.builds[0]
+                result = ' '.join(f'{k} {int(v)}' for k, v in zip(FINAL_STATS, b.stats) if k in ('HP', 'SPD', 'CR%', 'CD%'))
+                result += '' if res.exhaustive else ' (stopped)'
+            rows.append({'priority': i + 1, 'name': name, 'spec': _spec_text(item.spec), 'result': result})
+        b_table.rows = rows
+
+    async def run_batch():
+        batch, runes = list(STATE['batch']), STATE['runes']
+        if not batch:
+            ui.notify('Batch is empty', color='negative'); return
+        items = [item for item, _ in batch]
+        pool = None if o_all.value else runes.unit_id == 0
+
+        def work(job: Job):
+            def on_unit(i, item, res):
+                job.progress((i + 1) / len(items), f'Optimized {i + 1}/{len(items)}: {batch[i][1]}')
+            job.progress(0.0, f'Optimizing {len(items)} monsters…')
+            return optimize_batch(runes, items, pool=pool, executor=JOBS.process_pool(),
+                                  time_limit=OPTIMIZE_SECONDS, on_unit=on_unit, check=job.check)
+
+        try:
+            results = await JOBS.run(f'{key}:batch', work, on_progress=show_progress)
+        except JobCancelled:
+            return
+        finally:
+            load_progress.visible = False; load_progress_label.text = ''
+        if STATE['batch'] == batch:
+            _show_batch(results)
+
+    # filter hooks
+    f_star.on('update:model-value', lambda *_: refresh_table())
+    f_lvl_min.on('update:model-value', lambda *_: refresh_table(debounce=0.2))
+    f_lvl_max.on('update:model-value', lambda *_: refresh_table(debounce=0.2))
+    f_runes_min.on('update:model-value', lambda *_: refresh_table(debounce=0.2))
+    f_q.on('update:model-value', lambda *_: refresh_table(debounce=0.2))
+
+    # live updates from SWEX
+    watcher = export_watcher(export_dir)
+    STATE['cursor'] = watcher.cursor()
+    ui.timer(1.0, check_exports)
+
+    refresh_profiles()
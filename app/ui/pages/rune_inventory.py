@@ -1,12 +1,20 @@
 from nicegui import ui
 from pathlib import Path
-import pandas as pd
 
 from app.model.runes import SET
-from app.logic.data_loading.profiles import find_profiles
-from app.logic.data_loading.rune_io import load_runes_df
+from app.model.rune_store import RuneStore
+from app.logic.data_loading.profiles import find_profiles, read_wizard_info
+from app.logic.data_loading.rune_io import rescore_store
+from app.logic.data_loading.normalizer import load_rune_store
+from app.logic.data_loading.snapshot_diff import diff_stores, patch_store
+from app.logic.data_loading.watcher import export_watcher
+from app.logic.calc.rune_calc import WEIGHT_PROFILES
+from app.logic.calc.upgrade_sim import simulate_upgrades
 from app.logic.formatting.filters import filter_runes
-from app.logic.formatting.summaries import summary_lines
+from app.logic.formatting.summaries import RuneSummary
+from app.logic.formatting.search_index import search_index
+from app.ui.components.server_table import ServerSideTable, StoreRowsSource
+from app.ui.jobs import JOBS, Job, JobCancelled
 
 TABLE_COLUMNS = [
         {'name':'rune_id','label':'ID','field':'rune_id','align':'left','sortable':True},
@@ -20,15 +28,25 @@ TABLE_COLUMNS = [
         {'name':'equipped','label':'Eq','field':'equipped','sortable':True},
         {'name':'equipped_unit_id','label':'Unit ID','field':'equipped_unit_id'},
         {'name':'score','label':'Score','field':'score','sortable':True},
+        {'name':'exp12','label':'Exp. +12','field':'exp12','sortable':True},
+        {'name':'p10','label':'P10','field':'p10','sortable':True},
+        {'name':'p90','label':'P90','field':'p90','sortable':True},
+        {'name':'hit','label':'Hit %','field':'hit','sortable':True},
     ]
+UPGRADE_SIMS = 1000  # simulated power-ups per rune below +12
 
 
 
 def rune_page(export_dir: Path):
-    STATE = {'mapping': [], 'df': pd.DataFrame()}
+    STATE = {'mapping': [], 'store': RuneStore.empty(), 'summary': None, 'path': None, 'wizard_id': None,
+             'weights': None,    # profile the store's scores were computed with
+             'pending': None,    # snapshot that arrived during a load, applied once it is in
+             'forecast': None}  # (store, {field: array}) from the last upgrade simulation
+    key = f'rune_page:{id(STATE)}'  # job lanes for this page instance
 
     with ui.header().classes('items-center gap-3'):
         ui.label('SWMaster Rune Viewer').classes('text-xl font-bold')
+        ui.link('Snapshot diff', '/diff').classes('text-white')
         with ui.expansion('How “Score” is calculated', icon='info').classes('m-4'):
             ui.label('Innate + substats only (main stat ignored).')
             ui.code(
@@ -39,9 +57,19 @@ def rune_page(export_dir: Path):
                 '  + 0.35 * ( HP_flat / 1875 + (ATK_flat + DEF_flat) / 100 )\n'
                 ']', language='text'
             )
+            ui.label('Other weight profiles rescale the same terms (see WEIGHT_PROFILES).')
+            ui.label(f'Exp. +12 / P10 / P90: score after powering the rune up to +12, from {UPGRADE_SIMS} '
+                     'simulated upgrades per rune (new subs, then rolls on random subs). '
+                     'Hit %: chance to end at or above the target score.')
 
     profile_select = ui.select(options=[], label='Profile').classes('m-4 min-w-[560px]')
     ui.button('Load', on_click=lambda: _load_selected(profile_select.value)).classes('m-4')
+    weights_select = ui.select(list(WEIGHT_PROFILES), value='300', label='Score weights').classes('m-4 w-40')
+    target_input = ui.number(label='Target score', value=150, min=0, step=5).classes('m-4 w-32')
+    with ui.row().classes('mx-4 items-center gap-2'):
+        progress = ui.linear_progress(value=0, show_value=False).classes('w-96')
+        progress_label = ui.label('').classes('text-xs opacity-70')
+    progress.visible = False
 
     with ui.card().classes('m-4'):
         ui.label('Summary (filtered)').classes('text-lg font-semibold mb-2')
@@ -53,45 +81,187 @@ def rune_page(export_dir: Path):
     columns = TABLE_COLUMNS
     table = ui.table(columns=columns, rows=[], row_key='rune_id',
                      pagination={'rowsPerPage': 20}).classes('m-4')
+    pager = ServerSideTable(table, rows_per_page=20)
 
     with ui.row().classes('m-4 gap-4'):
         set_filter = ui.select(['(any)'] + sorted(set(SET.values())), value='(any)', label='Set').classes('w-48')
         slot_filter = ui.select(['(any)'] + [str(i) for i in range(1,7)], value='(any)', label='Slot').classes('w-32')
         equipped_filter = ui.select(['(any)','equipped','unequipped'], value='(any)', label='Equipped').classes('w-40')
-        search_text = ui.input(label='Search (main/innate/subs/set)').classes('w-96')
+        search_text = ui.input(label='Search (main/innate/subs/set)',
+                               placeholder='text, or spd>=15 cr>=10 slot=2 set=Violent main=spd').classes('w-96')
+        search_text.tooltip('Numeric fields: hp hp% atk atk% def def% spd cr cd res acc (innate+subs), '
+                            'slot, level, grade, score, gem, grind (# of gemmed/ground subs), set=<name>, main=<stat>. '
+                            'Ops: = != > >= < <=')
 
-    def _refresh_profiles():
+    def _refresh_profiles(keep_selection: bool = False):
+        current = profile_select.value
         STATE['mapping'] = find_profiles(export_dir)
         profile_select.options = [label for label, _ in STATE['mapping']]
+        if keep_selection and current in profile_select.options:
+            return
         profile_select.value = profile_select.options[0] if profile_select.options else None
 
-    def _load_selected(selected_label):
+    async def _load_selected(selected_label):
         if not selected_label:
             ui.notify('No profile selected', color='negative'); return
         path_map = {label: p for (label, p) in STATE['mapping']}
         p = path_map.get(selected_label)
         if not p or not Path(p).exists():
             ui.notify('Selected file missing', color='negative'); return
-        STATE['df'] = load_runes_df(Path(p))
-        _refresh_table()
-
-    def _refresh_table():
-        filtered = filter_runes(
-            STATE['df'],
-            set_filter.value,
-            slot_filter.value,
-            equipped_filter.value,
-            search_text.value,
-        )
-        table.rows = filtered.to_dict(orient='records')
-        table.update()
-        l1, l2, l3, l4 = summary_lines(filtered)
+        weights = weights_select.value
+
+        def work(job: Job):
+            job.progress(0.05, 'Reading profile…')
+            store = load_rune_store(Path(p), weights)
+            job.progress(0.6, 'Indexing…')
+            search_index(store)
+            return store, RuneSummary(store), (read_wizard_info(Path(p)) or {}).get('wizard_id')
+
+        try:
+            STATE['store'], STATE['summary'], STATE['wizard_id'] = await JOBS.run(
+                f'{key}:load', work, on_progress=_show_progress)
+        except JobCancelled:
+            return
+        finally:
+            progress.visible = False; progress_label.text = ''
+        STATE['path'], STATE['weights'] = Path(p), weights
+        if weights_select.value != weights:  # changed while loading: rescore what was just loaded
+            await _rescore()
+        else:
+            await _refresh_table()
+            await _forecast()
+        pending, STATE['pending'] = STATE['pending'], None
+        if pending is not None:
+            await _apply_snapshot(pending)
+
+    async def _check_exports():
+        """Pick up new SWEX snapshots: refresh the list, live-apply one for the loaded wizard."""
+        STATE['cursor'], paths = watcher.poll(STATE['cursor'])
+        if not paths:
+            return
+        _refresh_profiles(keep_selection=True)
+        if STATE['path'] is not None or JOBS.active(f'{key}:load'):
+            await _apply_snapshot(paths[-1])
+
+    async def _apply_snapshot(path: Path):
+        # a background tick never cancels what the user started: wait for the load to land
+        if JOBS.active(f'{key}:load'):
+            STATE['pending'] = path
+            return
+        old, summary, weights, wizard_id = STATE['store'], STATE['summary'], STATE['weights'], STATE['wizard_id']
+
+        def work(job: Job):
+            if (read_wizard_info(path) or {}).get('wizard_id') != wizard_id:
+                return None
+            new = load_rune_store(path, weights)
+            delta = diff_stores(old, new)
+            if not delta:
+                return None, None, delta
+            store, remap, added = patch_store(old, new, delta)
+            if summary is not None and summary.store is old:
+                summ = summary.patched(store, remap, delta.leaving(), delta.entering(remap, added))
+            else:
+                summ = RuneSummary(store)
+            return store, summ, delta
+
+        try:
+            res = await JOBS.run(f'{key}:snapshot', work)
+        except JobCancelled:
+            return
+        if res is None:
+            return
+        if STATE['store'] is not old:  # a load or rescore landed meanwhile: diff against that
+            await _apply_snapshot(path)
+            return
+        store, summ, delta = res
+        STATE['path'] = path
+        if store is not None:
+            STATE['store'], STATE['summary'] = store, summ
+            if weights_select.value != weights:
+                await _rescore()
+            else:
+                await _refresh_table(keep_page=True)
+                await _forecast()
+        c = delta.counts()
+        ui.notify(f"{path.name}: +{c['added']} new, {c['changed']} changed, -{c['removed']} gone")
+
+    async def _rescore():
+        if JOBS.active(f'{key}:load'):
+            return  # the load rescores its store once it is in
+        old, weights = STATE['store'], weights_select.value
+        if weights == STATE['weights'] or STATE['path'] is None:
+            return
+        def work(job: Job):
+            store = rescore_store(old, weights)
+            return store, RuneSummary(store)
+        try:
+            store, summ = await JOBS.run(f'{key}:rescore', work)
+        except JobCancelled:
+            return
+        if STATE['store'] is not old:  # replaced meanwhile; whoever replaced it checks the weights
+            return
+        STATE['store'], STATE['summary'], STATE['weights'] = store, summ, weights
+        if weights_select.value != weights:  # changed again while this ran
+            await _rescore()
+            return
+        await _refresh_table()
+        await _forecast()
+
+    async def _forecast(debounce: float = 0.0):
+        """Simulate upgrades of the loaded runes and show them as extra columns."""
+        store, weights, target = STATE['store'], STATE['weights'], float(target_input.value or 0)
+        if not len(store):
+            return
+
+        def work(job: Job):
+            f = simulate_upgrades(store, weights, sims=UPGRADE_SIMS, targets=(target,), check=job.check)
+            return {'exp12': f.mean, 'p10': f.percentiles[10], 'p90': f.percentiles[90],
+                    'hit': (f.hit[target] * 100).round(1)}
+
+        try:
+            extra = await JOBS.run(f'{key}:sim', work, debounce=debounce)
+        except JobCancelled:
+            return
+        STATE['forecast'] = (store, extra)
+        await _refresh_table(keep_page=True)
+
+    def _show_progress(frac: float, msg: str):
+        progress.visible = True
+        progress.value = frac
+        progress_label.text = msg
+
+    async def _refresh_table(debounce: float = 0.0, keep_page: bool = False):
+        store, summary = STATE['store'], STATE['summary']
+        args = (set_filter.value, slot_filter.value, equipped_filter.value, search_text.value)
+
+        def work(job: Job):
+            rows = filter_runes(store, *args)
+            job.check()
+            lines = (summary if summary is not None and summary.store is store
+                     else RuneSummary(store)).update(rows).lines()
+            return rows, lines
+
+        try:
+            rows, lines = await JOBS.run(f'{key}:filter', work, debounce=debounce)
+        except JobCancelled:
+            return
+        forecast = STATE['forecast']
+        extra = forecast[1] if forecast is not None and forecast[0] is store else None
+        pager.set_source(StoreRowsSource(store, rows, extra), keep_page=keep_page)
+        l1, l2, l3, l4 = lines
         summary_line1.text = l1
         summary_line2.text = l2
         summary_line3.text = l3
         summary_line4.text = l4
 
-    for ctrl in (set_filter, slot_filter, equipped_filter, search_text):
+    for ctrl in (set_filter, slot_filter, equipped_filter):
         ctrl.on('update:model-value', lambda *_: _refresh_table())
+    search_text.on('update:model-value', lambda *_: _refresh_table(debounce=0.2))
+    weights_select.on('update:model-value', lambda *_: _rescore())
+    target_input.on('update:model-value', lambda *_: _forecast(debounce=0.5))
+
+    watcher = export_watcher(export_dir)
+    STATE['cursor'] = watcher.cursor()
+    ui.timer(1.0, _check_exports)
 
     _refresh_profiles()
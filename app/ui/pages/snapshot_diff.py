@@ -0,0 +1,88 @@
+from nicegui import ui
+from pathlib import Path
+
+from app.logic.data_loading.profiles import find_profiles
+from app.logic.data_loading.snapshot_diff import diff_snapshots
+from app.ui.components.server_table import ServerSideTable, FrameSource
+from app.ui.jobs import JOBS, Job, JobCancelled
+
+RUNE_COLUMNS = [
+        {'name':'rune_id','label':'ID','field':'rune_id','align':'left','sortable':True},
+        {'name':'change','label':'Change','field':'change','sortable':True},
+        {'name':'slot','label':'Slot','field':'slot','sortable':True},
+        {'name':'set','label':'Set','field':'set','sortable':True},
+        {'name':'grade★','label':'★','field':'grade★','sortable':True},
+        {'name':'level_before','label':'+ before','field':'level_before','sortable':True},
+        {'name':'level','label':'+','field':'level','sortable':True},
+        {'name':'unit_before','label':'Unit before','field':'unit_before','sortable':True},
+        {'name':'unit','label':'Unit','field':'unit','sortable':True},
+        {'name':'score','label':'Score','field':'score','sortable':True},
+    ]
+UNIT_COLUMNS = [
+        {'name':'unit_id','label':'Unit ID','field':'unit_id','align':'left','sortable':True},
+        {'name':'change','label':'Change','field':'change','sortable':True},
+        {'name':'com2us_id','label':'Monster','field':'com2us_id','sortable':True},
+        {'name':'★','label':'★','field':'★','sortable':True},
+        {'name':'level','label':'Level','field':'level','sortable':True},
+    ]
+
+
+def diff_page(export_dir: Path):
+    """Compare two profile saves: runes added / sold / upgraded / re-equipped, units gained / lost."""
+    STATE = {'mapping': [], 'runes': None, 'units': None}
+    key = f'diff_page:{id(STATE)}'
+
+    with ui.header().classes('items-center gap-3'):
+        ui.label('SWMaster Snapshot Diff').classes('text-xl font-bold')
+        ui.link('Rune viewer', '/').classes('text-white')
+
+    with ui.row().classes('m-4 gap-4 items-center'):
+        old_select = ui.select(options=[], label='Before').classes('min-w-[480px]')
+        new_select = ui.select(options=[], label='After').classes('min-w-[480px]')
+        ui.button('Compare', on_click=lambda: _compare(old_select.value, new_select.value))
+    summary = ui.label('').classes('mx-4')
+
+    change_filter = ui.select(['(any)', 'added', 'sold', 'removed', 'upgraded', 're-equipped', 'modified'],
+                              value='(any)', label='Change').classes('mx-4 w-48')
+    rune_table = ui.table(columns=RUNE_COLUMNS, rows=[], row_key='rune_id').classes('m-4')
+    rune_pager = ServerSideTable(rune_table, rows_per_page=20)
+    ui.label('Units').classes('mx-4 text-lg font-semibold')
+    unit_table = ui.table(columns=UNIT_COLUMNS, rows=[], row_key='unit_id').classes('m-4')
+    unit_pager = ServerSideTable(unit_table, rows_per_page=10)
+
+    def _refresh_profiles():
+        STATE['mapping'] = find_profiles(export_dir)
+        labels = [label for label, _ in STATE['mapping']]
+        old_select.options = new_select.options = labels
+        new_select.value = labels[0] if labels else None
+        old_select.value = labels[1] if len(labels) > 1 else None
+
+    async def _compare(old_label, new_label):
+        path_map = dict(STATE['mapping'])
+        old_p, new_p = path_map.get(old_label), path_map.get(new_label)
+        if not old_p or not new_p:
+            ui.notify('Pick two profiles', color='negative'); return
+
+        def work(job: Job):
+            diff = diff_snapshots(Path(old_p), Path(new_p))
+            job.check()
+            return diff.counts(), diff.rune_frame(), diff.unit_frame()
+
+        try:
+            counts, STATE['runes'], STATE['units'] = await JOBS.run(f'{key}:diff', work)
+        except JobCancelled:
+            return
+        summary.text = '   |   '.join(f'{k}: {v}' for k, v in counts.items())
+        unit_pager.set_source(FrameSource(STATE['units']))
+        _show_runes()
+
+    def _show_runes():
+        df, change = STATE['runes'], change_filter.value
+        if df is None:
+            return
+        if change != '(any)':
+            df = df[df['change'].str.contains(change, regex=False)]
+        rune_pager.set_source(FrameSource(df))
+
+    change_filter.on('update:model-value', lambda *_: _show_runes())
+    _refresh_profiles()
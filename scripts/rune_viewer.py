@@ -5,10 +5,21 @@
 from nicegui import ui
 from pathlib import Path
 from app.ui.pages.rune_inventory import rune_page
+from app.ui.pages.snapshot_diff import diff_page
 
 HOST, PORT = '127.0.0.1', 8089
 EXPORT_DIR = Path(__file__).resolve().parents[1] / 'data' / 'swex' / 'exports' / 'profile saves'
 
-if __name__ == '__main__':
+
+@ui.page('/')
+def index():
     rune_page(EXPORT_DIR)
+
+
+@ui.page('/diff')
+def diff():
+    diff_page(EXPORT_DIR)
+
+
+if __name__ == '__main__':
     ui.run(host=HOST, port=PORT, reload=False)
@@ -0,0 +1,133 @@
+# tests/test_optimizer.py
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import random
+
+import numpy as np
+import pytest
+
+from app.model.runes import SET_REQ
+from app.model.rune_store import EFF_MAIN
+from app.logic.calc import batch_optimizer
+from app.logic.calc.batch_optimizer import BatchItem, optimize_batch
+from app.logic.calc.optimizer import SLOTS, BuildSpec, _undominated, optimize, prepare, search
+from app.logic.calc.rune_calc import score_runes
+from app.logic.calc.unit_stats import FINAL_STATS, stats_with_runes
+from app.logic.data_loading.rune_io import build_rune_store
+from app.logic.data_loading.synthetic import synthetic_rune
+
+BASE = np.array([9885, 461, 681, 101, 15, 50, 15, 0])
+SETS = (1, 3, 13, 17)  # few sets, so set constraints are often satisfiable
+
+
+@pytest.fixture(scope='module')
+def store():
+    rnd = random.Random(0)
+    runes = []
+    for i in range(1200):
+        r = synthetic_rune(rnd, i, SLOTS[i % 6])
+        r['set_id'] = rnd.choice(SETS)
+        runes.append(r)
+    return build_rune_store(runes)
+
+
+def _brute(store, rows, spec):
+    """Top values by trying every combination of one rune per slot."""
+    per = []
+    for s in SLOTS:
+        p = rows[store.slot[rows] == s]
+        if spec.mains.get(s):
+            p = p[np.isin(store.eff[p, 2 * EFF_MAIN], spec.mains[s])]
+        per.append(p)
+    combos = np.stack([g.ravel() for g in np.meshgrid(*per, indexing='ij')], axis=1)
+    final = stats_with_runes(BASE, store.total_stats[combos].astype(np.int64).sum(axis=1))
+    ok = np.ones(len(combos), bool)
+    for k, v in spec.floors.items():
+        ok &= final[:, FINAL_STATS.index(k)] >= v
+    for s in spec.sets:
+        ok &= (store.set_id[combos] == s).sum(axis=1) >= SET_REQ[s]
+    if isinstance(spec.objective, str):
+        val = score_runes(store.sub_stats, spec.objective)[combos].sum(axis=1)
+    else:
+        val = (final - BASE) @ np.array([spec.objective.get(k, 0.0) for k in FINAL_STATS])
+    val = np.sort(val[ok])[::-1][:spec.top]
+    return val.tolist()
+
+
+def _specs(n: int):
+    rnd = random.Random(1)
+    for t in range(n):
+        yield BuildSpec(
+            sets=rnd.choice([(), (13,), (3,), (13, 17), (1, 17), (3, 1)]),
+            floors=rnd.choice([{}, {'SPD': 130}, {'SPD': 120, 'ACC%': 10}, {'HP': 12000}]),
+            objective=rnd.choice(['300', 'spd', {'SPD': 1, 'HP': 0.01}, {'HP': 1, 'SPD': 50}]),
+            mains={2: (8,)} if t % 5 == 0 else {},
+            top=1 + t % 4,
+        )
+
+
+def _sample(store, rng, per_slot: int = 6):
+    return np.concatenate([rng.choice(np.flatnonzero(store.slot == s), per_slot, replace=False) for s in SLOTS])
+
+
+def _values(res):
+    return [b.value for b in res.builds]
+
+
+def test_optimize_matches_brute_force(store):
+    rng = np.random.default_rng(0)
+    for spec in _specs(80):
+        rows = _sample(store, rng)
+        res = optimize(store, BASE, spec, rows)
+        assert res.exhaustive
+        assert np.allclose(_values(res), _brute(store, rows, spec)), spec
+        for b in res.builds:
+            assert store.slot[b.rows].tolist() == list(SLOTS)
+            assert np.isin(b.rows, rows).all()
+
+
+def test_undominated_matches_pairwise_count():
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        n, d, top = int(rng.integers(0, 300)), int(rng.integers(1, 4)), int(rng.integers(1, 6))
+        x = rng.integers(0, rng.integers(2, 20), (n, d)).astype(float)  # plenty of ties and duplicates
+        idx = np.arange(n)
+        ge = (x[:, None, :] >= x[None]).all(axis=2)
+        gt = (x[:, None, :] > x[None]).any(axis=2) | (idx[:, None] < idx[None])
+        expected = (ge & gt).sum(axis=0) < top
+        assert np.array_equal(_undominated(x, top, chunk=int(rng.integers(1, 64))), expected)
+
+
+def test_split_parts_merge_to_the_full_answer(store):
+    rng = np.random.default_rng(3)
+    for spec in _specs(30):
+        plan = prepare(store, BASE, spec, _sample(store, rng, 8))
+        full = _values(search(plan))
+        for parts in (2, 3, 5):
+            found = [b.value for p in range(parts) for b in search(plan, split=(p, parts)).builds]
+            assert np.allclose(sorted(found, reverse=True)[:spec.top], full)
+
+
+def test_batch_fan_out_matches_sequential(store, monkeypatch):
+    monkeypatch.setattr(batch_optimizer, '_SERIAL_NODES', 1)  # every unit goes to the workers
+    rng = np.random.default_rng(4)
+    items = [BatchItem(0, BASE, spec) for spec in _specs(12)]
+    pool = np.zeros(len(store), bool)
+    pool[_sample(store, rng, 30)] = True
+    expected = [_values(r) for r in optimize_batch(store, items, pool)]
+    with ThreadPoolExecutor(4) as ex:
+        for parts in (2, 4):
+            got = optimize_batch(store, items, pool, executor=ex, parts=parts)
+            assert all(np.allclose(_values(r), e) for r, e in zip(got, expected))
+            assert all(r.exhaustive for r in got)
+
+
+def test_batch_on_worker_processes(store, monkeypatch):
+    monkeypatch.setattr(batch_optimizer, '_SERIAL_NODES', 1)
+    rng = np.random.default_rng(5)
+    items = [BatchItem(0, BASE, spec) for spec in list(_specs(4))]
+    pool = np.zeros(len(store), bool)
+    pool[_sample(store, rng, 20)] = True
+    expected = [_values(r) for r in optimize_batch(store, items, pool)]
+    with ProcessPoolExecutor(2) as ex:
+        got = optimize_batch(store, items, pool, executor=ex, parts=3)
+    assert all(np.allclose(_values(r), e) for r, e in zip(got, expected))
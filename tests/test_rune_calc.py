@@ -0,0 +1,51 @@
+# tests/test_rune_calc.py
+import random
+
+import numpy as np
+
+from app.logic.calc.rune_calc import rune_score, rune_score_300
+from app.logic.data_loading.rune_io import build_rune_store
+from app.logic.data_loading.synthetic import synthetic_rune
+
+
+def _baseline_score_300(r):
+    """rune_score_300 as it was before scoring was vectorized."""
+    s = {'hp_flat': 0, 'hp_pct': 0, 'atk_flat': 0, 'atk_pct': 0, 'def_flat': 0, 'def_pct': 0,
+         'spd': 0, 'cr': 0, 'cd': 0, 'res': 0, 'acc': 0}
+    keys = {1: 'hp_flat', 2: 'hp_pct', 3: 'atk_flat', 4: 'atk_pct', 5: 'def_flat', 6: 'def_pct',
+            8: 'spd', 9: 'cr', 10: 'cd', 11: 'res', 12: 'acc'}
+    for e in [r.get('prefix_eff')] + (r.get('sec_eff') or []):
+        if e and e[0]:
+            s[keys[int(e[0])]] += int(e[1])
+    part_pct = (s['hp_pct'] + s['atk_pct'] + s['def_pct'] + s['acc'] + s['res']) / 40.0
+    part_spd = (s['spd'] + s['cr']) / 30.0
+    part_cd = s['cd'] / 35.0
+    part_flat = 0.35 * ((s['hp_flat'] / 1875.0) + ((s['atk_flat'] + s['def_flat']) / 100.0))
+    return round((part_pct + part_spd + part_cd + part_flat) * 100.0, 1)
+
+
+def _runes(n: int, seed: int = 0) -> list[dict]:
+    rnd = random.Random(seed)
+    return [synthetic_rune(rnd, i, rnd.randint(1, 6)) for i in range(n)]
+
+
+def test_300_matches_baseline_formula():
+    runes = _runes(5000)
+    expected = np.array([_baseline_score_300(r) for r in runes])
+    store = build_rune_store(runes)
+    by_id = dict(zip(store.rune_id.tolist(), store.score.tolist()))
+    assert [by_id[r['rune_id']] for r in runes] == expected.tolist()
+    assert [rune_score_300(r) for r in runes] == expected.tolist()
+
+
+def test_300_matches_baseline_at_ties():
+    # one 'res' point is 2.5 score: odd counts land exactly on .x5
+    runes = [{'sec_eff': [[11, k, 0, 0], [10, j, 0, 0]]} for k in range(1, 40, 2) for j in range(0, 30)]
+    assert [rune_score_300(r) for r in runes] == [_baseline_score_300(r) for r in runes]
+
+
+def test_other_profiles_score_single_and_batch_alike():
+    runes = _runes(500, seed=1)
+    store = build_rune_store(runes, profile='spd')
+    by_id = dict(zip(store.rune_id.tolist(), store.score.tolist()))
+    assert [by_id[r['rune_id']] for r in runes] == [rune_score(r, 'spd') for r in runes]
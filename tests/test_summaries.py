@@ -0,0 +1,33 @@
+# tests/test_summaries.py
+import random
+
+import numpy as np
+
+from app.logic.data_loading.rune_io import build_rune_store, sort_store
+from app.logic.data_loading.synthetic import synthetic_rune
+from app.logic.formatting.summaries import RuneSummary, summary_lines
+
+
+def _store(n: int = 2000, seed: int = 0):
+    rnd = random.Random(seed)
+    return sort_store(build_rune_store([synthetic_rune(rnd, i, rnd.randint(1, 6)) for i in range(n)]))
+
+
+def test_row_order_does_not_matter():
+    store = _store()
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(len(store), 300, replace=False))
+    shuffled = rng.permutation(rows)
+    assert summary_lines(store, shuffled) == summary_lines(store, rows)
+    p95 = float(np.quantile(store.score[rows], 0.95))
+    assert f'p95: {p95:.1f}' in summary_lines(store, shuffled)[3]
+
+
+def test_update_with_unsorted_subsets_matches_a_fresh_summary():
+    store = _store()
+    rng = np.random.default_rng(1)
+    summ = RuneSummary(store)
+    rows = np.arange(len(store))
+    for size in (1500, 900, 400, 50, 2):
+        rows = rng.choice(rows, size, replace=False)  # a narrower filter, in no particular order
+        assert summ.update(rows).lines() == RuneSummary(store, np.sort(rows)).lines()
@@ -0,0 +1,45 @@
+# tests/test_swarfarm_client.py
+from concurrent.futures import Future
+import threading
+
+from app.logic.swarfarm.client import SwarfarmClient
+
+
+def _run(fn, timeout: float = 10) -> None:
+    t = threading.Thread(target=fn, daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), 'client deadlocked'
+
+
+def test_immediate_failures_do_not_deadlock():
+    client = SwarfarmClient(base_url='nota url', max_workers=2, retries=0)
+    futs: list[Future] = []
+    _run(lambda: futs.extend(client.submit(f'monsters/{i}/') for i in range(200)))
+    assert all(isinstance(f.exception(timeout=10), Exception) for f in futs)
+    assert not client._inflight
+
+
+def test_done_future_is_forgotten_inline():
+    client = SwarfarmClient(max_workers=1)
+    done: Future = Future()
+    done.set_result({'count': 0})
+    client._pool.submit = lambda fn, *args: done
+    _run(lambda: client.submit('monsters/'))
+    assert not client._inflight
+
+
+def test_concurrent_callers_share_one_request():
+    client = SwarfarmClient(max_workers=2)
+    gate, calls = threading.Event(), []
+
+    def fetch(path, params=None):
+        calls.append(path)
+        gate.wait(5)
+        return {'path': path}
+
+    client._get_json = fetch
+    futs = [client.submit('monsters/1/') for _ in range(5)]
+    gate.set()
+    assert [f.result(timeout=5) for f in futs] == [{'path': 'monsters/1/'}] * 5
+    assert calls == ['monsters/1/']